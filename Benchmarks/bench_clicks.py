@@ -0,0 +1,65 @@
+"""
+Click-schedule accuracy benchmark against a mocked input backend.
+
+Runs the real AutoClicker loop on the recording input backend, which
+timestamps every click, then reports achieved CPS, interval error
+percentiles and the CPU time the loop burned.
+
+    python -m Benchmarks.bench_clicks
+"""
+import time
+import logging
+
+from Modules.auto_attack import AutoClicker
+from Modules.input_backend import RecordingBackend
+from Modules.shared_state import SharedState
+from Modules.metrics import LatencyHistogram
+
+
+def bench_rate(cps: float, duration_s: float, call_cost_s: float = 0.0002) -> dict:
+    backend = RecordingBackend(call_cost_s=call_cost_s)
+    clicker = AutoClicker(SharedState(), clicks_per_second=cps, input_backend=backend)
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    clicker.start()
+    time.sleep(duration_s)
+    clicker.stop()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    clicks = backend.timestamps("click")
+
+    interval_ns = 1e9 / cps
+    error = LatencyHistogram("interval_error")
+    for a, b in zip(clicks, clicks[1:]):
+        error.record(int(abs((b - a) - interval_ns)))
+    span = (clicks[-1] - clicks[0]) / 1e9 if len(clicks) > 1 else 0.0
+    s = error.snapshot()
+    return {
+        "achieved_cps": (len(clicks) - 1) / span if span else 0.0,
+        "interval_error_p50_us": s["p50_us"],
+        "interval_error_p99_us": s["p99_us"],
+        "cpu_percent": 100.0 * cpu / wall if wall else 0.0,
+    }
+
+
+def run_suite(quick: bool = False) -> dict:
+    duration = 1.0 if quick else 3.0
+    results = {}
+    for cps in (10, 20, 50, 200):
+        r = bench_rate(cps, duration)
+        results[f"cps{cps}_rate_error_pct"] = {
+            "value": abs(r["achieved_cps"] - cps) / cps * 100.0, "unit": "%", "better": "lower"}
+        results[f"cps{cps}_interval_p50_us"] = {"value": r["interval_error_p50_us"], "unit": "us", "better": "lower"}
+        results[f"cps{cps}_interval_p99_us"] = {"value": r["interval_error_p99_us"], "unit": "us", "better": "lower"}
+        results[f"cps{cps}_cpu_pct"] = {"value": r["cpu_percent"], "unit": "%", "better": "lower"}
+    return results
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    for name, r in run_suite().items():
+        print(f"{name:28s} {r}")
+
+
+if __name__ == "__main__":
+    main()
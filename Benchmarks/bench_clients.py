@@ -0,0 +1,130 @@
+"""
+Cost of each extra game client in one process.
+
+Builds a ClientManager with 1, 2, 4 and 8 client profiles on shared
+services (recording input backend, replayed blank frames, one template bank)
+and lets every client click at 10 CPS while a writer thread appends a line
+per client log every 50 ms. Reports process CPU time per second of wall
+clock, resident memory and thread count per client count, plus the memory
+of one bare process with the CV stack imported: that is what every client
+used to cost when each one ran as its own process.
+
+Linux only (RSS comes from /proc/self/statm).
+
+    python -m Benchmarks.bench_clients
+"""
+import os
+import sys
+import time
+import tempfile
+import threading
+import subprocess
+import logging
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from Modules.capture import FrameCaptureService, ReplayBackend
+from Modules.clients import ClientManager, ClientProfile
+from Modules.input_backend import RecordingBackend
+from Modules.template_bank import TemplateBank
+from Modules.weapon_library import WeaponLibrary
+
+COUNTS = (1, 2, 4, 8)
+CPS = 10
+LINE_INTERVAL_S = 0.05
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def process_baseline_rss() -> int:
+    """RSS of a fresh interpreter after importing the CV stack (one client per process)."""
+    code = ("import os, cv2, numpy, tkinter; "
+            "print(int(open('/proc/self/statm').read().split()[1]) * os.sysconf('SC_PAGE_SIZE'))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=60)
+    return int(out.stdout.strip()) if out.returncode == 0 else 0
+
+
+def run_clients(count: int, duration_s: float, directory: str, template_bank, weapon_library) -> dict:
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    capture = FrameCaptureService(ReplayBackend([frame], loop=True))
+    paths = []
+    profiles = []
+    for i in range(count):
+        path = os.path.join(directory, f"n{count}_c{i}", "latest.log")
+        os.makedirs(os.path.dirname(path))
+        open(path, "w").close()
+        paths.append(path)
+        profiles.append(ClientProfile(f"c{i}", path, window=((i % 4) * 480, (i // 4) * 540, 480, 540),
+                                      clicks_per_second=CPS))
+
+    rss_before = rss_bytes()
+    threads_before = threading.active_count()
+    manager = ClientManager(profiles, capture, RecordingBackend(), template_bank, weapon_library, focus=None)
+    manager.start()
+    manager.toggle()
+
+    stop = threading.Event()
+
+    def write_lines():
+        handles = [open(p, "a", encoding="utf-8") for p in paths]
+        n = 0
+        while not stop.wait(LINE_INTERVAL_S):
+            n += 1
+            for h in handles:
+                h.write(f"[CHAT] line {n}\n")
+                h.flush()
+        for h in handles:
+            h.close()
+
+    writer = threading.Thread(target=write_lines, name="BenchWriter", daemon=True)
+    time.sleep(0.2)
+    writer.start()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    time.sleep(duration_s)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    threads = threading.active_count() - threads_before - 1
+    rss = rss_bytes() - rss_before
+    stop.set()
+    writer.join()
+    manager.stop()
+    capture.stop()
+    return {"cpu_ms_per_s": cpu / wall * 1000.0, "rss_kb": rss / 1024.0, "threads": threads}
+
+
+def run_suite(quick: bool = False) -> dict:
+    if np is None:
+        return {"skipped": "numpy not installed"}
+    if not os.path.exists("/proc/self/statm"):
+        return {"skipped": "needs /proc (Linux)"}
+    duration = 1.0 if quick else 3.0
+    template_bank = TemplateBank()
+    weapon_library = WeaponLibrary.from_config(None, template_bank)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for count in COUNTS:
+            r = run_clients(count, duration, directory, template_bank, weapon_library)
+            results[f"clients{count}_cpu_ms_per_s"] = {"value": r["cpu_ms_per_s"], "unit": "ms/s", "better": "lower"}
+            results[f"clients{count}_rss_kb"] = {"value": r["rss_kb"], "unit": "kB", "better": "lower"}
+            results[f"clients{count}_threads"] = {"value": r["threads"], "unit": "", "better": "lower"}
+    baseline = process_baseline_rss()
+    if baseline:
+        results["process_per_client_rss_kb"] = {"value": baseline / 1024.0, "unit": "kB", "better": "lower"}
+    return results
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    for name, r in run_suite().items():
+        print(f"{name:32s} {r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Click jitter with template matching in-process versus in the CV worker.
+
+Runs the real AutoClicker loop on the recording input backend (as in
+bench_clicks) while a background thread keeps running full weapon-library
+searches over the inventory region of a generated 1080p frame, first in
+this process and then through the CV worker process. An idle run gives the
+floor. Reports click interval error percentiles per case plus the searches
+completed and the worker round-trip time.
+
+On a single core the worker process competes with the click loop for the
+same CPU, so the difference only shows on multi-core machines.
+
+    python -m Benchmarks.bench_cv_worker
+"""
+import time
+import tempfile
+import threading
+import logging
+
+try:
+    import cv2
+    import numpy as np
+except ImportError:
+    cv2 = None
+    np = None
+
+from Modules.auto_attack import AutoClicker
+from Modules.capture import Frame
+from Modules.capture_regions import INVENTORY_REGION
+from Modules.cv_worker import CVWorker
+from Modules.input_backend import RecordingBackend
+from Modules.metrics import LatencyHistogram
+from Modules.shared_state import SharedState
+from Modules.template_bank import TemplateBank
+from Modules.weapon_library import WeaponLibrary, WeaponSpec, INVENTORY_TEMPLATE
+from Benchmarks.bench_matching import load_templates, make_frame, make_variants, ROI_SIZE
+
+CPS = 50
+VARIANTS = 8
+
+
+def click_jitter(duration_s: float, load=None) -> dict:
+    """Interval error of a CPS-rate click loop while `load()` runs in a loop on another thread."""
+    stop = threading.Event()
+    runs = [0]
+
+    def spin():
+        while not stop.is_set():
+            load()
+            runs[0] += 1
+
+    backend = RecordingBackend(call_cost_s=0.0002)
+    clicker = AutoClicker(SharedState(), clicks_per_second=CPS, input_backend=backend)
+    loader = threading.Thread(target=spin, name="BenchLoad", daemon=True) if load else None
+    if loader:
+        loader.start()
+    clicker.start()
+    time.sleep(duration_s)
+    clicker.stop()
+    stop.set()
+    if loader:
+        loader.join()
+
+    clicks = backend.timestamps("click")
+    interval_ns = 1e9 / CPS
+    error = LatencyHistogram("interval_error")
+    for a, b in zip(clicks, clicks[1:]):
+        error.record(int(abs((b - a) - interval_ns)))
+    s = error.snapshot()
+    return {"p50_us": s["p50_us"], "p99_us": s["p99_us"], "max_us": s["max_us"], "searches": runs[0]}
+
+
+def run_suite(quick: bool = False) -> dict:
+    if cv2 is None or np is None:
+        return {"skipped": "opencv/numpy not installed"}
+    duration = 1.5 if quick else 4.0
+    tpl = load_templates().get(INVENTORY_TEMPLATE)
+    frame_rgb = make_frame(1920, 1080, tpl, (840, 580))
+    frame = Frame(time.perf_counter_ns(), 0, 0, frame_rgb, full=True)
+    rw, rh = ROI_SIZE
+    regions = {INVENTORY_REGION: (840 - rw // 2, 580 - rh // 2, rw, rh)}
+
+    with tempfile.TemporaryDirectory() as directory:
+        specs = make_variants(tpl, directory, VARIANTS) + [
+            WeaponSpec(INVENTORY_TEMPLATE, tpl.path, INVENTORY_REGION, priority=5)]
+        library = WeaponLibrary(TemplateBank(), specs)
+        worker = CVWorker(request_timeout=5.0, weapon_library=library)
+        worker.start()
+        deadline = time.monotonic() + worker.startup_timeout
+        while not worker.healthy and time.monotonic() < deadline:
+            time.sleep(0.05)
+        try:
+            if not worker.healthy:
+                return {"skipped": "cv worker did not start"}
+            worker.search(frame, regions, specs)  # first request, excluded from the timings
+
+            idle = click_jitter(duration)
+            local = click_jitter(duration, lambda: library.search(frame, regions))
+            rt = LatencyHistogram("roundtrip")
+
+            def remote():
+                start = time.perf_counter_ns()
+                if worker.search(frame, regions, specs) is None:
+                    raise RuntimeError("cv worker request failed")
+                rt.record(time.perf_counter_ns() - start)
+
+            offloaded = click_jitter(duration, remote)
+        finally:
+            worker.stop()
+
+    results = {}
+    for case, r in (("idle", idle), ("inprocess", local), ("worker", offloaded)):
+        results[f"{case}_interval_p50_us"] = {"value": r["p50_us"], "unit": "us", "better": "lower"}
+        results[f"{case}_interval_p99_us"] = {"value": r["p99_us"], "unit": "us", "better": "lower"}
+        results[f"{case}_interval_max_us"] = {"value": r["max_us"], "unit": "us", "better": "lower"}
+    results["inprocess_searches_per_s"] = {"value": local["searches"] / duration, "unit": "1/s", "better": "higher"}
+    results["worker_searches_per_s"] = {"value": offloaded["searches"] / duration, "unit": "1/s", "better": "higher"}
+    results["worker_roundtrip_p50_ms"] = {"value": rt.snapshot()["p50_us"] / 1000.0, "unit": "ms", "better": "lower"}
+    return results
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    for name, r in run_suite().items():
+        print(f"{name:32s} {r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Template-matching benchmark on generated screenshots.
+
+Pastes the weapon templates from Assets/ into synthetic RGB frames at known
+positions for several resolutions, then times the recovery matching path
+(RGB->gray conversion + masked matchTemplate) on the full frame and on a
+region of interest around the inventory. The library case matches several
+weapon variants against one frame, one after another versus through
+WeaponLibrary.find (concurrent matching plus NMS), and then again through
+the last-known-location fast path.
+
+    python -m Benchmarks.bench_matching
+"""
+import os
+import time
+import tempfile
+import logging
+
+try:
+    import cv2
+    import numpy as np
+except ImportError:
+    cv2 = None
+    np = None
+
+from Modules.template_bank import TemplateBank
+from Modules.capture import Frame
+from Modules.capture_regions import INVENTORY_REGION
+from Modules.weapon_library import WeaponLibrary, WeaponSpec, INVENTORY_TEMPLATE, HOTBAR_TEMPLATE
+
+RESOLUTIONS = [(1920, 1080), (2560, 1440), (3840, 2160)]
+LIBRARY_VARIANTS = 8
+ROI_SIZE = (520, 320)
+POSITION_TOLERANCE_PX = 2
+
+
+def load_templates():
+    bank = TemplateBank({
+        INVENTORY_TEMPLATE: "Assets/weapon_template.png",
+        HOTBAR_TEMPLATE: "Assets/weapon_template_hotbar.png",
+    })
+    bank.load_all()
+    return bank
+
+
+def make_frame(width: int, height: int, tpl, position, seed: int = 7):
+    """
+    Dark, noisy RGB frame (like pyautogui output) with `tpl` pasted so that
+    its top-left corner is at `position`.
+    """
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(20, 70, size=(height, width, 3), dtype=np.uint8)
+    x, y = position
+    patch = frame[y:y + tpl.height, x:x + tpl.width]
+    rgb = cv2.cvtColor(tpl.bgr, cv2.COLOR_BGR2RGB)
+    if tpl.mask is None:
+        patch[:] = rgb
+    else:
+        sel = tpl.mask > 0
+        patch[sel] = rgb[sel]
+    return frame
+
+
+def time_match(frame_rgb, tpl, repeat: int):
+    best = None
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        res = tpl.match(cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR))
+        _, max_val, _, max_loc = cv2.minMaxLoc(res)
+        samples.append(time.perf_counter_ns() - start)
+        best = (max_val, max_loc)
+    samples.sort()
+    return samples[len(samples) // 2], best
+
+
+def make_variants(tpl, directory: str, count: int):
+    """
+    Writes `count` distinguishable variants of the template (seeded noise
+    overlays, standing in for glint/skin/damage variants).
+    """
+    rng = np.random.default_rng(11)
+    specs = []
+    for i in range(count):
+        noise = rng.integers(-60, 60, size=tpl.bgr.shape, dtype=np.int16)
+        img = np.clip(tpl.bgr.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+        if tpl.mask is not None:
+            img = np.dstack([img, tpl.mask])
+        path = os.path.join(directory, f"variant_{i}.png")
+        cv2.imwrite(path, img)
+        specs.append(WeaponSpec(f"variant_{i}", path, INVENTORY_REGION, priority=i % 3))
+    return specs
+
+
+def bench_library(tpl, repeat: int) -> dict:
+    width, height = RESOLUTIONS[0]
+    position = (width // 2 - 120, height // 2 + 40)
+    frame_rgb = make_frame(width, height, tpl, position)
+    rw, rh = ROI_SIZE
+    region = (max(0, position[0] - rw // 2), max(0, position[1] - rh // 2), rw, rh)
+    frame = Frame(time.perf_counter_ns(), 0, 0, frame_rgb, full=True)
+
+    with tempfile.TemporaryDirectory() as directory:
+        bank = TemplateBank()
+        specs = make_variants(tpl, directory, LIBRARY_VARIANTS) + [
+            WeaponSpec(INVENTORY_TEMPLATE, tpl.path, INVENTORY_REGION, priority=5)]
+        library = WeaponLibrary(bank, specs)
+        entries = [bank.get(s.name) for s in specs]
+
+        sequential, library_ns, fast = [], [], []
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            roi = bank.prepare(frame.view(region))
+            for entry in entries:
+                cv2.minMaxLoc(entry.match(roi))
+            sequential.append(time.perf_counter_ns() - start)
+
+            library.forget_locations()
+            start = time.perf_counter_ns()
+            found = library.find(frame, {INVENTORY_REGION: region})
+            library_ns.append(time.perf_counter_ns() - start)
+            best = found[0] if found else None
+
+            # Same frame again: the remembered location is verified first.
+            start = time.perf_counter_ns()
+            found = library.find(frame, {INVENTORY_REGION: region})
+            fast.append(time.perf_counter_ns() - start)
+            if not found or found[0].left != best.left or found[0].top != best.top:
+                best = None
+        fast_stats = library.fast_path_stats()
+
+    sequential.sort()
+    library_ns.sort()
+    fast.sort()
+    ok = best is not None and best.spec.name == INVENTORY_TEMPLATE and \
+        abs(best.left - position[0]) <= POSITION_TOLERANCE_PX and abs(best.top - position[1]) <= POSITION_TOLERANCE_PX
+    return {
+        "sequential_ns": sequential[len(sequential) // 2],
+        "library_ns": library_ns[len(library_ns) // 2],
+        "fast_ns": fast[len(fast) // 2],
+        "fast_hit_rate": fast_stats["hits"] / max(1, fast_stats["lookups"]),
+        "ok": ok,
+    }
+
+
+def run_suite(quick: bool = False) -> dict:
+    if cv2 is None or np is None:
+        return {"skipped": "OpenCV/numpy not installed"}
+    bank = load_templates()
+    tpl = bank.get(INVENTORY_TEMPLATE)
+    if tpl is None:
+        return {"skipped": "weapon template could not be loaded"}
+
+    repeat = 3 if quick else 9
+    results = {}
+    for width, height in RESOLUTIONS:
+        position = (width // 2 - 120, height // 2 + 40)
+        frame = make_frame(width, height, tpl, position)
+
+        full_ns, (conf, loc) = time_match(frame, tpl, repeat)
+        ok = abs(loc[0] - position[0]) <= POSITION_TOLERANCE_PX and abs(loc[1] - position[1]) <= POSITION_TOLERANCE_PX
+
+        rw, rh = ROI_SIZE
+        left = max(0, position[0] - rw // 2)
+        top = max(0, position[1] - rh // 2)
+        roi = np.ascontiguousarray(frame[top:top + rh, left:left + rw])
+        roi_ns, (roi_conf, roi_loc) = time_match(roi, tpl, repeat)
+        roi_ok = (abs(roi_loc[0] + left - position[0]) <= POSITION_TOLERANCE_PX
+                  and abs(roi_loc[1] + top - position[1]) <= POSITION_TOLERANCE_PX)
+
+        key = f"{width}x{height}"
+        results[f"full_{key}_ms"] = {"value": full_ns / 1e6, "unit": "ms", "better": "lower"}
+        results[f"roi_{key}_ms"] = {"value": roi_ns / 1e6, "unit": "ms", "better": "lower"}
+        results[f"hit_{key}"] = {"value": 1.0 if (ok and roi_ok) else 0.0, "unit": "bool", "better": "higher"}
+        results[f"conf_{key}"] = {"value": min(conf, roi_conf), "unit": "ncc", "better": "higher"}
+
+    lib = bench_library(tpl, repeat)
+    n = LIBRARY_VARIANTS + 1
+    results[f"library{n}_sequential_ms"] = {"value": lib["sequential_ns"] / 1e6, "unit": "ms", "better": "lower"}
+    results[f"library{n}_find_ms"] = {"value": lib["library_ns"] / 1e6, "unit": "ms", "better": "lower"}
+    results[f"library{n}_fast_path_ms"] = {"value": lib["fast_ns"] / 1e6, "unit": "ms", "better": "lower"}
+    results[f"library{n}_fast_path_hit_rate"] = {"value": lib["fast_hit_rate"], "unit": "ratio", "better": "higher"}
+    results[f"library{n}_hit"] = {"value": 1.0 if lib["ok"] else 0.0, "unit": "bool", "better": "higher"}
+    return results
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    for name, r in run_suite().items():
+        print(f"{name:24s} {r}")
+
+
+if __name__ == "__main__":
+    main()
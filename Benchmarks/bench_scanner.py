@@ -0,0 +1,103 @@
+"""
+Backlog scan over a generated logs directory: two weeks of rotated
+*.log.gz archives plus a large latest.log, with knockout messages sprinkled
+in between chat lines.
+
+Reports the cold scan (nothing indexed), the warm rescan (everything from
+the index), a rescan after appending to latest.log (only the tail is read)
+and, for reference, the old way of replaying every decoded line through
+TriggerEngine.match.
+
+    python -m Benchmarks.bench_scanner
+"""
+import os
+import gzip
+import time
+import random
+import tempfile
+import logging
+
+from Modules.log_scanner import LogScanner, collect_files
+from Modules.triggers import TriggerEngine, WEAPON_KNOCKED_OUT_MESSAGE
+
+CHAT = "[{t}] [Render thread/INFO]: [CHAT] [G] Player{n}: " + "x" * 60
+HIT = "[{t}] [Render thread/INFO]: [CHAT] " + WEAPON_KNOCKED_OUT_MESSAGE
+HIT_EVERY = 5000
+
+
+def _lines(count: int, rng: random.Random):
+    for i in range(count):
+        t = f"{(i // 3600) % 24:02d}:{(i // 60) % 60:02d}:{i % 60:02d}"
+        if rng.randrange(HIT_EVERY) == 0:
+            yield HIT.format(t=t)
+        else:
+            yield CHAT.format(t=t, n=i % 97)
+
+
+def make_logs(directory: str, days: int, lines_per_file: int) -> int:
+    rng = random.Random(7)
+    size = 0
+    for day in range(days):
+        path = os.path.join(directory, f"2024-05-{day + 1:02d}-1.log.gz")
+        data = ("\n".join(_lines(lines_per_file, rng)) + "\n").encode("utf-8")
+        with gzip.open(path, "wb", compresslevel=6) as f:
+            f.write(data)
+        size += len(data)
+    data = ("\n".join(_lines(lines_per_file * 2, rng)) + "\n").encode("utf-8")
+    with open(os.path.join(directory, "latest.log"), "wb") as f:
+        f.write(data)
+    return size + len(data)
+
+
+def replay_lines(directory: str, engine: TriggerEngine) -> int:
+    """The pre-scanner approach: decode and match every line."""
+    hits = 0
+    for path in collect_files([directory]):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                hits += len(engine.match(line))
+    return hits
+
+
+def run_suite(quick: bool = False) -> dict:
+    days = 4 if quick else 14
+    lines = 50_000 if quick else 150_000
+    with tempfile.TemporaryDirectory() as directory:
+        total = make_logs(directory, days, lines)
+        index = os.path.join(directory, "index.json")
+        scanner = LogScanner(TriggerEngine().rules(), index)
+
+        scanner.scan([directory])
+        cold = scanner.stats
+        scanner.scan([directory])
+        warm = scanner.stats
+        with open(os.path.join(directory, "latest.log"), "a", encoding="utf-8") as f:
+            f.write("\n".join(_lines(2000, random.Random(1))) + "\n")
+        scanner.scan([directory])
+        tail = scanner.stats
+
+        start = time.perf_counter()
+        replay_hits = replay_lines(directory, TriggerEngine())
+        replay_s = time.perf_counter() - start
+
+    return {
+        "log_mb": {"value": total / 1e6, "unit": "MB", "better": "higher"},
+        "hits": {"value": cold["hits"], "unit": "", "better": "higher"},
+        "cold_scan_s": {"value": cold["elapsed_s"], "unit": "s", "better": "lower"},
+        "cold_scan_mb_per_s": {"value": cold["scanned_bytes"] / 1e6 / cold["elapsed_s"], "unit": "MB/s", "better": "higher"},
+        "indexed_rescan_ms": {"value": warm["elapsed_s"] * 1000, "unit": "ms", "better": "lower"},
+        "appended_rescan_ms": {"value": tail["elapsed_s"] * 1000, "unit": "ms", "better": "lower"},
+        "line_replay_s": {"value": replay_s, "unit": "s", "better": "lower"},
+        "line_replay_hits": {"value": replay_hits, "unit": "", "better": "higher"},
+    }
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    for name, r in run_suite().items():
+        print(f"{name:24s} {r}")
+
+
+if __name__ == "__main__":
+    main()
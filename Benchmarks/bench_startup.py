@@ -0,0 +1,131 @@
+"""
+Startup time and memory of the headless entry point against the Tk GUI.
+
+Each entry point runs in a fresh interpreter on an empty config: it
+builds every module the way headless.py / main.py do, starts them, waits
+for the warm-up to finish and shuts down. Reports the time to "ready"
+(modules built; for the GUI, window drawn) and "warm" (templates loaded),
+the peak RSS of the process and whether tkinter was imported.
+
+The GUI half needs a display; without one only the headless numbers are
+reported. Peak RSS comes from resource.getrusage (Linux/macOS).
+
+    python -m Benchmarks.bench_startup
+"""
+import os
+import sys
+import json
+import tempfile
+import subprocess
+import logging
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PRELUDE = """
+import time
+_START_NS = time.perf_counter_ns()
+import sys, json, resource, threading
+"""
+
+_REPORT = """
+peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    peak_kb //= 1024
+print(json.dumps({"ready_ms": ready_ms, "warm_ms": warm_ms, "peak_rss_kb": peak_kb,
+                  "tkinter": "tkinter" in sys.modules}))
+"""
+
+HEADLESS = _PRELUDE + """
+import headless
+from Modules.app import AppModules
+from Modules.config import ConfigStore
+from Modules.startup import StartupProfile
+profile = StartupProfile(_START_NS)
+modules = AppModules(ConfigStore(sys.argv[1]), profile)
+ready_ms = profile.mark("ready")
+warm = threading.Event()
+modules.start(on_warm=warm.set)
+warm.wait(30)
+warm_ms = profile.mark("warm")
+modules.shutdown()
+""" + _REPORT
+
+GUI = _PRELUDE + """
+from GUI import AzerusAppGUI
+from Modules.app import AppModules
+from Modules.config import ConfigStore
+from Modules.startup import StartupProfile
+profile = StartupProfile(_START_NS)
+modules = AppModules(ConfigStore(sys.argv[1]), profile)
+app = AzerusAppGUI(shared_state=modules.shared_state, autoclicker=modules.autoclicker,
+                   weapon_return=modules.weapon_return, blood_curse=modules.blood_curse,
+                   hotkeys=modules.hotkeys, recorder=modules.recorder, cv_worker=modules.cv_worker)
+marks = {}
+
+def on_warm():
+    marks["warm"] = profile.mark("warm")
+    app.root.after(0, app.root.quit)
+
+def on_shown():
+    marks["ready"] = profile.mark("ready")
+    modules.start(on_warm=on_warm)
+
+app.run(on_shown=on_shown)
+ready_ms, warm_ms = marks.get("ready", 0.0), marks.get("warm", 0.0)
+modules.shutdown()
+""" + _REPORT
+
+
+def display_available() -> bool:
+    code = "import tkinter; tkinter.Tk().destroy()"
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, cwd=ROOT, timeout=30).returncode == 0
+
+
+def run_entry(code: str, config_path: str) -> dict:
+    out = subprocess.run([sys.executable, "-c", code, config_path], capture_output=True, text=True,
+                         cwd=ROOT, timeout=120)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else f"exit {out.returncode}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def median_run(code: str, config_path: str, runs: int) -> dict:
+    samples = [run_entry(code, config_path) for _ in range(runs)]
+    return {key: sorted(s[key] for s in samples)[len(samples) // 2] for key in samples[0]}
+
+
+def run_suite(quick: bool = False) -> dict:
+    if resource is None:
+        return {"skipped": "needs resource.getrusage (Linux/macOS)"}
+    runs = 3 if quick else 7
+    entries = {"headless": HEADLESS}
+    if display_available():
+        entries["gui"] = GUI
+    else:
+        print("[bench] startup: no display, GUI not measured", file=sys.stderr)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        config_path = os.path.join(directory, "config.json")
+        for name, code in entries.items():
+            r = median_run(code, config_path, runs)
+            results[f"{name}_ready_ms"] = {"value": r["ready_ms"], "unit": "ms", "better": "lower"}
+            results[f"{name}_warm_ms"] = {"value": r["warm_ms"], "unit": "ms", "better": "lower"}
+            results[f"{name}_peak_rss_mb"] = {"value": r["peak_rss_kb"] / 1024.0, "unit": "MB", "better": "lower"}
+            results[f"{name}_imports_tkinter"] = {"value": 1.0 if r["tkinter"] else 0.0, "unit": "bool",
+                                                  "better": "lower"}
+    return results
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    for name, r in run_suite().items():
+        print(f"{name:32s} {r}")
+
+
+if __name__ == "__main__":
+    main()
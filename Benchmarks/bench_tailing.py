@@ -0,0 +1,115 @@
+"""
+Log-tailing benchmark on a synthetic, growing latest.log.
+
+Latency: a writer thread appends timestamped lines at a steady rate and the
+LogFollower callback measures write -> delivery time.
+Throughput: a burst of lines is appended at once and timed until the last
+one is delivered.
+
+    python -m Benchmarks.bench_tailing
+"""
+import os
+import time
+import shutil
+import tempfile
+import threading
+import logging
+
+from Modules.log_follower import LogFollower
+from Modules.metrics import LatencyHistogram
+
+FILLER = "[12:00:00] [Render thread/INFO]: [CHAT] [G] Player: " + "x" * 40
+
+
+def _follow(path: str, on_line, use_inotify: bool):
+    follower = LogFollower(on_line, path=path, use_inotify=use_inotify)
+    stop = threading.Event()
+    thread = threading.Thread(target=follower.run, args=(stop,), name="BenchFollower", daemon=True)
+    thread.start()
+    mode = follower.mode
+    return follower, stop, thread, mode
+
+
+def bench_latency(directory: str, use_inotify: bool, lines: int, interval_s: float) -> dict:
+    path = os.path.join(directory, "latest.log")
+    open(path, "w").close()
+    hist = LatencyHistogram("tail.latency")
+    done = threading.Event()
+    received = [0]
+
+    def on_line(line, seen_ns):
+        stamp = line.rsplit(" ", 1)[-1]
+        if stamp.isdigit():
+            hist.record(seen_ns - int(stamp))
+        received[0] += 1
+        if received[0] >= lines:
+            done.set()
+
+    follower, stop, thread, mode = _follow(path, on_line, use_inotify)
+    time.sleep(0.05)
+    with open(path, "a", encoding="utf-8") as f:
+        for _ in range(lines):
+            f.write(f"{FILLER} {time.perf_counter_ns()}\n")
+            f.flush()
+            time.sleep(interval_s)
+    done.wait(5.0)
+    stop.set()
+    follower.wake()
+    thread.join(timeout=2.0)
+    s = hist.snapshot()
+    return {"mode": mode, "p50_ms": s["p50_us"] / 1000, "p99_ms": s["p99_us"] / 1000, "received": received[0]}
+
+
+def bench_throughput(directory: str, use_inotify: bool, lines: int) -> dict:
+    path = os.path.join(directory, "latest_burst.log")
+    open(path, "w").close()
+    done = threading.Event()
+    received = [0]
+
+    def on_line(line, seen_ns):
+        received[0] += 1
+        if received[0] >= lines:
+            done.set()
+
+    follower, stop, thread, mode = _follow(path, on_line, use_inotify)
+    time.sleep(0.05)
+    payload = "".join(f"{FILLER} {i}\n" for i in range(lines))
+    start = time.perf_counter()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(payload)
+    done.wait(30.0)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    follower.wake()
+    thread.join(timeout=2.0)
+    return {"mode": mode, "lines_per_s": received[0] / elapsed if elapsed else 0.0,
+            "mb_per_s": len(payload.encode("utf-8")) / elapsed / 1e6 if elapsed else 0.0}
+
+
+def run_suite(quick: bool = False) -> dict:
+    latency_lines = 100 if quick else 400
+    burst_lines = 50_000 if quick else 300_000
+    results = {}
+    directory = tempfile.mkdtemp(prefix="azerus_tail_")
+    try:
+        for use_inotify in (True, False):
+            lat = bench_latency(directory, use_inotify, latency_lines, 0.005)
+            thr = bench_throughput(directory, use_inotify, burst_lines)
+            mode = lat["mode"]
+            if not use_inotify or mode == "inotify":
+                results[f"{mode}_latency_p50_ms"] = {"value": lat["p50_ms"], "unit": "ms", "better": "lower"}
+                results[f"{mode}_latency_p99_ms"] = {"value": lat["p99_ms"], "unit": "ms", "better": "lower"}
+                results[f"{mode}_lines_per_s"] = {"value": thr["lines_per_s"], "unit": "lines/s", "better": "higher"}
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    for name, r in run_suite().items():
+        print(f"{name:28s} {r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Cost of the tracing hooks, off and on.
+
+Times tracer.span() / tracer.instant() and metrics.record() (which emits a
+span while tracing) per call with tracing disabled and enabled, next to an
+empty `with nullcontext()` as the floor for a with-statement.
+
+    python -m Benchmarks.bench_tracing
+"""
+import time
+import logging
+from contextlib import nullcontext
+
+from Modules.metrics import registry as metrics
+from Modules.tracing import tracer
+
+
+def _per_call_ns(fn, n: int) -> float:
+    start = time.perf_counter_ns()
+    fn(n)
+    return (time.perf_counter_ns() - start) / n
+
+
+def _spans(n):
+    for _ in range(n):
+        with tracer.span("bench", cat="bench"):
+            pass
+
+
+def _instants(n):
+    for _ in range(n):
+        tracer.instant("bench", cat="bench")
+
+
+def _records(n):
+    for _ in range(n):
+        metrics.record("bench.tracing", 1000)
+
+
+def _null(n):
+    ctx = nullcontext()
+    for _ in range(n):
+        with ctx:
+            pass
+
+
+def run_suite(quick: bool = False) -> dict:
+    n = 50_000 if quick else 300_000
+    was_enabled = tracer.enabled
+    tracer.stop()
+    results = {"null_with_ns": {"value": _per_call_ns(_null, n), "unit": "ns", "better": "lower"}}
+    for state in ("off", "on"):
+        if state == "on":
+            tracer.start(10_000)
+        results[f"span_{state}_ns"] = {"value": _per_call_ns(_spans, n), "unit": "ns", "better": "lower"}
+        results[f"instant_{state}_ns"] = {"value": _per_call_ns(_instants, n), "unit": "ns", "better": "lower"}
+        results[f"metrics_record_{state}_ns"] = {"value": _per_call_ns(_records, n), "unit": "ns", "better": "lower"}
+    tracer.stop()
+    if was_enabled:
+        tracer.start()
+    return results
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    for name, r in run_suite().items():
+        print(f"{name:28s} {r}")
+
+
+if __name__ == "__main__":
+    main()
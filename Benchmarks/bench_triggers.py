@@ -0,0 +1,116 @@
+"""
+Throughput benchmark for the chat-log trigger engine.
+
+Generates a synthetic Minecraft log with a configurable number of lines and
+rules, then compares TriggerEngine against the naive "one substring scan per
+rule" loop.
+
+    python -m Benchmarks.bench_triggers --lines 500000 --rules 40
+"""
+import argparse
+import random
+import time
+import logging
+
+from Modules.triggers import TriggerEngine, TriggerRule, WEAPON_KNOCKED_OUT_MESSAGE
+
+NOISE_LINES = [
+    "[12:00:01] [Render thread/INFO]: [CHAT] [G] Player{n}: всем привет",
+    "[12:00:02] [Render thread/INFO]: [CHAT] Вы получили {n} монет",
+    "[12:00:03] [Render thread/WARN]: Received passengers for unknown entity {n}",
+    "[12:00:04] [Server thread/INFO]: Loaded {n} advancements",
+    "[12:00:05] [Render thread/INFO]: [CHAT] [L] Trader{n}: продаю меч, пишите в лс",
+]
+
+
+def make_rules(count: int):
+    rules = [TriggerRule("weapon_knocked_out", "count", literal=WEAPON_KNOCKED_OUT_MESSAGE)]
+    for i in range(1, count):
+        if i % 5 == 0:
+            rules.append(TriggerRule(f"regex_{i}", "count", regex=rf"Событие #{i}: \d+ урона"))
+        else:
+            rules.append(TriggerRule(f"literal_{i}", "count", literal=f"Серверное сообщение номер {i}!"))
+    return rules
+
+
+def make_lines(count: int, rules, hit_ratio: float, seed: int = 1):
+    rnd = random.Random(seed)
+    lines = []
+    for n in range(count):
+        if rnd.random() < hit_ratio:
+            rule = rnd.choice(rules)
+            body = rule.literal if rule.literal is not None else rule.regex.replace(r"\d+", str(n))
+            lines.append(f"[12:00:06] [Render thread/INFO]: [CHAT] {body}")
+        else:
+            lines.append(rnd.choice(NOISE_LINES).format(n=n))
+    return lines
+
+
+def bench_engine(lines, rules):
+    engine = TriggerEngine(rules)
+    hits = [0]
+    engine.register_handler("count", lambda rule, line, seen_ns: hits.__setitem__(0, hits[0] + 1))
+    start = time.perf_counter()
+    for line in lines:
+        engine.feed(line)
+    elapsed = time.perf_counter() - start
+    return elapsed, hits[0], engine.backend
+
+
+def bench_naive(lines, rules):
+    literals = [r.literal for r in rules if r.literal is not None]
+    import re
+    regexes = [re.compile(r.regex) for r in rules if r.regex is not None]
+    hits = 0
+    start = time.perf_counter()
+    for line in lines:
+        for lit in literals:
+            if lit in line:
+                hits += 1
+        for rx in regexes:
+            if rx.search(line):
+                hits += 1
+    elapsed = time.perf_counter() - start
+    return elapsed, hits
+
+
+def run(lines: int = 500_000, rules: int = 40, hit_ratio: float = 0.001):
+    rule_objs = make_rules(rules)
+    data = make_lines(lines, rule_objs, hit_ratio)
+    engine_s, engine_hits, backend = bench_engine(data, rule_objs)
+    naive_s, naive_hits = bench_naive(data, rule_objs)
+    return {
+        "lines": lines,
+        "rules": rules,
+        "backend": backend,
+        "engine_lines_per_s": lines / engine_s,
+        "naive_lines_per_s": lines / naive_s,
+        "engine_hits": engine_hits,
+        "naive_hits": naive_hits,
+    }
+
+
+def run_suite(quick: bool = False) -> dict:
+    r = run(lines=100_000 if quick else 500_000)
+    return {
+        "engine_lines_per_s": {"value": r["engine_lines_per_s"], "unit": "lines/s", "better": "higher"},
+        "speedup_vs_naive": {"value": r["engine_lines_per_s"] / r["naive_lines_per_s"], "unit": "x", "better": "higher"},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=500_000)
+    parser.add_argument("--rules", type=int, default=40)
+    parser.add_argument("--hit-ratio", type=float, default=0.001)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    r = run(args.lines, args.rules, args.hit_ratio)
+    print(f"{r['lines']} lines, {r['rules']} rules")
+    print(f"  engine ({r['backend']}): {r['engine_lines_per_s']:,.0f} lines/s, hits={r['engine_hits']}")
+    print(f"  naive scan:          {r['naive_lines_per_s']:,.0f} lines/s, hits={r['naive_hits']}")
+
+
+if __name__ == "__main__":
+    main()
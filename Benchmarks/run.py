@@ -0,0 +1,142 @@
+"""
+Headless benchmark runner.
+
+Runs every benchmark module (no game or display needed), prints the results
+and optionally stores them as a JSON baseline or compares them against one.
+
+    python -m Benchmarks.run                          # run and print
+    python -m Benchmarks.run --save Benchmarks/baselines/linux.json
+    python -m Benchmarks.run --compare Benchmarks/baselines/linux.json
+    python -m Benchmarks.run --compare old.json --against new.json   # no re-run
+
+--compare exits with status 1 when any metric is worse than the baseline by
+more than --tolerance (relative, default 15%).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import platform
+import importlib
+
+SUITES = {
+    "matching": "Benchmarks.bench_matching",
+    "tailing": "Benchmarks.bench_tailing",
+    "clicks": "Benchmarks.bench_clicks",
+    "triggers": "Benchmarks.bench_triggers",
+    "cv_worker": "Benchmarks.bench_cv_worker",
+    "clients": "Benchmarks.bench_clients",
+    "scanner": "Benchmarks.bench_scanner",
+    "tracing": "Benchmarks.bench_tracing",
+    "startup": "Benchmarks.bench_startup",
+}
+
+
+def run_suites(names, quick: bool) -> dict:
+    results = {}
+    for name in names:
+        module = importlib.import_module(SUITES[name])
+        start = time.perf_counter()
+        try:
+            results[name] = module.run_suite(quick=quick)
+        except Exception as e:
+            results[name] = {"skipped": f"error: {e}"}
+        print(f"[bench] {name} done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, tolerance: float):
+    """
+    Returns a list of (suite, metric, old, new, change, regressed) rows.
+    change is signed so that positive always means "worse".
+    """
+    rows = []
+    for suite, metrics in current["results"].items():
+        old_metrics = baseline.get("results", {}).get(suite, {})
+        if "skipped" in metrics or "skipped" in old_metrics:
+            continue
+        for metric, new in metrics.items():
+            old = old_metrics.get(metric)
+            if old is None:
+                continue
+            a, b = old["value"], new["value"]
+            if a == 0:
+                change = 0.0 if b == 0 else float("inf")
+            else:
+                change = (b - a) / abs(a)
+            if new.get("better") == "higher":
+                change = -change
+            rows.append((suite, metric, a, b, change, change > tolerance))
+    return rows
+
+
+def print_results(report: dict):
+    for suite, metrics in report["results"].items():
+        print(f"== {suite}")
+        if "skipped" in metrics:
+            print(f"   skipped: {metrics['skipped']}")
+            continue
+        for metric, r in metrics.items():
+            print(f"   {metric:30s} {r['value']:>14.3f} {r['unit']}")
+
+
+def print_comparison(rows, tolerance: float) -> int:
+    regressions = 0
+    print(f"\n{'suite':10s} {'metric':30s} {'baseline':>12s} {'current':>12s} {'worse by':>9s}")
+    for suite, metric, old, new, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        regressions += regressed
+        print(f"{suite:10s} {metric:30s} {old:>12.3f} {new:>12.3f} {change * 100:>8.1f}%{flag}")
+    print(f"\n{regressions} regression(s) beyond {tolerance * 100:.0f}% tolerance.")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", help="comma-separated subset of: " + ",".join(SUITES))
+    parser.add_argument("--quick", action="store_true", help="smaller workloads")
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a JSON baseline")
+    parser.add_argument("--against", metavar="RESULTS", help="with --compare: use stored results instead of running")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.against:
+        with open(args.against, "r", encoding="utf-8") as f:
+            report = json.load(f)
+    else:
+        names = [n.strip() for n in args.only.split(",")] if args.only else list(SUITES)
+        unknown = [n for n in names if n not in SUITES]
+        if unknown:
+            parser.error(f"unknown suite(s): {', '.join(unknown)}")
+        report = run_suites(names, args.quick)
+    print_results(report)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(baseline, report, args.tolerance)
+        if print_comparison(rows, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
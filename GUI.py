@@ -1,39 +1,54 @@
 import logging
 import tkinter as tk
-from tkinter import ttk, filedialog
+from tkinter import ttk, filedialog, messagebox
 from queue import Queue, Empty
 import threading
 import time
 
-from Modules.log_gui_handler import TkinterQueueHandler
+from Modules.log_gui_handler import TkinterQueueHandler, LogRingBuffer, entry_matches
+from Modules.metrics import registry as metrics
+from Modules.tracing import tracer
+from Modules.event_bus import bus as events, ClickerStarted, ClickerStopped, ClickerPaused, RecoveryPhase, CurseStateChanged
+from Modules.capture_regions import INVENTORY_REGION, HOTBAR_REGION, BLOOD_CURSE_REGION, parse_region, format_region
 
 logger = logging.getLogger("GUI")
 
 class AzerusAppGUI:
     POLL_INTERVAL_MS = 120
+    LOG_CAPACITY = 5000        # lines kept in the ring buffer / widget
+    LOG_QUEUE_MAX = 10000      # records buffered between ticks before dropping
+    LOG_MAX_BATCH = 2000       # records applied per tick
+    LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+    METRICS_REFRESH_MS = 1000
 
-    def __init__(self, shared_state, autoclicker, weapon_return, blood_curse, hotkeys):
+    def __init__(self, shared_state, autoclicker, weapon_return, blood_curse, hotkeys, recorder=None, cv_worker=None):
         self.shared_state = shared_state
         self.autoclicker = autoclicker
         self.weapon_return = weapon_return
         self.blood_curse = blood_curse
         self.hotkeys = hotkeys
+        self.recorder = recorder
+        self.cv_worker = cv_worker
 
         self.root = tk.Tk()
         self.root.title("Azerus Assistant")
         self.root.geometry("1000x640")
 
-        self.log_queue = Queue()
+        self.metrics_window = None
+        self.log_queue = Queue(maxsize=self.LOG_QUEUE_MAX)
+        self.log_ring = LogRingBuffer(self.LOG_CAPACITY)
+        self._shown_dropped = 0
         self._install_logging_handler()
+        # Status labels follow module events, applied on the poll tick.
+        self.events = events.queue(ClickerStarted, ClickerStopped, ClickerPaused, RecoveryPhase, CurseStateChanged)
 
         self._build_layout()
         self._schedule_poll()
-        self._schedule_status_refresh()
 
     def _install_logging_handler(self):
-        handler = TkinterQueueHandler(self.log_queue)
-        handler.setLevel(logging.INFO)
-        logging.getLogger().addHandler(handler)
+        self.log_handler = TkinterQueueHandler(self.log_queue)
+        self.log_handler.setLevel(logging.DEBUG)
+        logging.getLogger().addHandler(self.log_handler)
 
     def _build_layout(self):
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
@@ -69,6 +84,21 @@ class AzerusAppGUI:
         self.log_path_var = tk.StringVar(value=self.weapon_return.log_path or "Not selected")
         ttk.Label(wr_group, textvariable=self.log_path_var, wraplength=260, foreground="gray").grid(row=3, column=0, columnspan=2, sticky="w", padx=4, pady=2)
 
+        # Capture regions group
+        regions = self.weapon_return.capture_regions
+        if regions is not None:
+            cr_group = ttk.LabelFrame(left_frame, text="Capture Regions (left,top,w,h)")
+            cr_group.pack(fill=tk.X, pady=4)
+            self.region_vars = {}
+            for row, (name, label) in enumerate(((INVENTORY_REGION, "Inventory:"), (HOTBAR_REGION, "Hotbar:"),
+                                                 (BLOOD_CURSE_REGION, "Blood curse:"))):
+                var = tk.StringVar(value=format_region(regions.get(name)))
+                self.region_vars[name] = var
+                ttk.Label(cr_group, text=label).grid(row=row, column=0, sticky="w", padx=4)
+                ttk.Entry(cr_group, textvariable=var, width=20).grid(row=row, column=1, sticky="ew", padx=4, pady=2)
+            ttk.Button(cr_group, text="Save Regions", command=self._save_regions).grid(row=3, column=0, sticky="ew", padx=4, pady=2)
+            ttk.Button(cr_group, text="Calibrate (show/hide)", command=regions.toggle_calibration).grid(row=3, column=1, sticky="ew", padx=4, pady=2)
+
         # Blood Curse group
         bc_group = ttk.LabelFrame(left_frame, text="Blood Curse Monitor")
         bc_group.pack(fill=tk.X, pady=4)
@@ -78,6 +108,17 @@ class AzerusAppGUI:
         ttk.Button(bc_group, text="Start", command=self.blood_curse.start).grid(row=1, column=0, sticky="ew", padx=4, pady=2)
         ttk.Button(bc_group, text="Stop", command=self.blood_curse.stop).grid(row=1, column=1, sticky="ew", padx=4, pady=2)
 
+        # Diagnostics group
+        diag_group = ttk.LabelFrame(left_frame, text="Diagnostics")
+        diag_group.pack(fill=tk.X, pady=4)
+        ttk.Button(diag_group, text="Latency Metrics", command=self._open_metrics).grid(row=0, column=0, sticky="ew", padx=4, pady=2)
+        ttk.Button(diag_group, text="Dump Metrics...", command=self._dump_metrics).grid(row=0, column=1, sticky="ew", padx=4, pady=2)
+        if self.recorder is not None:
+            self.record_btn_var = tk.StringVar(value="Record Session...")
+            ttk.Button(diag_group, textvariable=self.record_btn_var, command=self._toggle_recording).grid(row=1, column=0, columnspan=2, sticky="ew", padx=4, pady=2)
+        self.trace_btn_var = tk.StringVar(value="Stop & Save Trace..." if tracer.enabled else "Start Trace")
+        ttk.Button(diag_group, textvariable=self.trace_btn_var, command=self._toggle_trace).grid(row=2, column=0, columnspan=2, sticky="ew", padx=4, pady=2)
+
         # Right logs
         right_frame = ttk.Frame(main_pane)
         main_pane.add(right_frame, weight=3)
@@ -91,8 +132,23 @@ class AzerusAppGUI:
         self.log_text.tag_configure("ERROR", foreground="#ff8a80")
         self.log_text.tag_configure("WARNING", foreground="#ffd54f")
         self.log_text.tag_configure("DEBUG", foreground="#757575")
+        log_controls = ttk.Frame(log_frame)
+        log_controls.pack(fill=tk.X, padx=4)
         self.autoscroll = tk.BooleanVar(value=True)
-        ttk.Checkbutton(log_frame, text="Auto-scroll", variable=self.autoscroll).pack(anchor="w", padx=4)
+        ttk.Checkbutton(log_controls, text="Auto-scroll", variable=self.autoscroll).pack(side=tk.LEFT)
+        ttk.Label(log_controls, text="Level:").pack(side=tk.LEFT, padx=(12, 2))
+        self.log_level_var = tk.StringVar(value="INFO")
+        level_box = ttk.Combobox(log_controls, textvariable=self.log_level_var, values=self.LOG_LEVELS,
+                                 width=9, state="readonly")
+        level_box.pack(side=tk.LEFT)
+        level_box.bind("<<ComboboxSelected>>", lambda _e: self._rerender_logs())
+        ttk.Label(log_controls, text="Filter:").pack(side=tk.LEFT, padx=(12, 2))
+        self.log_filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(log_controls, textvariable=self.log_filter_var, width=24)
+        filter_entry.pack(side=tk.LEFT)
+        filter_entry.bind("<KeyRelease>", lambda _e: self._rerender_logs())
+        self.log_dropped_var = tk.StringVar(value="")
+        ttk.Label(log_controls, textvariable=self.log_dropped_var, foreground="#ff8a80").pack(side=tk.RIGHT)
 
         status_bar = ttk.Frame(self.root)
         status_bar.pack(fill=tk.X)
@@ -107,6 +163,99 @@ class AzerusAppGUI:
         except ValueError:
             logging.error("Invalid CPS value")
 
+    def _save_regions(self):
+        regions = self.weapon_return.capture_regions
+        try:
+            parsed = {name: parse_region(var.get()) for name, var in self.region_vars.items()}
+        except ValueError as e:
+            messagebox.showerror("Capture Regions", f"Invalid region: {e}")
+            return
+        for name, region in parsed.items():
+            regions.set(name, region, save=False)
+        regions.save()
+        logging.info("Capture regions saved")
+
+    def _open_metrics(self):
+        if self.metrics_window is not None and self.metrics_window.winfo_exists():
+            self.metrics_window.lift()
+            return
+        win = tk.Toplevel(self.root)
+        win.title("Latency Metrics")
+        win.geometry("720x360")
+        text = tk.Text(win, wrap="none", background="#111", foreground="#ddd", font=("Courier", 10))
+        text.pack(fill=tk.BOTH, expand=True, padx=4, pady=4)
+        buttons = ttk.Frame(win)
+        buttons.pack(fill=tk.X)
+        ttk.Button(buttons, text="Reset", command=metrics.reset).pack(side=tk.LEFT, padx=4, pady=4)
+        ttk.Button(buttons, text="Dump...", command=self._dump_metrics).pack(side=tk.LEFT, padx=4, pady=4)
+        self.metrics_window = win
+        self._refresh_metrics(text)
+
+    def _refresh_metrics(self, text):
+        if self.metrics_window is None or not self.metrics_window.winfo_exists():
+            self.metrics_window = None
+            return
+        stats = self.autoclicker.get_timing_stats()
+        body = metrics.format_table() + (
+            f"\n\nAutoClicker: {stats['achieved_cps']:.2f}/{stats['target_cps']:.2f} CPS, "
+            f"jitter mean={stats['jitter_mean_us']:.0f}us std={stats['jitter_std_us']:.0f}us "
+            f"max={stats['jitter_max_us']:.0f}us, skipped={stats['skipped']}"
+        )
+        fast = self.weapon_return.weapon_library.fast_path_stats()
+        body += (f"\nWeapon fast path: {fast['hits']}/{fast['lookups']} hits ({fast['hit_rate'] * 100:.0f}%), "
+                 f"{fast['fast_mean_ms']:.3f} ms vs full {fast['full_mean_ms']:.2f} ms, saved {fast['saved_ms']:.1f} ms")
+        if self.cv_worker is not None:
+            w = self.cv_worker.stats()
+            body += (f"\nCV worker: {'healthy' if w['healthy'] else 'DOWN'} pid={w['pid']} "
+                     f"requests={w['requests']} failures={w['failures']} restarts={w['restarts']}")
+        weapons = self.weapon_return.weapon_library.stats()
+        if weapons:
+            body += "\n\nWeapon templates:"
+            for name, w in sorted(weapons.items()):
+                body += (f"\n  {name:<24} hits={w['hits']}/{w['searches']} last={w['last_confidence']:.3f} "
+                         f"mean={w['mean_confidence']:.3f} max={w['max_confidence']:.3f} ({w['last_ms']:.2f} ms)")
+        text.configure(state="normal")
+        text.delete("1.0", "end")
+        text.insert("end", body)
+        text.configure(state="disabled")
+        self.root.after(self.METRICS_REFRESH_MS, self._refresh_metrics, text)
+
+    def _dump_metrics(self):
+        path = filedialog.asksaveasfilename(title="Dump latency metrics", defaultextension=".json",
+                                            filetypes=[("JSON", "*.json")])
+        if path:
+            try:
+                metrics.dump(path)
+            except OSError as e:
+                logging.error(f"Metrics dump failed: {e}")
+
+    def _toggle_trace(self):
+        if not tracer.enabled:
+            tracer.start()
+            self.trace_btn_var.set("Stop & Save Trace...")
+            return
+        tracer.stop()
+        self.trace_btn_var.set("Start Trace")
+        path = filedialog.asksaveasfilename(title="Save trace", defaultextension=".json",
+                                            initialfile=tracer.path, filetypes=[("Chrome trace", "*.json")])
+        if path:
+            try:
+                tracer.export(path)
+            except OSError as e:
+                logging.error(f"Trace export failed: {e}")
+
+    def _toggle_recording(self):
+        if self.recorder.recording:
+            self.recorder.stop()
+            self.record_btn_var.set("Record Session...")
+            return
+        path = filedialog.asksaveasfilename(title="Record session to", defaultextension=".zip",
+                                            filetypes=[("Session", "*.zip")])
+        if path:
+            self.recorder.start(path)
+            if self.recorder.recording:
+                self.record_btn_var.set("Stop Recording")
+
     def _choose_log(self):
         path = filedialog.askopenfilename(title="Select Minecraft log file")
         if path:
@@ -114,43 +263,90 @@ class AzerusAppGUI:
             self.log_path_var.set(path)
 
     def _schedule_poll(self):
-        self.root.after(self.POLL_INTERVAL_MS, self._poll_logs)
+        self.root.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        with tracer.span("gui.poll", cat="gui"):
+            self._apply_events()
+            self._poll_logs()
+        self._schedule_poll()
+
+    def _log_filter(self):
+        return logging.getLevelName(self.log_level_var.get()), self.log_filter_var.get().strip().lower()
 
     def _poll_logs(self):
+        batch = []
         try:
-            while True:
-                record = self.log_queue.get_nowait()
-                self._append_log(record)
+            while len(batch) < self.LOG_MAX_BATCH:
+                batch.append(self.log_queue.get_nowait())
         except Empty:
             pass
-        self._schedule_poll()
+        if batch:
+            self.log_ring.extend(batch)
+            min_level, text = self._log_filter()
+            self._insert_logs([e for e in batch if entry_matches(e, min_level, text)])
 
-    def _append_log(self, record):
+        dropped = self.log_handler.dropped
+        if dropped != self._shown_dropped:
+            self._shown_dropped = dropped
+            self.log_dropped_var.set(f"Dropped: {dropped}")
+
+    def _insert_logs(self, entries):
+        """
+        Appends entries with a single Text.insert, then trims the widget to
+        LOG_CAPACITY lines.
+        """
+        if not entries:
+            return
+        args = []
+        for _, levelname, message in entries:
+            args.append(message + "\n")
+            args.append(levelname)
         self.log_text.configure(state="normal")
-        tag = record.levelname
-        self.log_text.insert("end", record.message + "\n", tag)
+        self.log_text.insert("end", *args)
+        lines = int(self.log_text.index("end-1c").split(".")[0]) - 1
+        excess = lines - self.LOG_CAPACITY
+        if excess > 0:
+            self.log_text.delete("1.0", f"{excess + 1}.0")
         if self.autoscroll.get():
             self.log_text.see("end")
         self.log_text.configure(state="disabled")
 
-    def _schedule_status_refresh(self):
-        self.root.after(500, self._refresh_status)
-
-    def _refresh_status(self):
-        self.ac_status_var.set("ON" if self.autoclicker.is_running() else "OFF")
-        self.ac_status_var.set(self.ac_status_var.get())
-        color = "green" if self.autoclicker.is_running() else "red"
-        # Change color dynamically
-        for tag in self.log_text.tag_names():
-            pass
-        self.wr_status_var.set(self.weapon_return.last_action)
-        self.bc_active_var.set("Active" if self.blood_curse.curse_active else "Not Detected")
+    def _rerender_logs(self):
+        self.log_text.configure(state="normal")
+        self.log_text.delete("1.0", "end")
+        self.log_text.configure(state="disabled")
+        self._insert_logs(self.log_ring.filtered(*self._log_filter()))
 
-        self._schedule_status_refresh()
+    def _apply_events(self):
+        for event in self.events.drain():
+            if event.client != self.autoclicker.client:
+                continue
+            if isinstance(event, ClickerStarted):
+                self.ac_status_var.set("ON")
+            elif isinstance(event, ClickerStopped):
+                self.ac_status_var.set("OFF")
+            elif isinstance(event, ClickerPaused):
+                self.ac_status_var.set("PAUSED" if event.paused else "ON")
+            elif isinstance(event, RecoveryPhase):
+                self.wr_status_var.set(event.status)
+            elif isinstance(event, CurseStateChanged):
+                if event.active:
+                    self.bc_active_var.set(f"Active since {time.strftime('%H:%M:%S', time.localtime(event.since))}")
+                else:
+                    self.bc_active_var.set("Not Detected")
 
     def _on_close(self):
         self.status_var.set("Closing...")
+        if self.recorder is not None:
+            self.recorder.stop()
+        if self.weapon_return.capture_regions is not None:
+            self.weapon_return.capture_regions.stop_calibration()
         self.root.after(50, self.root.destroy)
 
-    def run(self):
+    def run(self, on_shown=None):
+        """Runs the Tk main loop; `on_shown` is called once the window has been drawn."""
+        if on_shown is not None:
+            # after_idle lets the first layout/paint run before the callback is queued.
+            self.root.after_idle(lambda: self.root.after(0, on_shown))
         self.root.mainloop()
\ No newline at end of file
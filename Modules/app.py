@@ -0,0 +1,131 @@
+import logging
+from typing import Callable, Optional
+
+from Modules.auto_attack import AutoClicker
+from Modules.weapon_return import WeaponReturnWatcher
+from Modules.blood_curse import BloodCurseWatcher
+from Modules.hotkeys import GlobalHotkeyManager
+from Modules.shared_state import SharedState
+from Modules.template_bank import TemplateBank
+from Modules.config import ConfigStore
+from Modules.capture_regions import CaptureRegions
+from Modules.triggers import TriggerEngine
+from Modules.capture import FrameCaptureService
+from Modules.session_recorder import SessionRecorder
+from Modules.input_backend import create_backend_from_config
+from Modules.weapon_library import WeaponLibrary
+from Modules.cv_worker import CVWorker
+from Modules.startup import StartupProfile, WarmUp
+from Modules.calibration import Calibrator
+from Modules.clients import ClientManager, ClientProfile
+from Modules.tracing import tracer
+
+logger = logging.getLogger("App")
+
+
+class AppModules:
+    """
+    Every non-UI module of one Azerus instance, wired together. Shared by
+    the Tk front end (main.py) and the headless one (headless.py).
+
+    Construction only builds objects (timed as phases of `profile`);
+    start() launches the log watcher(s) and the background warm-up, and
+    shutdown() stops everything in dependency order.
+    """
+
+    def __init__(self, config: Optional[ConfigStore] = None, profile: Optional[StartupProfile] = None):
+        self.profile = profile if profile is not None else StartupProfile()
+
+        with self.profile.phase("config"):
+            self.config = config if config is not None else ConfigStore()
+            tracer.configure(self.config)
+            self.shared_state = SharedState()
+            self.template_bank = TemplateBank.from_config(self.config)
+            self.capture_regions = CaptureRegions(self.config)
+            self.trigger_engine = TriggerEngine.from_config(self.config)
+        with self.profile.phase("backends"):
+            self.capture_service = FrameCaptureService.from_config(self.config)
+            self.input_backend = create_backend_from_config(self.config)
+        with self.profile.phase("weapons"):
+            # Templates are decoded (or loaded pre-scaled from the calibration
+            # cache) by the warm-up thread once the front end is up.
+            self.calibrator = Calibrator(self.config, self.template_bank, self.capture_service,
+                                         self.capture_regions, self.input_backend)
+            self.weapon_library = WeaponLibrary.from_config(self.config, self.template_bank, preload=False)
+            self.cv_worker = CVWorker.from_config(self.config, self.weapon_library)
+            if self.cv_worker is not None:
+                self.cv_worker.start()
+                self.weapon_library.set_remote(self.cv_worker)
+            # Extra game clients ("clients" in the config) share the capture
+            # service, templates, log follower thread and input device with the
+            # main one; the main client then goes through the input dispatcher too.
+            self.clients = ClientManager.from_config(self.config, self.capture_service, self.input_backend,
+                                                     self.template_bank, self.weapon_library,
+                                                     calibration=self.calibrator)
+            client_input = (self.clients.dispatcher.client(ClientProfile("main"))
+                            if self.clients is not None else self.input_backend)
+
+        with self.profile.phase("watchers"):
+            self.autoclicker = AutoClicker(shared_state=self.shared_state, input_backend=client_input)
+            self.weapon_return = WeaponReturnWatcher(shared_state=self.shared_state, autoclicker=self.autoclicker,
+                                                     template_bank=self.template_bank,
+                                                     capture_regions=self.capture_regions,
+                                                     trigger_engine=self.trigger_engine,
+                                                     capture_service=self.capture_service,
+                                                     input_backend=client_input,
+                                                     weapon_library=self.weapon_library,
+                                                     calibration=self.calibrator,
+                                                     log_follower=self.clients.log_follower if self.clients is not None else None)
+            self.blood_curse = BloodCurseWatcher(shared_state=self.shared_state, autoclicker=self.autoclicker,
+                                                 template_bank=self.template_bank,
+                                                 capture_regions=self.capture_regions,
+                                                 capture_service=self.capture_service,
+                                                 preload_templates=False)
+
+            self.recorder = SessionRecorder(config=self.config, capture_service=self.capture_service,
+                                            weapon_return=self.weapon_return, shared_state=self.shared_state,
+                                            input_backend=self.input_backend)
+
+            self.hotkeys = GlobalHotkeyManager()
+            self.hotkeys.register_hotkey("F6", self.autoclicker.toggle)
+            self.hotkeys.register_hotkey("F4", self.weapon_return.manual_trigger)
+            if self.clients is not None:
+                self.hotkeys.register_hotkey("F7", self.clients.toggle)
+
+        self.warmup: Optional[WarmUp] = None
+
+    # ------------- Public API -------------
+
+    def start(self, on_warm: Optional[Callable[[], None]] = None):
+        """
+        Starts the log watcher(s) and the background warm-up. Watching starts
+        first so no knockout is missed; a recovery that fires before the
+        warm-up is done loads the templates itself (see
+        WeaponReturnWatcher._ensure_templates).
+        """
+        if self.clients is not None:
+            self.clients.start()
+        self.weapon_return.start()
+        self.warmup = WarmUp(self.template_bank, self.profile, on_done=on_warm, calibrator=self.calibrator)
+        self.warmup.start()
+
+    def shutdown(self):
+        logger.info("Shutting down modules...")
+        self.weapon_return.stop()
+        if self.clients is not None:
+            self.clients.stop()
+        self.blood_curse.stop()
+        self.autoclicker.stop()
+        self.hotkeys.stop()
+        self.template_bank.stop()
+        if self.cv_worker is not None:
+            self.cv_worker.stop()
+        self.capture_service.stop()
+        if self.input_backend is not None:
+            self.input_backend.close()
+        if tracer.enabled:
+            tracer.stop()
+            try:
+                tracer.export()
+            except OSError as e:
+                logger.error(f"Trace export failed: {e}")
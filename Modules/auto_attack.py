@@ -3,10 +3,10 @@ import time
 import logging
 from typing import Optional, Callable
 
-try:
-    import pyautogui
-except ImportError:
-    pyautogui = None
+from Modules.click_scheduler import ClickScheduler
+from Modules.input_backend import InputBackend, create_backend
+from Modules.metrics import registry as metrics
+from Modules.event_bus import bus as events, ClickerStarted, ClickerStopped, ClickerPaused
 
 logger = logging.getLogger("AutoClicker")
 
@@ -16,18 +16,29 @@ class AutoClicker:
     AutoClicker with:
       - last_click_time (for latency diagnostics)
       - early_stop_fn (checked twice per click cycle)
-      - minimal sleep granularity for quick abort
+      - absolute-deadline ClickScheduler (no drift, bounded jitter)
+      - immediate wake-up on stop / disallow via _wake_event
+      - pause/resume through the SharedState gate: while clicks are
+        disallowed the thread parks (zero CPU) instead of exiting, and every
+        click is bracketed by begin_click()/end_click() for quiesce checks
+      - ClickerStarted / ClickerPaused / ClickerStopped events on the bus
+        (tagged with `client`), never per click
     """
 
     def __init__(self, shared_state, button="left", clicks_per_second=10.0,
-                 early_stop_fn: Optional[Callable[[], bool]] = None):
+                 early_stop_fn: Optional[Callable[[], bool]] = None,
+                 input_backend: Optional[InputBackend] = None, client: str = "main"):
         self.shared_state = shared_state
+        self.client = client
         self.button = button
         self.clicks_per_second = clicks_per_second
         self.early_stop_fn = early_stop_fn
+        self.input = input_backend if input_backend is not None else create_backend()
 
         self._thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._scheduler = ClickScheduler(clicks_per_second)
         self._active_flag = False
         self._idle_event = threading.Event()
         self._idle_event.set()
@@ -36,6 +47,8 @@ class AutoClicker:
         self._user_intended_on = False
         self.last_click_time = 0.0
 
+        self.shared_state.add_allowed_listener(self._on_allowed_changed)
+
     # ------------- API -------------
 
     def set_early_stop_fn(self, fn: Optional[Callable[[], bool]]):
@@ -49,11 +62,21 @@ class AutoClicker:
             if cps <= 0:
                 raise ValueError("CPS must be > 0")
             self.clicks_per_second = cps
+            self._scheduler.set_rate(cps)
         logger.info(f"[AutoClicker] CPS set to {cps}")
 
+    def get_timing_stats(self) -> dict:
+        """
+        Achieved rate and deadline jitter of the current / last run.
+        """
+        return self._scheduler.stats()
+
     def is_running(self):
         return self._active_flag and self._thread and self._thread.is_alive()
 
+    def is_paused(self) -> bool:
+        return bool(self.is_running() and not self.shared_state.is_autoclicker_allowed())
+
     def toggle(self):
         if self.is_running():
             self._user_intended_on = False
@@ -71,20 +94,24 @@ class AutoClicker:
             return
         if self.is_running():
             return
-        if pyautogui is None:
-            logger.error("[AutoClicker] pyautogui not installed.")
+        if self.input is None:
+            logger.error("[AutoClicker] No input backend available.")
             return
         logger.info("[AutoClicker] Starting thread.")
         self._stop_event.clear()
+        self._wake_event.clear()
         self._thread = threading.Thread(target=self._run, name="AutoClickerThread", daemon=True)
         self._active_flag = True
         self._thread.start()
+        events.publish(ClickerStarted(self.clicks_per_second, self.client))
 
     def stop(self, timeout: float = 0.6):
         if not self.is_running():
             return
         logger.info("[AutoClicker] Stopping (graceful).")
         self._stop_event.set()
+        self._wake_event.set()
+        self.shared_state.wake_waiters()
         self._thread.join(timeout=timeout)
         self._active_flag = False
         self._idle_event.set()
@@ -95,19 +122,25 @@ class AutoClicker:
             return
         logger.info("[AutoClicker] FORCE stop.")
         self._stop_event.set()
-        start = time.time()
-        while self._thread.is_alive() and (time.time() - start) < max_wait:
-            time.sleep(0.0015)
+        self._wake_event.set()
+        self.shared_state.wake_waiters()
+        self._thread.join(timeout=max_wait)
         if self._thread.is_alive():
             logger.error("[AutoClicker] FORCE stop timeout (thread still alive).")
         self._active_flag = False
         self._idle_event.set()
         self._flush_mouse()
 
+    def _on_allowed_changed(self, allowed: bool):
+        # Interrupt a pending deadline wait so the loop re-checks the gate now.
+        self._wake_event.set()
+        if self._active_flag:
+            events.publish(ClickerPaused(not allowed, self.client))
+
     def _flush_mouse(self):
-        if pyautogui:
+        if self.input is not None:
             try:
-                pyautogui.mouseUp(button=self.button)
+                self.input.mouse_up(self.button)
             except Exception:
                 pass
 
@@ -115,8 +148,13 @@ class AutoClicker:
 
     def _run(self):
         logger.debug("[AutoClicker] Loop start.")
-        next_time = time.time()
-        interval = 1.0 / self.clicks_per_second
+        sched = self._scheduler
+        with self._lock:
+            sched.set_rate(self.clicks_per_second)
+        sched.reset()
+        interval_hist = metrics.histogram("click.interval")
+        call_hist = metrics.histogram("click.call")
+        prev_start = 0
 
         while not self._stop_event.is_set():
             if self.early_stop_fn and self.early_stop_fn():
@@ -126,36 +164,50 @@ class AutoClicker:
             if not self.shared_state.is_autoclicker_allowed():
                 if not self._idle_event.is_set():
                     self._idle_event.set()
-                time.sleep(0.01)
+                # Parked on the gate's condition; woken by allow or stop().
+                self.shared_state.wait_until_allowed(abort=self._stop_event.is_set)
+                self._wake_event.clear()
+                sched.resync()
+                prev_start = 0
                 continue
 
-            now = time.time()
-            if now >= next_time:
-                self._idle_event.clear()
+            deadline = sched.wait_next(self._wake_event)
+            if deadline is None:
+                self._wake_event.clear()
+                continue
 
-                # Final gates
-                if self.early_stop_fn and self.early_stop_fn():
-                    self._idle_event.set()
-                    break
-                if not self.shared_state.is_autoclicker_allowed():
-                    self._idle_event.set()
-                    continue
-
-                try:
-                    pyautogui.click(button=self.button)
-                    self.last_click_time = now
-                except Exception as e:
-                    logger.error(f"[AutoClicker] Click failed: {e}")
-                    self._stop_event.set()
-                    break
-                finally:
-                    self._idle_event.set()
+            self._idle_event.clear()
+
+            # Final gates
+            if self.early_stop_fn and self.early_stop_fn():
+                self._idle_event.set()
+                break
+            if not self.shared_state.begin_click():
+                self._idle_event.set()
+                continue
+
+            try:
+                start = time.perf_counter_ns()
+                self.input.click(self.button)
+                call_hist.record(time.perf_counter_ns() - start)
+                self.last_click_time = time.time()
+            except Exception as e:
+                logger.error(f"[AutoClicker] Click failed: {e}")
+                self._stop_event.set()
+                break
+            finally:
+                self.shared_state.end_click()
+                self._idle_event.set()
 
-                next_time = now + interval
-            else:
-                # Sleep tiny slices for fast abort
-                time.sleep(min(0.0012, max(0.0, next_time - now)))
+            if prev_start:
+                interval_hist.record(start - prev_start)
+            prev_start = start
+            sched.mark_fired(deadline, start)
 
         self._idle_event.set()
         self._active_flag = False
-        logger.debug("[AutoClicker] Loop exit.")
\ No newline at end of file
+        s = sched.stats()
+        logger.info(f"[AutoClicker] Loop exit: {s['clicks']} clicks, {s['achieved_cps']:.2f}/{s['target_cps']:.2f} CPS, "
+                    f"jitter mean={s['jitter_mean_us']:.0f}us std={s['jitter_std_us']:.0f}us max={s['jitter_max_us']:.0f}us, "
+                    f"skipped={s['skipped']}")
+        events.publish(ClickerStopped(s["clicks"], s["achieved_cps"], self.client))
@@ -0,0 +1,218 @@
+import time
+import threading
+import logging
+from collections import deque
+from typing import Callable, List, Optional, Tuple
+
+from Modules.lazy_import import lazy_import
+from Modules.template_bank import TemplateBank
+from Modules.capture_regions import CaptureRegions, BLOOD_CURSE_REGION
+from Modules.capture import FrameCaptureService, create_backend
+from Modules.metrics import registry as metrics
+from Modules.event_bus import bus as events, CurseStateChanged
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+logger = logging.getLogger("BloodCurse")
+
+ACTIVE_TEMPLATE = "blood_curse_active"
+CLEARED_TEMPLATE = "blood_curse_cleared"
+
+SIGNATURE_SIZE = (16, 16)
+
+
+class BloodCurseWatcher:
+    """
+    Watches the blood-curse status region at `rate_hz` and reports curse
+    state transitions with timestamps.
+
+    The region is a subscription on the shared FrameCaptureService, so it is
+    grabbed together with any other periodic consumer. Each frame is reduced
+    to a 16x16 grayscale signature. Template matching runs only when that signature
+    differs from the last evaluated one by more than `change_threshold`
+    (mean absolute difference, in gray levels), plus a forced re-check every
+    `recheck_interval` seconds. At steady state a tick costs one small grab
+    and a resize.
+
+    State rules: the "active" template above threshold means cursed; the
+    "cleared" template above threshold means not cursed; neither for
+    `absent_ticks` evaluations in a row also means not cursed.
+    """
+
+    def __init__(
+        self,
+        shared_state,
+        autoclicker,
+        template_bank: Optional[TemplateBank] = None,
+        capture_regions: Optional[CaptureRegions] = None,
+        active_template_path: str = "Assets/blood_curse_active.png",
+        cleared_template_path: str = "Assets/blood_curse_cleared.png",
+        rate_hz: float = 4.0,
+        match_threshold: float = 0.8,
+        change_threshold: float = 2.0,
+        recheck_interval: float = 5.0,
+        absent_ticks: int = 2,
+        capture_service: Optional[FrameCaptureService] = None,
+        preload_templates: bool = True
+    ):
+        self.shared_state = shared_state
+        self.autoclicker = autoclicker
+        self.capture_regions = capture_regions
+        self.rate_hz = rate_hz
+        self.match_threshold = match_threshold
+        self.change_threshold = change_threshold
+        self.recheck_interval = recheck_interval
+        self.absent_ticks = absent_ticks
+        self._owns_capture = capture_service is None
+        self.capture = capture_service if capture_service is not None else FrameCaptureService(create_backend())
+
+        if template_bank is None:
+            template_bank = TemplateBank()
+        template_bank.register(ACTIVE_TEMPLATE, active_template_path, load=False)
+        template_bank.register(CLEARED_TEMPLATE, cleared_template_path, load=False)
+        if preload_templates:
+            template_bank.load_all()
+        self.template_bank = template_bank
+
+        self.curse_active = False
+        self.last_change_time: Optional[float] = None
+        self.transitions = deque(maxlen=200)  # (wall time, active)
+        self.ticks = 0
+        self.evaluations = 0
+
+        self._listeners: List[Callable[[bool, float], None]] = []
+        self._last_signature = None
+        self._last_eval = 0.0
+        self._absent = 0
+        self._warned_no_region = False
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------- Public API -------------
+
+    def add_listener(self, callback: Callable[[bool, float], None]):
+        """
+        callback(active, timestamp) runs on the watcher thread on every transition.
+        """
+        self._listeners.append(callback)
+
+    def is_running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def start(self):
+        if self.is_running():
+            return
+        if not cv2 or not np or not self.capture.available:
+            logger.error("[BloodCurse] Capture backend/OpenCV/numpy not available.")
+            return
+        self._stop_event.clear()
+        self._last_signature = None
+        self._thread = threading.Thread(target=self._loop, name="BloodCurseThread", daemon=True)
+        self._thread.start()
+        logger.info(f"[BloodCurse] Monitor started ({self.rate_hz:g} Hz).")
+
+    def stop(self):
+        if not self.is_running():
+            return
+        self._stop_event.set()
+        self._thread.join(timeout=2.0)
+        if self._owns_capture:
+            self.capture.stop()
+        logger.info(f"[BloodCurse] Monitor stopped ({self.evaluations}/{self.ticks} ticks matched).")
+
+    def get_transitions(self) -> List[Tuple[float, bool]]:
+        return list(self.transitions)
+
+    # ------------- Internal Thread -------------
+
+    def _loop(self):
+        interval = 1.0 / self.rate_hz
+        sub = None
+        try:
+            while not self._stop_event.is_set():
+                region = self.capture_regions.get(BLOOD_CURSE_REGION) if self.capture_regions else None
+                if region is None:
+                    if not self._warned_no_region:
+                        logger.warning("[BloodCurse] No 'blood_curse' capture region configured; monitor idle.")
+                        self._warned_no_region = True
+                    if sub is not None:
+                        self.capture.unsubscribe(sub)
+                        sub = None
+                    self._stop_event.wait(interval)
+                    continue
+                self._warned_no_region = False
+                if sub is None:
+                    sub = self.capture.subscribe("blood_curse", region, self.rate_hz)
+                elif sub.region != region:
+                    sub.region = region
+                    self._last_signature = None
+
+                result = sub.wait_next(timeout=interval * 2)
+                if result is None:
+                    self._stop_event.wait(interval)
+                    continue
+                try:
+                    with metrics.timed("blood_curse.tick"):
+                        self._tick(result[1])
+                except Exception as e:
+                    logger.error(f"[BloodCurse] Tick failed: {e}")
+        finally:
+            if sub is not None:
+                self.capture.unsubscribe(sub)
+
+    def _tick(self, rgb):
+        self.ticks += 1
+        gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+        signature = cv2.resize(gray, SIGNATURE_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+        now = time.monotonic()
+        if (self._last_signature is not None
+                and now - self._last_eval < self.recheck_interval
+                and float(np.mean(np.abs(signature - self._last_signature))) < self.change_threshold):
+            return  # Region unchanged: skip matching entirely.
+
+        self._last_signature = signature
+        self._last_eval = now
+        self.evaluations += 1
+        with metrics.timed("blood_curse.match"):
+            active_conf = self._best(gray, ACTIVE_TEMPLATE)
+            cleared_conf = self._best(gray, CLEARED_TEMPLATE)
+        logger.debug(f"[BloodCurse] active={active_conf:.3f} cleared={cleared_conf:.3f}")
+
+        if active_conf >= self.match_threshold and active_conf >= cleared_conf:
+            self._absent = 0
+            self._set_state(True)
+        elif cleared_conf >= self.match_threshold:
+            self._absent = 0
+            self._set_state(False)
+        else:
+            self._absent += 1
+            if self._absent >= self.absent_ticks:
+                self._set_state(False)
+            elif self.curse_active:
+                # Re-evaluate next tick even if the region stays unchanged.
+                self._last_signature = None
+
+    def _best(self, gray, name: str) -> float:
+        tpl = self.template_bank.get(name)
+        if tpl is None or gray.shape[0] < tpl.height or gray.shape[1] < tpl.width:
+            return 0.0
+        _, max_val, _, _ = cv2.minMaxLoc(tpl.match(gray))
+        return float(max_val)
+
+    def _set_state(self, active: bool):
+        if active == self.curse_active:
+            return
+        ts = time.time()
+        self.curse_active = active
+        self.last_change_time = ts
+        self.transitions.append((ts, active))
+        logger.info(f"[BloodCurse] Curse {'APPLIED' if active else 'CLEARED'} at {time.strftime('%H:%M:%S', time.localtime(ts))}.")
+        events.publish(CurseStateChanged(active, ts))
+        for cb in list(self._listeners):
+            try:
+                cb(active, ts)
+            except Exception as e:
+                logger.error(f"[BloodCurse] Listener failed: {e}")
@@ -0,0 +1,310 @@
+"""
+Per-display calibration, computed once and cached on disk.
+
+Everything that depends on the display is derived here instead of being
+assumed or recomputed per recovery:
+
+    template_scale   1.0 (the templates in Assets/ were cut 1:1 from a GUI
+                     scale 2 screen) unless "gui_scale" or "template_scale"
+                     is configured; see template_scale_for()
+    regions          capture regions, rescaled if they were drawn at
+                     another resolution
+    neutral_point    where the cursor parks while the inventory opens
+    probe_region     centre square watched for inventory open/close
+    slot_grid        hotbar slot centres (hotbar region split evenly)
+    templates        every registered template pre-scaled (bgr/gray/mask)
+
+The result is stored as calibration_cache/<w>x<h>_t<template_scale>.npz:
+
+    meta             JSON string (version, screen, scales, geometry, hash)
+    <name>.bgr / <name>.gray / <name>.mask   template arrays
+
+The cache is keyed by resolution and template scale and carries a hash of the
+template files and calibration inputs; a different display picks another
+file, and changed assets or settings rebuild it.
+
+Config: {"calibration": {"gui_scale": null, "template_scale": null,
+"hotbar_slots": 9, "cache_dir": "calibration_cache"}}
+
+"gui_scale" is Minecraft's integer GUI scale setting (0 or "auto" for
+Auto); "template_scale" overrides the template factor directly.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+import zipfile
+from typing import Dict, List, Optional, Tuple
+
+from Modules.lazy_import import lazy_import
+from Modules.capture_regions import HOTBAR_REGION
+from Modules.metrics import registry as metrics
+
+np = lazy_import("numpy")
+
+logger = logging.getLogger("Calibration")
+
+Region = Tuple[int, int, int, int]
+
+CONFIG_KEY = "calibration"
+FORMAT_VERSION = 2
+ASSET_GUI_SCALE = 2  # GUI scale the Assets/ templates were cut at (36 px slots)
+MIN_GUI_SIZE = (320, 240)  # Minecraft's smallest scaled GUI, see minecraft_gui_scale()
+PROBE_SIZE = 96  # side of the centre-screen probe square at template scale 1, px
+SLOT_SIZE = 36  # inventory slot side at template scale 1, px
+
+DEFAULT_CACHE_DIR = "calibration_cache"
+DEFAULT_HOTBAR_SLOTS = 9
+
+
+def minecraft_gui_scale(screen: Tuple[int, int], setting: int = 0) -> int:
+    """
+    The GUI scale Minecraft uses for a window of `screen` size: the setting
+    itself, capped (and for 0 = Auto, maximised) so the scaled GUI stays at
+    least 320x240 - the same loop as the game's Window.calculateScale.
+    """
+    w, h = screen
+    scale = 1
+    while (scale != setting and scale < w and scale < h
+           and w // (scale + 1) >= MIN_GUI_SIZE[0] and h // (scale + 1) >= MIN_GUI_SIZE[1]):
+        scale += 1
+    return scale
+
+
+def template_scale_for(screen: Tuple[int, int], gui_scale=None, template_scale: Optional[float] = None) -> float:
+    """
+    Factor applied to the Assets/ templates. Minecraft's GUI grows in
+    integer steps that do not follow the screen height, so without an
+    explicit setting the templates are used 1:1.
+    """
+    if template_scale is not None:
+        return float(template_scale)
+    if gui_scale is None:
+        return 1.0
+    setting = 0 if gui_scale == "auto" else int(gui_scale)
+    return minecraft_gui_scale(screen, setting) / ASSET_GUI_SCALE
+
+
+class Calibration:
+    """Derived display geometry and pre-scaled templates for one screen setup."""
+
+    def __init__(self, screen: Tuple[int, int], gui_scale, template_scale: float,
+                 regions: Dict[str, Region], neutral_point: Tuple[int, int], probe_region: Region,
+                 slot_grid: List[Tuple[int, int]], asset_hash: str, templates=None, source: str = "built"):
+        self.screen = screen
+        self.gui_scale = gui_scale
+        self.template_scale = template_scale
+        self.regions = regions
+        self.neutral_point = neutral_point
+        self.probe_region = probe_region
+        self.slot_grid = slot_grid
+        self.asset_hash = asset_hash
+        self.templates = templates or {}  # name -> (bgr, gray, mask)
+        self.source = source
+
+    def slot_center(self, index: int) -> Optional[Tuple[int, int]]:
+        """Centre of hotbar slot `index` (0-based), or None without a hotbar region."""
+        if 0 <= index < len(self.slot_grid):
+            return self.slot_grid[index]
+        return None
+
+    def meta(self) -> dict:
+        return {
+            "version": FORMAT_VERSION,
+            "screen": list(self.screen),
+            "gui_scale": self.gui_scale,
+            "template_scale": self.template_scale,
+            "regions": {k: list(v) for k, v in self.regions.items()},
+            "neutral_point": list(self.neutral_point),
+            "probe_region": list(self.probe_region),
+            "slot_grid": [list(p) for p in self.slot_grid],
+            "asset_hash": self.asset_hash,
+            "templates": sorted(self.templates),
+        }
+
+    @classmethod
+    def from_meta(cls, meta: dict, templates, source: str) -> "Calibration":
+        return cls(
+            screen=tuple(meta["screen"]),
+            gui_scale=meta["gui_scale"],
+            template_scale=meta["template_scale"],
+            regions={k: tuple(v) for k, v in meta["regions"].items()},
+            neutral_point=tuple(meta["neutral_point"]),
+            probe_region=tuple(meta["probe_region"]),
+            slot_grid=[tuple(p) for p in meta["slot_grid"]],
+            asset_hash=meta["asset_hash"],
+            templates=templates,
+            source=source,
+        )
+
+
+class Calibrator:
+    """
+    Detects the display, then loads or builds its Calibration and applies
+    it: the template bank gets the scale and the cached templates, capture
+    regions are rescaled to the screen. `current` is None until ensure()
+    has run (recoveries fall back to their own defaults meanwhile).
+    ensure() can be called again after a display change.
+    """
+
+    def __init__(self, config, template_bank, capture_service, capture_regions=None,
+                 input_backend=None, cache_dir: Optional[str] = None):
+        settings = (config.get(CONFIG_KEY) if config is not None else None) or {}
+        self.template_bank = template_bank
+        self.capture = capture_service
+        self.capture_regions = capture_regions
+        self.input = input_backend
+        self.gui_scale = settings.get("gui_scale")
+        self.template_scale = settings.get("template_scale")
+        self.hotbar_slots = int(settings.get("hotbar_slots", DEFAULT_HOTBAR_SLOTS))
+        self.cache_dir = cache_dir or settings.get("cache_dir", DEFAULT_CACHE_DIR)
+        self._lock = threading.Lock()
+        self._current: Optional[Calibration] = None
+
+    # ------------- Public API -------------
+
+    @property
+    def current(self) -> Optional[Calibration]:
+        return self._current
+
+    def detect_screen(self) -> Optional[Tuple[int, int]]:
+        if self.capture is not None and self.capture.available:
+            size = self.capture.screen_size()
+        elif self.input is not None:
+            size = self.input.screen_size()
+        else:
+            return None
+        return size if size and size[0] > 0 and size[1] > 0 else None
+
+    def cache_path(self, screen: Tuple[int, int]) -> str:
+        scale = template_scale_for(screen, self.gui_scale, self.template_scale)
+        return os.path.join(self.cache_dir, f"{screen[0]}x{screen[1]}_t{scale:g}.npz")
+
+    def ensure(self) -> Optional[Calibration]:
+        with self._lock:
+            start = time.perf_counter_ns()
+            screen = self.detect_screen()
+            if screen is None or not np:
+                logger.warning("[Calibration] Display size unknown; using unscaled templates.")
+                self.template_bank.load_all()
+                return None
+            if self.capture_regions is not None:
+                self.capture_regions.rescale(screen)
+            asset_hash = self._asset_hash(screen)
+            path = self.cache_path(screen)
+            cal = self._read(path, asset_hash)
+            if cal is not None:
+                self.template_bank.set_scale(cal.template_scale, reload=False)
+                for name in self.template_bank.paths():
+                    if name not in cal.templates or not self.template_bank.install(name, *cal.templates[name]):
+                        self.template_bank.load_all()
+                        break
+            else:
+                cal = self._build(screen, asset_hash)
+                self._write(path, cal)
+            self._current = cal
+            elapsed = time.perf_counter_ns() - start
+            metrics.record(f"calibration.{cal.source}", elapsed)
+            logger.info(f"[Calibration] {screen[0]}x{screen[1]} gui scale {cal.gui_scale or 'unset'} -> template x{cal.template_scale:.3f} "
+                        f"({cal.source}, {elapsed / 1e6:.1f} ms).")
+            return cal
+
+    def invalidate(self):
+        """Deletes the cache file for the current display and rebuilds it."""
+        screen = self.detect_screen()
+        if screen is not None:
+            try:
+                os.remove(self.cache_path(screen))
+            except OSError:
+                pass
+        return self.ensure()
+
+    # ------------- Internal -------------
+
+    def _asset_hash(self, screen: Tuple[int, int]) -> str:
+        h = hashlib.sha1()
+        h.update(json.dumps({
+            "version": FORMAT_VERSION,
+            "screen": list(screen),
+            "gui_scale": self.gui_scale,
+            "template_scale": self.template_scale,
+            "hotbar_slots": self.hotbar_slots,
+            "regions": {k: list(v) for k, v in sorted(self.capture_regions.all().items())} if self.capture_regions else {},
+        }, sort_keys=True).encode("utf-8"))
+        for name, path in sorted(self.template_bank.paths().items()):
+            h.update(name.encode("utf-8") + b"\0" + path.encode("utf-8") + b"\0")
+            try:
+                with open(path, "rb") as f:
+                    h.update(f.read())
+            except OSError:
+                h.update(b"<missing>")
+        return h.hexdigest()
+
+    def _build(self, screen: Tuple[int, int], asset_hash: str) -> Calibration:
+        w, h = screen
+        template_scale = template_scale_for(screen, self.gui_scale, self.template_scale)
+        self.template_bank.set_scale(template_scale, reload=False)
+        self.template_bank.load_all()
+        templates = {}
+        for name in self.template_bank.paths():
+            entry = self.template_bank.get(name)
+            if entry is not None:
+                templates[name] = (entry.bgr, entry.gray, entry.mask)
+
+        regions = self.capture_regions.all() if self.capture_regions is not None else {}
+        side = max(8, min(round(PROBE_SIZE * template_scale), w, h))
+        slot_grid = []
+        hotbar = regions.get(HOTBAR_REGION)
+        if hotbar is not None and self.hotbar_slots > 0:
+            left, top, width, height = hotbar
+            cell = width / self.hotbar_slots
+            slot_grid = [(round(left + cell * (i + 0.5)), top + height // 2) for i in range(self.hotbar_slots)]
+        return Calibration(
+            screen=(w, h),
+            gui_scale=self.gui_scale,
+            template_scale=template_scale,
+            regions=regions,
+            neutral_point=(w // 2, h // 4),
+            probe_region=((w - side) // 2, (h - side) // 2, side, side),
+            slot_grid=slot_grid,
+            asset_hash=asset_hash,
+            templates=templates,
+        )
+
+    def _read(self, path: str, asset_hash: str) -> Optional[Calibration]:
+        if not os.path.isfile(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta.get("version") != FORMAT_VERSION or meta.get("asset_hash") != asset_hash:
+                    logger.info(f"[Calibration] {path} is stale (display settings or assets changed); rebuilding.")
+                    return None
+                templates = {}
+                for name in meta["templates"]:
+                    mask_key = f"{name}.mask"
+                    templates[name] = (data[f"{name}.bgr"], data[f"{name}.gray"],
+                                       data[mask_key] if mask_key in data.files else None)
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+            logger.warning(f"[Calibration] Cannot read {path}: {e}; rebuilding.")
+            return None
+        return Calibration.from_meta(meta, templates, source="cache")
+
+    def _write(self, path: str, cal: Calibration):
+        arrays = {"meta": np.array(json.dumps(cal.meta()))}
+        for name, (bgr, gray, mask) in cal.templates.items():
+            arrays[f"{name}.bgr"] = bgr
+            arrays[f"{name}.gray"] = gray
+            if mask is not None:
+                arrays[f"{name}.mask"] = mask
+        tmp_path = path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp_path, path)
+            logger.info(f"[Calibration] Saved {path}.")
+        except OSError as e:
+            logger.error(f"[Calibration] Cannot write {path}: {e}")
@@ -0,0 +1,434 @@
+import os
+import glob
+import time
+import weakref
+import threading
+import logging
+from collections import deque
+from typing import List, Optional, Sequence, Tuple
+
+from Modules.lazy_import import lazy_import, installed
+
+pyautogui = lazy_import("pyautogui")
+mss = lazy_import("mss")  # fast native grabber (optional)
+np = lazy_import("numpy")
+cv2 = lazy_import("cv2")
+
+logger = logging.getLogger("Capture")
+
+Region = Tuple[int, int, int, int]
+
+CONFIG_KEY = "capture_backend"
+
+
+# ------------- Backends -------------
+
+class CaptureBackend:
+    """
+    Grabs RGB uint8 arrays of shape (h, w, 3) for a screen region
+    (left, top, width, height), or the full screen when region is None.
+    """
+    name = "base"
+
+    def grab(self, region: Optional[Region]):
+        raise NotImplementedError
+
+    def screen_size(self) -> Tuple[int, int]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PyAutoGUIBackend(CaptureBackend):
+    name = "pyautogui"
+
+    def grab(self, region):
+        img = pyautogui.screenshot(region=region) if region else pyautogui.screenshot()
+        return np.asarray(img)
+
+    def screen_size(self):
+        w, h = pyautogui.size()
+        return int(w), int(h)
+
+
+class MSSBackend(CaptureBackend):
+    """
+    mss-based grabber. mss handles are thread-affine, so one is kept per
+    calling thread; close() releases all of them.
+    """
+    name = "mss"
+
+    def __init__(self):
+        self._local = threading.local()
+        self._handles = []
+        self._handles_lock = threading.Lock()
+
+    def _sct(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            sct = mss.mss()
+            self._local.sct = sct
+            with self._handles_lock:
+                self._handles.append(sct)
+        return sct
+
+    def grab(self, region):
+        sct = self._sct()
+        if region:
+            left, top, width, height = region
+            mon = {"left": left, "top": top, "width": width, "height": height}
+        else:
+            mon = sct.monitors[1]
+        shot = sct.grab(mon)
+        bgra = np.frombuffer(shot.bgra, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        return cv2.cvtColor(bgra, cv2.COLOR_BGRA2RGB)
+
+    def screen_size(self):
+        mon = self._sct().monitors[1]
+        return int(mon["width"]), int(mon["height"])
+
+    def close(self):
+        with self._handles_lock:
+            handles, self._handles = self._handles, []
+        for sct in handles:
+            try:
+                sct.close()
+            except Exception as e:
+                logger.debug(f"[Capture] Closing mss handle failed: {e}")
+        self._local = threading.local()
+
+
+class ReplayBackend(CaptureBackend):
+    """
+    Serves pre-recorded full-screen frames (RGB arrays or image files) for
+    tests and offline replay. Each grab advances to the next frame; the last
+    frame repeats once the sequence is exhausted (or it loops).
+    """
+    name = "replay"
+
+    def __init__(self, frames: Optional[Sequence] = None, directory: Optional[str] = None, loop: bool = False):
+        self._frames = list(frames or [])
+        if directory:
+            for path in sorted(glob.glob(os.path.join(directory, "*.png"))):
+                bgr = cv2.imread(path, cv2.IMREAD_COLOR)
+                if bgr is not None:
+                    self._frames.append(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB))
+        if not self._frames:
+            raise ValueError("ReplayBackend needs at least one frame")
+        self.loop = loop
+        self._index = 0
+        self._lock = threading.Lock()
+
+    def push(self, frame):
+        with self._lock:
+            self._frames.append(frame)
+
+    def grab(self, region):
+        with self._lock:
+            frame = self._frames[min(self._index, len(self._frames) - 1)]
+            self._index += 1
+            if self.loop and self._index >= len(self._frames):
+                self._index = 0
+        if region:
+            left, top, width, height = region
+            return np.array(frame[top:top + height, left:left + width])
+        return np.array(frame)
+
+    def screen_size(self):
+        h, w = self._frames[0].shape[:2]
+        return int(w), int(h)
+
+
+def create_backend(name: str = "auto") -> Optional[CaptureBackend]:
+    if not installed(np):
+        logger.error("[Capture] numpy not installed; capture disabled.")
+        return None
+    if name in ("auto", "mss") and installed(mss) and installed(cv2):
+        return MSSBackend()
+    if name == "mss":
+        logger.warning("[Capture] mss requested but not installed; falling back to pyautogui.")
+    if pyautogui:
+        return PyAutoGUIBackend()
+    logger.error("[Capture] No capture backend available (install mss or pyautogui).")
+    return None
+
+
+# ------------- Frames -------------
+
+class Frame:
+    """
+    One captured image with its screen-space origin and perf_counter_ns
+    timestamp. The pixel array is read-only; views share its memory.
+    `full` marks a full-screen grab.
+    """
+    __slots__ = ("ts_ns", "left", "top", "pixels", "full", "__weakref__")
+
+    def __init__(self, ts_ns: int, left: int, top: int, pixels, full: bool = False):
+        pixels.setflags(write=False)
+        self.ts_ns = ts_ns
+        self.left = left
+        self.top = top
+        self.pixels = pixels
+        self.full = full
+
+    @property
+    def width(self) -> int:
+        return self.pixels.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.pixels.shape[0]
+
+    def covers(self, region: Optional[Region]) -> bool:
+        if region is None:
+            return self.full
+        left, top, width, height = region
+        return (left >= self.left and top >= self.top
+                and left + width <= self.left + self.width
+                and top + height <= self.top + self.height)
+
+    def view(self, region: Optional[Region]):
+        """Read-only view of `region` (screen coordinates), or the whole frame."""
+        if region is None:
+            return self.pixels
+        left, top, width, height = region
+        x, y = left - self.left, top - self.top
+        return self.pixels[y:y + height, x:x + width]
+
+
+def union_region(regions: Sequence[Optional[Region]]) -> Optional[Region]:
+    """Bounding box of all regions; None (full screen) if any region is None."""
+    if not regions or any(r is None for r in regions):
+        return None
+    left = min(r[0] for r in regions)
+    top = min(r[1] for r in regions)
+    right = max(r[0] + r[2] for r in regions)
+    bottom = max(r[1] + r[3] for r in regions)
+    return (left, top, right - left, bottom - top)
+
+
+# ------------- Service -------------
+
+class Subscription:
+    """
+    Periodic interest in a region. wait_next() blocks until the service has
+    captured a frame newer than the last one this subscriber consumed.
+    """
+
+    def __init__(self, service, name: str, region: Optional[Region], rate_hz: float):
+        self.service = service
+        self.name = name
+        self.region = region
+        self.interval_ns = int(1e9 / rate_hz)
+        self.next_due_ns = 0
+        self._last_ts = 0
+
+    def wait_next(self, timeout: float):
+        """Returns (ts_ns, read-only view) or None on timeout / stop."""
+        frame = self.service._wait_frame_for(self, timeout)
+        if frame is None:
+            return None
+        self._last_ts = frame.ts_ns
+        return frame.ts_ns, frame.view(self.region)
+
+
+class FrameCaptureService:
+    """
+    Owns screen capture for every watcher.
+
+    A single grab thread wakes at `tick_hz`, collects the subscriptions that
+    are due, grabs the bounding box of their regions once and pushes the frame
+    into a small ring buffer; subscribers then read read-only NumPy views
+    of their own region from it. The ring only holds these subscriber
+    frames and is bounded by count, total bytes (`ring_bytes`) and age
+    (`ring_max_age`); it is emptied when the last subscriber leaves.
+
+    On-demand capture() grabs (often full screen) are never kept by the
+    service: the last one is only weakly referenced, so while a caller
+    still holds it, concurrent callers share it and max_age_ms can reuse
+    it. capture() also reuses a ring frame if it is fresh enough and
+    covers the region.
+    """
+
+    def __init__(self, backend: Optional[CaptureBackend], ring_size: int = 4, tick_hz: float = 20.0,
+                 ring_bytes: int = 16 * 1024 * 1024, ring_max_age: float = 1.0):
+        self.backend = backend
+        self.tick_interval = 1.0 / tick_hz
+        self._tick_ns = int(1e9 / tick_hz)
+        self._ring = deque(maxlen=ring_size)
+        self.ring_bytes = ring_bytes
+        self._ring_max_age_ns = int(ring_max_age * 1e9)
+        self._last_demand = None  # weakref.ref to the last on-demand Frame
+        self._subs: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._grab_lock = threading.Lock()
+        self._frame_cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.grabs = 0
+        self._frame_listeners = ()
+        self._screen_size: Optional[Tuple[int, int]] = None
+
+    @classmethod
+    def from_config(cls, config) -> "FrameCaptureService":
+        name = config.get(CONFIG_KEY, "auto") if config is not None else "auto"
+        backend = create_backend(name)
+        if backend is not None:
+            logger.info(f"[Capture] Using '{backend.name}' backend.")
+        return cls(backend)
+
+    # ------------- Public API -------------
+
+    @property
+    def available(self) -> bool:
+        return self.backend is not None
+
+    def screen_size(self) -> Tuple[int, int]:
+        if self._screen_size is None and self.backend is not None:
+            self._screen_size = self.backend.screen_size()
+        return self._screen_size or (0, 0)
+
+    def subscribe(self, name: str, region: Optional[Region], rate_hz: float) -> Subscription:
+        sub = Subscription(self, name, region, rate_hz)
+        with self._lock:
+            self._subs = self._subs + [sub]
+        logger.debug(f"[Capture] '{name}' subscribed {region} @ {rate_hz:g} Hz.")
+        self.start()
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            self._subs = [s for s in self._subs if s is not sub]
+            idle = not self._subs
+        with self._frame_cond:
+            if idle:
+                self._ring.clear()
+            self._frame_cond.notify_all()
+
+    def capture(self, regions: Sequence[Optional[Region]], max_age_ms: float = 0.0) -> Optional[Frame]:
+        """
+        Returns a frame covering every region in `regions`, grabbing at most
+        once. A ring frame is reused when younger than max_age_ms.
+        """
+        if self.backend is None:
+            return None
+        now = time.perf_counter_ns()
+        cached = self._find_cached(regions, now - int(max_age_ms * 1e6)) if max_age_ms > 0 else None
+        if cached is not None:
+            return cached
+        requested_at = now
+        with self._grab_lock:
+            # Someone else may have grabbed while we waited for the lock.
+            cached = self._find_cached(regions, requested_at)
+            if cached is not None:
+                return cached
+            return self._grab(union_region(list(regions)), keep=False)
+
+    def add_frame_listener(self, callback):
+        """callback(frame) runs on the grabbing thread after every capture."""
+        self._frame_listeners = self._frame_listeners + (callback,)
+
+    def latest(self) -> Optional[Frame]:
+        return self._ring[-1] if self._ring else None
+
+    def start(self):
+        if self.backend is None or (self._thread and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="FrameCaptureThread", daemon=True)
+        self._thread.start()
+        logger.debug("[Capture] Grab loop started.")
+
+    def stop(self):
+        self._stop_event.set()
+        with self._frame_cond:
+            self._frame_cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        with self._frame_cond:
+            self._ring.clear()
+        self._last_demand = None
+        if self.backend is not None:
+            self.backend.close()
+
+    # ------------- Internal -------------
+
+    def _find_cached(self, regions, min_ts_ns: int) -> Optional[Frame]:
+        demand = self._last_demand() if self._last_demand is not None else None
+        if demand is not None and demand.ts_ns >= min_ts_ns and all(demand.covers(r) for r in regions):
+            return demand
+        for frame in reversed(self._ring):
+            if frame.ts_ns < min_ts_ns:
+                break
+            if all(frame.covers(r) for r in regions):
+                return frame
+        return None
+
+    def _grab(self, region: Optional[Region], keep: bool = True) -> Optional[Frame]:
+        """Grabs `region`; subscriber grabs (keep=True) go into the ring."""
+        try:
+            pixels = self.backend.grab(region)
+        except Exception as e:
+            logger.error(f"[Capture] Grab failed ({region or 'full screen'}): {e}")
+            return None
+        ts = time.perf_counter_ns()
+        left, top = (region[0], region[1]) if region else (0, 0)
+        frame = Frame(ts, left, top, pixels, full=region is None)
+        self.grabs += 1
+        if keep:
+            with self._frame_cond:
+                self._ring.append(frame)
+                self._trim_ring(ts)
+                self._frame_cond.notify_all()
+        else:
+            self._last_demand = weakref.ref(frame)
+        for cb in self._frame_listeners:
+            try:
+                cb(frame)
+            except Exception as e:
+                logger.error(f"[Capture] Frame listener failed: {e}")
+        return frame
+
+    def _trim_ring(self, now_ns: int):
+        """Drops the oldest frames beyond ring_bytes or ring_max_age (caller holds _frame_cond)."""
+        ring = self._ring
+        total = sum(f.pixels.nbytes for f in ring)
+        while len(ring) > 1 and (total > self.ring_bytes or now_ns - ring[0].ts_ns > self._ring_max_age_ns):
+            total -= ring.popleft().pixels.nbytes
+
+    def _loop(self):
+        while not self._stop_event.is_set():
+            subs = self._subs
+            if not subs:
+                self._stop_event.wait(self.tick_interval)
+                continue
+            now = time.perf_counter_ns()
+            # Subscribers within half an interval of their slot ride along on this
+            # grab instead of forcing another one a few milliseconds later.
+            due = [s for s in subs if s.next_due_ns <= now + max(self._tick_ns, s.interval_ns // 2)]
+            if any(s.next_due_ns <= now for s in due):
+                with self._grab_lock:
+                    self._grab(union_region([s.region for s in due]))
+                for s in due:
+                    s.next_due_ns += s.interval_ns
+                    if s.next_due_ns < now:
+                        s.next_due_ns = now + s.interval_ns
+            next_due = min(s.next_due_ns for s in self._subs) if self._subs else now
+            wait_s = max(self.tick_interval, (next_due - time.perf_counter_ns()) / 1e9)
+            self._stop_event.wait(min(wait_s, 0.5))
+
+    def _wait_frame_for(self, sub: Subscription, timeout: float) -> Optional[Frame]:
+        deadline = time.monotonic() + timeout
+        with self._frame_cond:
+            while not self._stop_event.is_set():
+                for frame in reversed(self._ring):
+                    if frame.ts_ns <= sub._last_ts:
+                        break
+                    if frame.covers(sub.region):
+                        return frame
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._frame_cond.wait(remaining)
+        return None
@@ -0,0 +1,179 @@
+import threading
+import logging
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger("CaptureRegions")
+
+Region = Tuple[int, int, int, int]
+
+CONFIG_KEY = "capture_regions"
+SCREEN_KEY = "capture_regions_screen"  # [width, height] the regions were drawn at
+
+INVENTORY_REGION = "inventory"
+HOTBAR_REGION = "hotbar"
+BLOOD_CURSE_REGION = "blood_curse"
+
+OVERLAY_COLORS = {
+    INVENTORY_REGION: "#00FF00",
+    HOTBAR_REGION: "#00BFFF",
+    BLOOD_CURSE_REGION: "#FF00FF",
+}
+
+
+def parse_region(text: str) -> Optional[Region]:
+    """
+    Parses "left,top,width,height". Empty text means "no region" (full screen).
+    Raises ValueError on malformed input.
+    """
+    text = (text or "").strip()
+    if not text:
+        return None
+    parts = [p.strip() for p in text.replace(";", ",").split(",")]
+    if len(parts) != 4:
+        raise ValueError(f"Region needs 4 values, got {len(parts)}")
+    left, top, width, height = (int(p) for p in parts)
+    return validate_region((left, top, width, height))
+
+
+def validate_region(region) -> Region:
+    left, top, width, height = (int(v) for v in region)
+    if width <= 0 or height <= 0:
+        raise ValueError("Region width/height must be > 0")
+    if left < 0 or top < 0:
+        raise ValueError("Region left/top must be >= 0")
+    return (left, top, width, height)
+
+
+def format_region(region: Optional[Region]) -> str:
+    if not region:
+        return ""
+    return ",".join(str(v) for v in region)
+
+
+class CaptureRegions:
+    """
+    Named screen regions (left, top, width, height) persisted in the config.
+
+    A region that is not set means the caller falls back to a full-screen
+    capture. Calibration mode draws every configured region with an
+    ROIOverlay so the rectangles can be lined up with the game UI.
+
+    The screen size the regions belong to is saved alongside them; after a
+    resolution change rescale() maps them proportionally onto the new
+    screen (in memory until the next save).
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._lock = threading.RLock()
+        self._regions: Dict[str, Region] = {}
+        self._overlays: Dict[str, "ROIOverlay"] = {}
+        self.screen: Optional[Tuple[int, int]] = None
+        self.calibrating = False
+        self._load()
+
+    # ------------- Public API -------------
+
+    def get(self, name: str) -> Optional[Region]:
+        return self._regions.get(name)
+
+    def all(self) -> Dict[str, Region]:
+        return dict(self._regions)
+
+    def set(self, name: str, region: Optional[Region], save: bool = True):
+        with self._lock:
+            regions = dict(self._regions)
+            if region is None:
+                regions.pop(name, None)
+                logger.info(f"[CaptureRegions] '{name}' cleared (full screen).")
+            else:
+                regions[name] = validate_region(region)
+                logger.info(f"[CaptureRegions] '{name}' set to {regions[name]}.")
+            self._regions = regions
+            if save:
+                self.save()
+            if self.calibrating:
+                self._refresh_overlay(name)
+
+    def save(self):
+        with self._lock:
+            if self.screen is not None:
+                self.config.set(SCREEN_KEY, list(self.screen), save=False)
+            self.config.set(CONFIG_KEY, {k: list(v) for k, v in self._regions.items()})
+
+    def rescale(self, screen: Tuple[int, int]) -> bool:
+        """
+        Declares the current screen size. Regions saved for a different
+        size are scaled to it; returns True if anything changed.
+        """
+        with self._lock:
+            old = self.screen
+            self.screen = (int(screen[0]), int(screen[1]))
+            if old is None or old == self.screen or not self._regions:
+                return False
+            fx, fy = self.screen[0] / old[0], self.screen[1] / old[1]
+            regions = {}
+            for name, (left, top, width, height) in self._regions.items():
+                regions[name] = (round(left * fx), round(top * fy), max(1, round(width * fx)), max(1, round(height * fy)))
+            self._regions = regions
+        logger.info(f"[CaptureRegions] Screen {old[0]}x{old[1]} -> {screen[0]}x{screen[1]}; regions rescaled: {regions}")
+        return True
+
+    def start_calibration(self):
+        with self._lock:
+            if self.calibrating:
+                return
+            self.calibrating = True
+            for name in OVERLAY_COLORS:
+                self._refresh_overlay(name)
+        logger.info("[CaptureRegions] Calibration overlays shown.")
+
+    def stop_calibration(self):
+        with self._lock:
+            if not self.calibrating:
+                return
+            self.calibrating = False
+            overlays = list(self._overlays.values())
+            self._overlays.clear()
+        for ov in overlays:
+            ov.stop()
+        logger.info("[CaptureRegions] Calibration overlays hidden.")
+
+    def toggle_calibration(self):
+        if self.calibrating:
+            self.stop_calibration()
+        else:
+            self.start_calibration()
+
+    # ------------- Internal -------------
+
+    def _load(self):
+        raw = self.config.get(CONFIG_KEY, {}) or {}
+        regions = {}
+        for name, value in raw.items():
+            try:
+                regions[name] = validate_region(value)
+            except (TypeError, ValueError) as e:
+                logger.warning(f"[CaptureRegions] Ignoring invalid region '{name}': {e}")
+        self._regions = regions
+        screen = self.config.get(SCREEN_KEY)
+        if screen:
+            self.screen = (int(screen[0]), int(screen[1]))
+        if regions:
+            logger.info(f"[CaptureRegions] Loaded regions: {regions}")
+
+    def _refresh_overlay(self, name: str):
+        region = self._regions.get(name)
+        ov = self._overlays.get(name)
+        if region is None:
+            if ov:
+                ov.hide()
+            return
+        if ov is None:
+            # Imported here: overlays need tkinter, which headless runs never load.
+            from Modules.roi_overlay import ROIOverlay
+            ov = ROIOverlay(border_color=OVERLAY_COLORS.get(name, "#FF0000"), border_width=3)
+            ov.start()
+            self._overlays[name] = ov
+        ov.update_roi(region)
+        ov.show()
@@ -0,0 +1,140 @@
+import math
+import time
+import threading
+from typing import Optional
+
+NS_PER_S = 1_000_000_000
+
+MIN_SPIN_NS = 200_000        # never spin less than 0.2 ms
+MAX_SPIN_NS = 16_000_000     # coarse timers (e.g. default Windows tick) top out near 15.6 ms
+INITIAL_SPIN_NS = 1_000_000
+
+
+class ClickScheduler:
+    """
+    Absolute-deadline click scheduler on time.perf_counter_ns().
+
+    Deadlines advance by a fixed interval from the previous *deadline*, not
+    from the time the click actually happened, so lateness never accumulates
+    into drift. Waiting is hybrid: a coarse Event.wait() until shortly before
+    the deadline, then a short yield-spin. The spin window adapts to the
+    observed oversleep of the coarse wait, so on precise timers almost no
+    time is spent spinning.
+
+    wait_next() returns early (None) as soon as the wake event is set, which
+    is how stop / disallow requests interrupt a pending wait.
+    """
+
+    def __init__(self, clicks_per_second: float = 10.0):
+        self._interval_ns = 0
+        self.set_rate(clicks_per_second)
+        self._spin_ns = INITIAL_SPIN_NS
+        self._oversleep_ewma_ns = 0.0
+        self.next_deadline_ns = 0
+        self.reset()
+
+    # ------------- Public API -------------
+
+    def set_rate(self, clicks_per_second: float):
+        if clicks_per_second <= 0:
+            raise ValueError("CPS must be > 0")
+        self._interval_ns = int(NS_PER_S / clicks_per_second)
+
+    @property
+    def interval_ns(self) -> int:
+        return self._interval_ns
+
+    def reset(self, now_ns: Optional[int] = None):
+        """
+        Restarts the schedule (first click due immediately) and clears stats.
+        """
+        self.next_deadline_ns = now_ns if now_ns is not None else time.perf_counter_ns()
+        self._count = 0
+        self._last_fire_ns = 0
+        self._pairs = 0
+        self._paired_ns = 0
+        self._chain_broken = True
+        self._jitter_sum = 0.0
+        self._jitter_sq_sum = 0.0
+        self._jitter_max_ns = 0
+        self.skipped = 0
+
+    def resync(self):
+        """
+        Re-anchors the schedule to now (e.g. after being parked) without
+        clearing stats, so the missed deadlines are not fired as a burst.
+        """
+        self.next_deadline_ns = time.perf_counter_ns()
+        self._chain_broken = True
+
+    def wait_next(self, wake_event: threading.Event) -> Optional[int]:
+        """
+        Blocks until the next deadline. Returns the deadline (ns) or None if
+        wake_event was set first.
+        """
+        deadline = self.next_deadline_ns
+        while True:
+            now = time.perf_counter_ns()
+            remaining = deadline - now
+            if remaining <= 0:
+                return deadline
+            if remaining > self._spin_ns:
+                target = deadline - self._spin_ns
+                if wake_event.wait((target - now) / NS_PER_S):
+                    return None
+                self._learn_oversleep(time.perf_counter_ns() - target)
+            else:
+                if wake_event.is_set():
+                    return None
+                time.sleep(0)
+
+    def mark_fired(self, deadline_ns: int, fired_ns: int):
+        """
+        Records a click that was due at deadline_ns and happened at fired_ns,
+        then advances to the next deadline.
+        """
+        jitter = fired_ns - deadline_ns
+        self._count += 1
+        if not self._chain_broken:
+            # Achieved rate only counts back-to-back clicks, not parked gaps.
+            self._pairs += 1
+            self._paired_ns += fired_ns - self._last_fire_ns
+        self._chain_broken = False
+        self._last_fire_ns = fired_ns
+        self._jitter_sum += jitter
+        self._jitter_sq_sum += float(jitter) * jitter
+        if jitter > self._jitter_max_ns:
+            self._jitter_max_ns = jitter
+
+        next_deadline = deadline_ns + self._interval_ns
+        now = time.perf_counter_ns()
+        if now - next_deadline > self._interval_ns:
+            # More than a full interval behind (click call stalled): drop the
+            # missed slots instead of bursting to catch up.
+            missed = (now - next_deadline) // self._interval_ns
+            self.skipped += missed
+            next_deadline += missed * self._interval_ns
+        self.next_deadline_ns = next_deadline
+
+    def stats(self) -> dict:
+        n = self._count
+        achieved = self._pairs * NS_PER_S / self._paired_ns if self._paired_ns > 0 else 0.0
+        mean = self._jitter_sum / n if n else 0.0
+        var = max(0.0, self._jitter_sq_sum / n - mean * mean) if n else 0.0
+        return {
+            "clicks": n,
+            "target_cps": NS_PER_S / self._interval_ns,
+            "achieved_cps": achieved,
+            "jitter_mean_us": mean / 1000.0,
+            "jitter_std_us": math.sqrt(var) / 1000.0,
+            "jitter_max_us": self._jitter_max_ns / 1000.0,
+            "skipped": self.skipped,
+            "spin_window_us": self._spin_ns / 1000.0,
+        }
+
+    # ------------- Internal -------------
+
+    def _learn_oversleep(self, oversleep_ns: int):
+        self._oversleep_ewma_ns = 0.9 * self._oversleep_ewma_ns + 0.1 * max(0, oversleep_ns)
+        spin = int(2 * self._oversleep_ewma_ns)
+        self._spin_ns = min(MAX_SPIN_NS, max(MIN_SPIN_NS, spin))
@@ -0,0 +1,404 @@
+"""
+Several game clients driven from one process.
+
+Each ClientProfile describes one game window: its log file, screen region,
+keys and click rate. ClientManager gives every profile its own SharedState
+gate, AutoClicker and WeaponReturnWatcher, and shares everything heavy
+between them:
+
+    log follower     one MultiLogFollower thread tails every client's log
+    capture          one FrameCaptureService (frames cover the union of
+                     the requested windows)
+    templates        one TemplateBank / WeaponLibrary (and its CV worker)
+    input            one InputDispatcher over the real device; each client
+                     talks to it through a ClientInput
+
+The dispatcher serialises actions between clients, moves the cursor into a
+client's window before it clicks, focuses the client's window (by title, on
+Windows) before input goes to a different client than the last one, and
+hands out an exclusive lease for recoveries so no other client can click
+while an inventory is open.
+
+Config: {"clients": [{"name": "alt1", "log_path": "...", "window": [0, 0, 960, 540],
+"window_title": "Azerus", "clicks_per_second": 10, "inventory_key": "q",
+"weapon_hotbar_slot_key": "2", "regions": {"inventory": [l, t, w, h]}}]}
+Regions are relative to the window; a missing region means the whole window.
+"""
+import sys
+import time
+import ctypes
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from Modules.auto_attack import AutoClicker
+from Modules.input_backend import InputBackend
+from Modules.log_follower import MultiLogFollower
+from Modules.metrics import registry as metrics
+from Modules.shared_state import SharedState
+from Modules.triggers import TriggerEngine
+from Modules.weapon_return import WeaponReturnWatcher
+
+logger = logging.getLogger("Clients")
+
+Region = Tuple[int, int, int, int]
+
+CONFIG_KEY = "clients"
+
+
+def focus_window(title: str) -> bool:
+    """
+    Brings the top-level window titled `title` to the foreground. Windows
+    only; elsewhere (and for an empty title) it does nothing and returns
+    False.
+    """
+    if not title or not sys.platform.startswith("win"):
+        return False
+    user32 = ctypes.windll.user32
+    hwnd = user32.FindWindowW(None, title)
+    if not hwnd:
+        logger.warning(f"[Clients] Window not found: {title!r}")
+        return False
+    return bool(user32.SetForegroundWindow(hwnd))
+
+
+class ClientProfile:
+    """One game client: log file, window region, keys and click rate."""
+    __slots__ = ("name", "log_path", "window", "window_title", "clicks_per_second",
+                 "inventory_key", "weapon_hotbar_slot_key", "regions")
+
+    def __init__(self, name: str, log_path: Optional[str] = None, window: Optional[Region] = None,
+                 window_title: str = "", clicks_per_second: float = 10.0, inventory_key: str = "q",
+                 weapon_hotbar_slot_key: str = "2", regions: Optional[Dict[str, Region]] = None):
+        self.name = name
+        self.log_path = log_path
+        self.window = tuple(int(v) for v in window) if window else None
+        self.window_title = window_title
+        self.clicks_per_second = float(clicks_per_second)
+        self.inventory_key = inventory_key
+        self.weapon_hotbar_slot_key = weapon_hotbar_slot_key
+        self.regions = {k: tuple(int(v) for v in r) for k, r in (regions or {}).items()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ClientProfile":
+        return cls(
+            name=data["name"],
+            log_path=data.get("log_path"),
+            window=data.get("window"),
+            window_title=data.get("window_title", ""),
+            clicks_per_second=data.get("clicks_per_second", 10.0),
+            inventory_key=data.get("inventory_key", "q"),
+            weapon_hotbar_slot_key=data.get("weapon_hotbar_slot_key", "2"),
+            regions=data.get("regions"),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "log_path": self.log_path,
+            "window": list(self.window) if self.window else None,
+            "window_title": self.window_title,
+            "clicks_per_second": self.clicks_per_second,
+            "inventory_key": self.inventory_key,
+            "weapon_hotbar_slot_key": self.weapon_hotbar_slot_key,
+            "regions": {k: list(r) for k, r in self.regions.items()},
+        }
+
+    @property
+    def click_point(self) -> Optional[Tuple[int, int]]:
+        if self.window is None:
+            return None
+        left, top, width, height = self.window
+        return left + width // 2, top + height // 2
+
+    def contains(self, x: int, y: int) -> bool:
+        if self.window is None:
+            return True
+        left, top, width, height = self.window
+        return left <= x < left + width and top <= y < top + height
+
+
+def load_profiles(config) -> List[ClientProfile]:
+    raw = config.get(CONFIG_KEY) if config is not None else None
+    profiles = []
+    for data in raw or []:
+        try:
+            profiles.append(ClientProfile.from_dict(data))
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"[Clients] Invalid client profile {data!r}: {e}")
+    return profiles
+
+
+class ClientRegions:
+    """
+    Capture regions of one client: the profile's window-relative regions
+    mapped to screen coordinates (same get() as CaptureRegions).
+    """
+
+    def __init__(self, profile: ClientProfile):
+        self.profile = profile
+
+    def get(self, name: str) -> Optional[Region]:
+        region = self.profile.regions.get(name)
+        if region is None or self.profile.window is None:
+            return region
+        left, top, _, _ = self.profile.window
+        return (left + region[0], top + region[1], region[2], region[3])
+
+    def all(self) -> Dict[str, Region]:
+        return {name: self.get(name) for name in self.profile.regions}
+
+
+class InputDispatcher:
+    """
+    Serialises the input of several clients onto one backend.
+
+    Every action takes the dispatcher for its client; hold() keeps it for a
+    whole sequence (re-entrant for the same client), so other clients wait
+    until the sequence is over. Waits longer than a millisecond are
+    recorded as `input.dispatch_wait`.
+    """
+
+    def __init__(self, backend: InputBackend, focus: Optional[Callable[[str], bool]] = focus_window):
+        self.backend = backend
+        self.focus = focus
+        self._cond = threading.Condition()
+        self._owner = None
+        self._depth = 0
+        self._focused = None
+
+    # ------------- Public API -------------
+
+    def client(self, profile: ClientProfile) -> "ClientInput":
+        return ClientInput(self, profile)
+
+    @contextmanager
+    def hold(self, client: "ClientInput"):
+        start = time.perf_counter_ns()
+        with self._cond:
+            while self._owner is not None and self._owner is not client:
+                self._cond.wait()
+            self._owner = client
+            self._depth += 1
+        waited = time.perf_counter_ns() - start
+        if waited > 1_000_000:
+            metrics.record("input.dispatch_wait", waited)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._depth -= 1
+                if not self._depth:
+                    self._owner = None
+                    self._cond.notify_all()
+
+    def activate(self, client: "ClientInput"):
+        """Focuses the client's window if the last input went elsewhere (call under hold())."""
+        if self._focused is client:
+            return
+        self._focused = client
+        title = client.profile.window_title
+        if title and self.focus is not None:
+            try:
+                self.focus(title)
+            except Exception as e:
+                logger.error(f"[Clients] Cannot focus {title!r}: {e}")
+
+
+class ClientInput(InputBackend):
+    """
+    InputBackend facade of one client over the shared InputDispatcher.
+    Before a click the cursor is moved to the window centre unless it is
+    known to be inside the client's window (a backend that cannot read the
+    cursor back, such as uinput, gets the move every time).
+    """
+    name = "client"
+
+    def __init__(self, dispatcher: InputDispatcher, profile: ClientProfile):
+        super().__init__()
+        self.dispatcher = dispatcher
+        self.backend = dispatcher.backend
+        self.profile = profile
+
+    def position(self) -> Optional[Tuple[int, int]]:
+        return self.backend.position()
+
+    def screen_size(self) -> Tuple[int, int]:
+        return self.backend.screen_size()
+
+    def exclusive(self):
+        return self.dispatcher.hold(self)
+
+    # ------------- Primitives -------------
+
+    def _click(self, button):
+        point = self.profile.click_point
+        if point is not None:
+            pos = self.backend.position()
+            if pos is None or not self.profile.contains(*pos):
+                self.backend.move_to(*point)
+        self.backend.click(button)
+
+    def _press(self, key):
+        self.backend.press(key)
+
+    def _mouse_down(self, button):
+        self.backend.mouse_down(button)
+
+    def _mouse_up(self, button):
+        self.backend.mouse_up(button)
+
+    def _key_down(self, key):
+        self.backend.key_down(key)
+
+    def _key_up(self, key):
+        self.backend.key_up(key)
+
+    def _move_to(self, x, y):
+        self.backend.move_to(x, y)
+
+    # ------------- Internal -------------
+
+    def _call(self, op: str, fn, *args):
+        # The shared backend times the real call; this only adds the hand-off.
+        with self.dispatcher.hold(self):
+            self.dispatcher.activate(self)
+            self._notify(op, args)
+            fn(*args)
+
+
+class Client:
+    """Per-client runtime: gate, input facade, clicker and weapon watcher."""
+    __slots__ = ("profile", "shared_state", "input", "autoclicker", "weapon_return")
+
+    def __init__(self, profile, shared_state, client_input, autoclicker, weapon_return):
+        self.profile = profile
+        self.shared_state = shared_state
+        self.input = client_input
+        self.autoclicker = autoclicker
+        self.weapon_return = weapon_return
+
+
+class ClientManager:
+    """
+    Builds and runs one Client per profile on shared services (see the
+    module docstring). Owns the log follower thread; the capture service,
+    input backend and template bank / weapon library belong to the caller.
+    """
+
+    def __init__(self, profiles: List[ClientProfile], capture_service, input_backend: InputBackend,
+                 template_bank, weapon_library, config=None, calibration=None,
+                 focus: Optional[Callable[[str], bool]] = focus_window):
+        self.config = config
+        self.capture = capture_service
+        self.template_bank = template_bank
+        self.weapon_library = weapon_library
+        self.calibration = calibration
+        self.dispatcher = InputDispatcher(input_backend, focus=focus)
+        self.log_follower = MultiLogFollower()
+
+        self._clients: Dict[str, Client] = {}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        for profile in profiles:
+            self.add(profile)
+
+    @classmethod
+    def from_config(cls, config, capture_service, input_backend, template_bank, weapon_library,
+                    calibration=None) -> Optional["ClientManager"]:
+        """None when no client profiles are configured."""
+        profiles = load_profiles(config)
+        if not profiles:
+            return None
+        return cls(profiles, capture_service, input_backend, template_bank, weapon_library,
+                   config=config, calibration=calibration)
+
+    # ------------- Public API -------------
+
+    @property
+    def clients(self) -> List[Client]:
+        return list(self._clients.values())
+
+    def get(self, name: str) -> Optional[Client]:
+        return self._clients.get(name)
+
+    def add(self, profile: ClientProfile) -> Client:
+        if profile.name in self._clients:
+            raise ValueError(f"Duplicate client name '{profile.name}'")
+        shared_state = SharedState()
+        client_input = self.dispatcher.client(profile)
+        autoclicker = AutoClicker(shared_state=shared_state, clicks_per_second=profile.clicks_per_second,
+                                  input_backend=client_input, client=profile.name)
+        weapon_return = WeaponReturnWatcher(shared_state=shared_state, autoclicker=autoclicker,
+                                            log_path=profile.log_path,
+                                            inventory_key=profile.inventory_key,
+                                            weapon_hotbar_slot_key=profile.weapon_hotbar_slot_key,
+                                            template_bank=self.template_bank,
+                                            capture_regions=ClientRegions(profile),
+                                            trigger_engine=TriggerEngine.from_config(self.config),
+                                            capture_service=self.capture,
+                                            input_backend=client_input,
+                                            weapon_library=self.weapon_library,
+                                            calibration=self.calibration,
+                                            log_follower=self.log_follower,
+                                            window_region=profile.window,
+                                            client=profile.name)
+        client = Client(profile, shared_state, client_input, autoclicker, weapon_return)
+        self._clients[profile.name] = client
+        if self._thread is not None:
+            weapon_return.start()
+        logger.info(f"[Clients] Added '{profile.name}' (window {profile.window}, log {profile.log_path}).")
+        return client
+
+    def start(self):
+        """Starts the shared log follower and every client's watcher; clickers stay off."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._follow_loop, name="LogFollowerThread", daemon=True)
+        self._thread.start()
+        for client in self._clients.values():
+            client.weapon_return.start()
+        logger.info(f"[Clients] {len(self._clients)} client(s) running ({self.log_follower.mode}).")
+
+    def toggle(self, name: Optional[str] = None):
+        """Toggles one client's clicker, or all of them (on if any is off) when name is None."""
+        if name is not None:
+            client = self._clients.get(name)
+            if client is not None:
+                client.autoclicker.toggle()
+            return
+        clickers = [c.autoclicker for c in self._clients.values()]
+        turn_on = not all(c.is_running() for c in clickers)
+        for clicker in clickers:
+            if clicker.is_running() != turn_on:
+                clicker.toggle()
+
+    def status(self) -> Dict[str, dict]:
+        return {
+            name: {
+                "clicking": c.autoclicker.is_running(),
+                "paused": c.autoclicker.is_paused(),
+                "recovering": c.shared_state.weapon_recovery_in_progress,
+                "last_action": c.weapon_return.last_action,
+            }
+            for name, c in self._clients.items()
+        }
+
+    def stop(self):
+        for client in self._clients.values():
+            client.autoclicker.stop()
+            client.weapon_return.stop()
+        self._stop_event.set()
+        self.log_follower.wake()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    # ------------- Internal -------------
+
+    def _follow_loop(self):
+        logger.info(f"[Clients] Log follower running ({self.log_follower.mode}).")
+        self.log_follower.run(self._stop_event)
+        logger.info("[Clients] Log follower stopped.")
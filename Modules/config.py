@@ -0,0 +1,62 @@
+import json
+import os
+import threading
+import logging
+from typing import Any
+
+logger = logging.getLogger("Config")
+
+DEFAULT_CONFIG_PATH = "azerus_config.json"
+
+
+class ConfigStore:
+    """
+    JSON-backed key/value settings shared by the modules.
+
+    Values must be JSON serialisable. Writes go to a temp file first and are
+    swapped in with os.replace so a crash never leaves a half-written config.
+    """
+
+    def __init__(self, path: str = DEFAULT_CONFIG_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self._data = {}
+        self.load()
+
+    # ------------- Public API -------------
+
+    def load(self):
+        with self._lock:
+            if not os.path.isfile(self.path):
+                logger.debug(f"[Config] No config at {self.path}; using defaults.")
+                self._data = {}
+                return
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._data = data if isinstance(data, dict) else {}
+                logger.info(f"[Config] Loaded {self.path}")
+            except Exception as e:
+                logger.error(f"[Config] Cannot read {self.path}: {e}")
+                self._data = {}
+
+    def save(self):
+        with self._lock:
+            tmp_path = self.path + ".tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self._data, f, indent=2, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+                logger.debug(f"[Config] Saved {self.path}")
+            except Exception as e:
+                logger.error(f"[Config] Cannot write {self.path}: {e}")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._data.get(key, default)
+
+    def set(self, key: str, value: Any, save: bool = True):
+        with self._lock:
+            self._data[key] = value
+            if save:
+                self.save()
@@ -0,0 +1,432 @@
+"""
+Out-of-process CV worker.
+
+Template matching (and the RGB->gray conversion in front of it) holds the
+GIL in bursts and competes with the click loop and the Tk main loop. The
+worker moves the full weapon search into a child process:
+
+    parent                                   child (spawned)
+    ------                                   ---------------
+    copy frame into the shared slot   --->   NumPy view of the same slot
+    ("search", id, header) over a Pipe       WeaponLibrary.search(view)
+    wait for ("result", id, boxes)    <---   [(name, conf, x, y, w, h), ...]
+                                      <---   ("heartbeat", pid) every interval
+
+Frame pixels never cross the pipe; only a small header and the result
+tuples are pickled. This is not zero-copy: frames live in the capture
+service's own buffers, so every request copies the frame into the slot
+once. The worker trades throughput (extra copy and round trip) for a
+quieter parent and only pays off with a spare core; Benchmarks/bench_cv_worker
+measures both sides.
+
+The child imports OpenCV, decodes the parent library's templates and runs
+one throwaway match before it reports ready, so the first search is not
+cold. A request whose specs, scale or match mode differ from what the
+child last prepared (e.g. after calibration) may decode templates again
+and gets `startup_timeout` instead of `request_timeout`. A monitor thread
+restarts the child when it dies or stops sending heartbeats, and a
+request that times out triggers a restart too. While the worker is
+starting, restarting or has given up, search() returns None and
+WeaponLibrary falls back to matching in-process.
+
+Enable with {"cv_worker": true} in the config.
+"""
+import os
+import time
+import threading
+import logging
+import multiprocessing
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+from Modules.lazy_import import lazy_import
+from Modules.capture import Frame
+from Modules.template_bank import TemplateBank
+from Modules.weapon_library import Candidate, WeaponLibrary, WeaponSpec
+from Modules.metrics import registry as metrics
+from Modules.startup import dummy_match
+
+np = lazy_import("numpy")
+
+logger = logging.getLogger("CVWorker")
+
+Region = Tuple[int, int, int, int]
+
+CONFIG_KEY = "cv_worker"
+
+DEFAULT_SLOT_BYTES = 3840 * 2160 * 3
+
+
+class CVWorker:
+    """
+    Runs WeaponLibrary full searches in a child process.
+
+    One shared-memory slot of `slot_bytes` holds the frame of the request
+    in flight; requests are serialized. The child sends a heartbeat every
+    `heartbeat_interval` seconds from its own thread, so a long match does
+    not look like a hang but a wedged or crashed process does. More than
+    `max_restarts` restarts within `restart_window` seconds disables the
+    worker until the next start().
+    """
+
+    def __init__(
+        self,
+        match_threshold: float = 0.78,
+        selection: str = "priority",
+        slot_bytes: int = DEFAULT_SLOT_BYTES,
+        heartbeat_interval: float = 0.5,
+        heartbeat_timeout: float = 3.0,
+        startup_timeout: float = 20.0,
+        request_timeout: float = 1.0,
+        max_restarts: int = 5,
+        restart_window: float = 60.0,
+        weapon_library: Optional[WeaponLibrary] = None
+    ):
+        self.weapon_library = weapon_library
+        self.match_threshold = match_threshold
+        self.selection = selection
+        self.slot_bytes = slot_bytes
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.startup_timeout = startup_timeout
+        self.request_timeout = request_timeout
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._shm = None
+        self._proc = None
+        self._conn = None
+        self._generation = 0
+        self._ready = False
+        self._prepared = None  # (specs, scale, color) the current child has loaded
+        self._spawned_at = 0.0
+        self._last_heartbeat = 0.0
+        self._disabled = False
+
+        self._lock = threading.Lock()
+        self._request_lock = threading.Lock()
+        self._pending: Dict[int, list] = {}
+        self._next_id = 0
+        self._restart_times = deque()
+        self._counts = {"requests": 0, "failures": 0, "restarts": 0}
+
+        self._stop_event = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, config, weapon_library=None, **kwargs) -> Optional["CVWorker"]:
+        """Worker configured for `weapon_library`, or None when disabled in the config."""
+        if config is None or not config.get(CONFIG_KEY, False):
+            return None
+        if weapon_library is not None:
+            kwargs.setdefault("match_threshold", weapon_library.match_threshold)
+            kwargs.setdefault("selection", weapon_library.selection)
+        return cls(weapon_library=weapon_library, **kwargs)
+
+    # ------------- Public API -------------
+
+    @property
+    def available(self) -> bool:
+        return bool(np) and shared_memory is not None
+
+    @property
+    def healthy(self) -> bool:
+        with self._lock:
+            return self._ready and not self._disabled and self._proc is not None and self._proc.is_alive()
+
+    def start(self):
+        if self._monitor and self._monitor.is_alive():
+            return
+        if not self.available:
+            logger.warning("[CVWorker] numpy/shared_memory unavailable; matching stays in-process.")
+            return
+        self._stop_event.clear()
+        self._disabled = False
+        self._restart_times.clear()
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes)
+        self._spawn()
+        self._monitor = threading.Thread(target=self._monitor_loop, name="CVWorkerMonitor", daemon=True)
+        self._monitor.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._monitor:
+            self._monitor.join(timeout=2.0)
+        self._monitor = None
+        self._kill("stopping")
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def search(self, frame, regions: Dict[str, Optional[Region]], specs, scale: float = 1.0,
+               color: bool = True) -> Optional[list]:
+        """
+        Full search of `specs` (templates resized by `scale` and matched in
+        colour or grayscale, see TemplateBank) over `frame` in the worker. Returns Candidates
+        best first (same as WeaponLibrary.search), or None if the worker is
+        not usable right now and the caller should match in-process.
+        """
+        if not self.healthy:
+            return None
+        pixels = frame.pixels
+        if pixels.nbytes > self.slot_bytes:
+            logger.warning(f"[CVWorker] Frame {pixels.shape} exceeds the {self.slot_bytes} byte slot; matching in-process.")
+            return None
+        by_name = {s.name: s for s in specs}
+        prepared = ([s.to_dict() for s in specs], scale, color)
+        with self._request_lock:
+            start = time.perf_counter_ns()
+            with self._lock:
+                conn = self._conn
+                self._next_id += 1
+                req_id = self._next_id
+                waiter = [threading.Event(), None]
+                self._pending[req_id] = waiter
+                timeout = self.request_timeout if prepared == self._prepared else self.startup_timeout
+            try:
+                # The one copy per request: capture buffer -> shared slot.
+                slot = np.ndarray(pixels.shape, dtype=np.uint8, buffer=self._shm.buf)
+                np.copyto(slot, pixels)
+                del slot
+                conn.send(("search", req_id, {
+                    "shape": pixels.shape,
+                    "left": frame.left,
+                    "top": frame.top,
+                    "full": frame.full,
+                    "regions": regions,
+                    "specs": prepared[0],
+                    "scale": scale,
+                    "color": color,
+                }))
+            except (OSError, ValueError, AttributeError) as e:
+                self._fail(req_id, f"send failed: {e}")
+                return None
+            done = waiter[0].wait(timeout)
+            with self._lock:
+                self._pending.pop(req_id, None)
+                if done and waiter[1][0] == "result" and conn is self._conn:
+                    self._prepared = prepared
+            if not done:
+                self._fail(req_id, f"request timed out after {timeout * 1000:.0f} ms")
+                self.restart("request timeout")
+                return None
+            reply = waiter[1]
+            metrics.record("cv_worker.roundtrip", time.perf_counter_ns() - start)
+
+        kind, payload = reply
+        if kind != "result":
+            self._fail(req_id, payload)
+            return None
+        boxes, worker_ns = payload
+        metrics.record("cv_worker.search", worker_ns)
+        with self._lock:
+            self._counts["requests"] += 1
+        return [Candidate(by_name[name], conf, left, top, w, h)
+                for name, conf, left, top, w, h in boxes if name in by_name]
+
+    def restart(self, reason: str):
+        if self._stop_event.is_set():
+            return
+        now = time.monotonic()
+        with self._lock:
+            while self._restart_times and now - self._restart_times[0] > self.restart_window:
+                self._restart_times.popleft()
+            if len(self._restart_times) >= self.max_restarts:
+                if not self._disabled:
+                    self._disabled = True
+                    logger.error(f"[CVWorker] {len(self._restart_times)} restarts within {self.restart_window:.0f}s; "
+                                 f"giving up, matching stays in-process.")
+                return
+            self._restart_times.append(now)
+            self._counts["restarts"] += 1
+        logger.warning(f"[CVWorker] Restarting worker ({reason}).")
+        self._kill(reason)
+        self._spawn()
+
+    def stats(self) -> dict:
+        with self._lock:
+            proc = self._proc
+            return {
+                "healthy": self._ready and not self._disabled and proc is not None and proc.is_alive(),
+                "pid": proc.pid if proc is not None else None,
+                "requests": self._counts["requests"],
+                "failures": self._counts["failures"],
+                "restarts": self._counts["restarts"],
+                "heartbeat_age_ms": (time.monotonic() - self._last_heartbeat) * 1000.0 if self._last_heartbeat else None,
+            }
+
+    # ------------- Internal -------------
+
+    def _spawn(self):
+        warm = None
+        if self.weapon_library is not None:
+            bank = self.weapon_library.template_bank
+            warm = {"specs": [s.to_dict() for s in self.weapon_library.specs()], "scale": bank.scale,
+                    "color": bank.color}
+        parent_conn, child_conn = self._ctx.Pipe()
+        proc = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self._shm.name, self.heartbeat_interval, self.match_threshold, self.selection, warm),
+            name="AzerusCVWorker",
+            daemon=True,
+        )
+        proc.start()
+        child_conn.close()
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self._proc = proc
+            self._conn = parent_conn
+            self._ready = False
+            self._prepared = (warm["specs"], warm["scale"], warm["color"]) if warm is not None else None
+            self._spawned_at = time.monotonic()
+            self._last_heartbeat = 0.0
+        threading.Thread(target=self._read_loop, args=(parent_conn, generation),
+                         name=f"CVWorkerReader-{generation}", daemon=True).start()
+        logger.info(f"[CVWorker] Spawned worker pid {proc.pid}.")
+
+    def _kill(self, reason: str):
+        with self._lock:
+            proc, conn = self._proc, self._conn
+            self._proc = self._conn = None
+            self._ready = False
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for waiter in pending:
+            waiter[1] = ("error", reason)
+            waiter[0].set()
+        if conn is not None:
+            try:
+                conn.send(("stop", 0, None))
+            except (OSError, ValueError):
+                pass
+        if proc is not None:
+            proc.join(timeout=0.5)
+            if proc.is_alive():
+                proc.terminate()
+                proc.join(timeout=1.0)
+            if proc.is_alive():
+                # A stopped/wedged process never handles SIGTERM.
+                proc.kill()
+                proc.join(timeout=1.0)
+        if conn is not None:
+            conn.close()
+
+    def _read_loop(self, conn, generation: int):
+        while True:
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                return
+            kind = msg[0]
+            with self._lock:
+                if generation != self._generation:
+                    return
+                self._last_heartbeat = time.monotonic()
+                if kind == "ready":
+                    self._ready = True
+                    logger.info(f"[CVWorker] Worker pid {msg[1]} ready after "
+                                f"{(self._last_heartbeat - self._spawned_at) * 1000:.0f} ms.")
+                elif kind in ("result", "error"):
+                    waiter = self._pending.get(msg[1])
+                    if waiter is not None:
+                        waiter[1] = (kind, msg[2])
+                        waiter[0].set()
+
+    def _monitor_loop(self):
+        while not self._stop_event.wait(self.heartbeat_interval):
+            with self._lock:
+                proc = self._proc
+                ready = self._ready
+                disabled = self._disabled
+                last = self._last_heartbeat
+                spawned = self._spawned_at
+            if disabled or proc is None:
+                continue
+            now = time.monotonic()
+            if not proc.is_alive():
+                self.restart(f"process exited with code {proc.exitcode}")
+            elif not ready and now - spawned > self.startup_timeout:
+                self.restart(f"not ready after {self.startup_timeout:.0f}s")
+            elif ready and now - last > self.heartbeat_timeout:
+                self.restart(f"no heartbeat for {now - last:.1f}s")
+
+    def _fail(self, req_id: int, reason):
+        with self._lock:
+            self._pending.pop(req_id, None)
+            self._counts["failures"] += 1
+        logger.warning(f"[CVWorker] Request {req_id} failed: {reason}")
+
+
+# ------------- Worker process -------------
+
+def _worker_main(conn, shm_name: str, heartbeat_interval: float, match_threshold: float, selection: str,
+                 warm: Optional[dict] = None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)-8s | cv-worker | %(name)s | %(message)s",
+                        datefmt="%H:%M:%S")
+    shm = shared_memory.SharedMemory(name=shm_name)
+    library = WeaponLibrary(TemplateBank(), [], match_threshold=match_threshold, selection=selection)
+    library.template_bank.start_watching()
+    state = {"specs": []}
+    send_lock = threading.Lock()
+    stop = threading.Event()
+
+    def send(msg):
+        with send_lock:
+            conn.send(msg)
+
+    def heartbeat():
+        while not stop.wait(heartbeat_interval):
+            try:
+                send(("heartbeat", os.getpid()))
+            except (OSError, ValueError):
+                return
+
+    def prepare(req):
+        library.template_bank.set_scale(req["scale"], reload=bool(state["specs"]))
+        library.template_bank.color = req["color"]
+        if req["specs"] != state["specs"]:
+            library.set_specs([WeaponSpec.from_dict(d) for d in req["specs"]])
+            state["specs"] = req["specs"]
+
+    def search(req):
+        prepare(req)
+        pixels = np.ndarray(req["shape"], dtype=np.uint8, buffer=shm.buf)
+        frame = Frame(0, req["left"], req["top"], pixels, full=req["full"])
+        start = time.perf_counter_ns()
+        found = library.search(frame, req["regions"])
+        elapsed = time.perf_counter_ns() - start
+        return [(c.spec.name, c.confidence, c.left, c.top, c.width, c.height) for c in found], elapsed
+
+    ops = {"search": search, "ping": lambda req: os.getpid()}
+
+    threading.Thread(target=heartbeat, name="CVWorkerHeartbeat", daemon=True).start()
+    # Import OpenCV and decode the templates before reporting ready: a cold
+    # first search would pay for both inside the parent's request timeout.
+    if warm is not None:
+        prepare(warm)
+    dummy_match(library.template_bank)
+    send(("ready", os.getpid()))
+    try:
+        while True:
+            try:
+                op, req_id, req = conn.recv()
+            except (EOFError, OSError):
+                break
+            if op == "stop":
+                break
+            try:
+                send(("result", req_id, ops[op](req)))
+            except Exception as e:
+                send(("error", req_id, f"{type(e).__name__}: {e}"))
+    finally:
+        stop.set()
+        library.template_bank.stop()
+        shm.close()
@@ -0,0 +1,199 @@
+import time
+import threading
+import logging
+from collections import deque
+from typing import Callable, Dict, List, Tuple, Type
+
+from Modules.metrics import registry as metrics
+from Modules.tracing import tracer
+
+logger = logging.getLogger("EventBus")
+
+Handler = Callable[["Event"], None]
+
+
+# ------------- Events -------------
+
+class Event:
+    """
+    Base event: `ts_ns` is time.perf_counter_ns() at creation and `client`
+    names the game client it belongs to ("main" for the single-client setup).
+    """
+    __slots__ = ("ts_ns", "client")
+
+    def __init__(self, client: str = "main"):
+        self.ts_ns = time.perf_counter_ns()
+        self.client = client
+
+    def fields(self) -> dict:
+        """Every slot except ts_ns, base class first."""
+        return {name: getattr(self, name) for cls in reversed(type(self).__mro__)
+                for name in getattr(cls, "__slots__", ()) if name != "ts_ns"}
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={v!r}" for k, v in self.fields().items() if k != "client")
+        return f"{type(self).__name__}({self.client}{', ' + fields if fields else ''})"
+
+
+class ClickerStarted(Event):
+    __slots__ = ("cps",)
+
+    def __init__(self, cps: float, client: str = "main"):
+        super().__init__(client)
+        self.cps = cps
+
+
+class ClickerStopped(Event):
+    __slots__ = ("clicks", "achieved_cps")
+
+    def __init__(self, clicks: int, achieved_cps: float, client: str = "main"):
+        super().__init__(client)
+        self.clicks = clicks
+        self.achieved_cps = achieved_cps
+
+
+class ClickerPaused(Event):
+    """The running clicker was parked (paused=True) or released by the SharedState gate."""
+    __slots__ = ("paused",)
+
+    def __init__(self, paused: bool, client: str = "main"):
+        super().__init__(client)
+        self.paused = paused
+
+
+class TriggerMatched(Event):
+    __slots__ = ("rule", "action", "line", "seen_ns")
+
+    def __init__(self, rule: str, action: str, line: str, seen_ns: int, client: str = "main"):
+        super().__init__(client)
+        self.rule = rule
+        self.action = action
+        self.line = line
+        self.seen_ns = seen_ns
+
+
+class RecoveryPhase(Event):
+    """
+    Step of a weapon recovery: "start", "inventory_open", "search",
+    "assign", "close", then "done" or "failed". `status` is the watcher's
+    last_action text at that point.
+    """
+    __slots__ = ("phase", "status")
+
+    def __init__(self, phase: str, status: str, client: str = "main"):
+        super().__init__(client)
+        self.phase = phase
+        self.status = status
+
+
+class CurseStateChanged(Event):
+    __slots__ = ("active", "since")
+
+    def __init__(self, active: bool, since: float, client: str = "main"):
+        super().__init__(client)
+        self.active = active
+        self.since = since  # wall-clock time of the transition
+
+
+# ------------- Bus -------------
+
+class EventQueue:
+    """
+    Buffer for a consumer that runs on its own schedule (the Tk loop).
+    Publishing is a deque append; drain() empties it and records the time
+    from publish to drain as `events.queue_lag`. The oldest events are
+    dropped once `maxlen` is reached.
+    """
+
+    def __init__(self, maxlen: int = 1024):
+        self._events = deque(maxlen=maxlen)
+
+    def put(self, event: Event):
+        self._events.append(event)
+
+    def drain(self) -> List[Event]:
+        events = []
+        pop = self._events.popleft
+        try:
+            while True:
+                events.append(pop())
+        except IndexError:
+            pass
+        if events:
+            now = time.perf_counter_ns()
+            lag = metrics.histogram("events.queue_lag")
+            for event in events:
+                lag.record(now - event.ts_ns)
+        return events
+
+
+class EventBus:
+    """
+    In-process publish/subscribe for typed events.
+
+    Handlers subscribe to an event class and receive its subclasses too
+    (subscribing to Event gets everything). They run synchronously on the
+    publisher's thread, so they must be quick; consumers with their own
+    loop use queue(). Subscriptions are rare and rebuild copy-on-write
+    routing tables under a lock; publish() takes no lock: one dict lookup
+    by concrete type, then a loop over a tuple of handlers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._handlers: Dict[type, Tuple[Handler, ...]] = {}
+        self._routes: Dict[type, Tuple[Handler, ...]] = {}
+
+    # ------------- Public API -------------
+
+    def subscribe(self, event_type: Type[Event], handler: Handler):
+        with self._lock:
+            handlers = dict(self._handlers)
+            handlers[event_type] = handlers.get(event_type, ()) + (handler,)
+            self._handlers = handlers
+            self._routes = {}
+
+    def unsubscribe(self, event_type: Type[Event], handler: Handler):
+        with self._lock:
+            handlers = dict(self._handlers)
+            remaining = tuple(h for h in handlers.get(event_type, ()) if h != handler)
+            if remaining:
+                handlers[event_type] = remaining
+            else:
+                handlers.pop(event_type, None)
+            self._handlers = handlers
+            self._routes = {}
+
+    def queue(self, *event_types: Type[Event], maxlen: int = 1024) -> EventQueue:
+        """Subscribes a new EventQueue to `event_types` (default: every event)."""
+        q = EventQueue(maxlen)
+        for event_type in event_types or (Event,):
+            self.subscribe(event_type, q.put)
+        return q
+
+    def publish(self, event: Event):
+        if tracer.enabled:
+            tracer.instant(type(event).__name__, cat="event", **event.fields())
+        route = self._routes.get(type(event))
+        if route is None:
+            route = self._route(type(event))
+        for handler in route:
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error(f"[EventBus] Handler for {type(event).__name__} failed: {e}")
+
+    # ------------- Internal -------------
+
+    def _route(self, event_type: type) -> Tuple[Handler, ...]:
+        with self._lock:
+            handlers = self._handlers
+            route = tuple(h for cls in event_type.__mro__ for h in handlers.get(cls, ()))
+            routes = dict(self._routes)
+            routes[event_type] = route
+            self._routes = routes
+        return route
+
+
+# Process-wide bus used by the modules.
+bus = EventBus()
@@ -1,44 +1,160 @@
 import threading
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, FrozenSet, Optional
 
 try:
     import keyboard  # Global hotkeys; requires permissions
 except ImportError:
     keyboard = None
 
+from Modules.metrics import registry as metrics
+from Modules.tracing import tracer
+
 logger = logging.getLogger("Hotkeys")
 
+KEY_ALIASES = {
+    "control": "ctrl",
+    "escape": "esc",
+    "return": "enter",
+    "option": "alt",
+    "altgr": "alt",
+}
+
+# Longest gap between OS auto-repeat downs of a held key (Windows allows a
+# 1 s initial delay, then at least 2.5 repeats/s). A repeated down after a
+# longer gap is a new press whose key-up was missed.
+REPEAT_TIMEOUT = 1.05
+
+
+def normalize_key(name: str) -> str:
+    name = (name or "").strip().lower()
+    for side in ("left ", "right "):
+        if name.startswith(side):
+            name = name[len(side):]
+    return KEY_ALIASES.get(name, name)
+
+
+def parse_chord(spec: str) -> FrozenSet[str]:
+    keys = frozenset(normalize_key(k) for k in spec.split("+") if k.strip())
+    if not keys:
+        raise ValueError(f"Empty hotkey: {spec!r}")
+    return keys
+
+
+class _Binding:
+    __slots__ = ("spec", "chord", "callback", "debounce", "last_fired", "running")
+
+    def __init__(self, spec: str, chord: FrozenSet[str], callback: Callable[[], None], debounce: float):
+        self.spec = spec
+        self.chord = chord
+        self.callback = callback
+        self.debounce = debounce
+        self.last_fired = 0.0
+        self.running = False
+
+
 class GlobalHotkeyManager:
-    def __init__(self):
-        self._bindings = {}
-        self._stop_event = threading.Event()
-        self._thread = None
+    """
+    Event-driven global hotkeys built on keyboard.hook().
+
+    Key events update a set of held keys; a binding fires when its key goes
+    down and the whole chord (e.g. "ctrl+f6") is held. OS auto-repeat is
+    ignored; a held entry not refreshed by a repeat within REPEAT_TIMEOUT
+    counts as released, so a key-up lost to a focus change, lock screen or
+    UAC prompt never mutes its hotkey. Each binding has its own debounce, and a binding whose callback
+    is still running is not queued again. Callbacks run on a small thread
+    pool so a slow action (F4 recovery) never delays the others.
+
+    Key-press -> callback-start latency is recorded in the metrics registry
+    ("hotkey.latency" and "hotkey.<spec>.latency").
+    """
+
+    def __init__(self, max_workers: int = 3, debounce: float = 0.35):
+        self.default_debounce = debounce
+        self._bindings: Dict[FrozenSet[str], _Binding] = {}
+        self._pressed: Dict[str, float] = {}  # key -> monotonic time of its last down event
+        self._lock = threading.Lock()
+        self._hook = None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="HotkeyWorker")
         if keyboard is None:
             logger.warning("keyboard module not installed. Global hotkeys disabled.")
         else:
-            self._thread = threading.Thread(target=self._loop, name="HotkeyThread", daemon=True)
-            self._thread.start()
+            try:
+                self._hook = keyboard.hook(self._on_event)
+            except Exception as e:
+                logger.error(f"Cannot install keyboard hook: {e}")
 
-    def register_hotkey(self, key, callback):
+    def register_hotkey(self, key: str, callback: Callable[[], None], debounce: Optional[float] = None):
         if keyboard is None:
             logger.warning(f"Cannot register hotkey {key}; keyboard module missing.")
             return
+        chord = parse_chord(key)
+        binding = _Binding(key.lower(), chord, callback, self.default_debounce if debounce is None else debounce)
         logger.info(f"Registering hotkey {key}")
-        self._bindings[key.lower()] = callback
+        with self._lock:
+            bindings = dict(self._bindings)
+            bindings[chord] = binding
+            self._bindings = bindings
 
-    def _loop(self):
-        while not self._stop_event.is_set():
-            try:
-                for k, cb in list(self._bindings.items()):
-                    if keyboard.is_pressed(k):
-                        cb()
-                        time.sleep(0.35)  # Debounce
-            except Exception as e:
-                logger.error(f"Hotkey loop error: {e}")
-            time.sleep(0.05)
+    def get_latency_stats(self) -> Dict[str, dict]:
+        stats = {"all": metrics.histogram("hotkey.latency").snapshot()}
+        for binding in self._bindings.values():
+            stats[binding.spec] = metrics.histogram(f"hotkey.{binding.spec}.latency").snapshot()
+        return stats
+
+    # ------------- Internal -------------
+
+    def _on_event(self, event):
+        # Runs on the keyboard listener thread: keep it short, never block.
+        name = normalize_key(event.name)
+        if not name:
+            return
+        if event.event_type != "down":
+            self._pressed.pop(name, None)
+            return
+        now = time.monotonic()
+        last = self._pressed.get(name)
+        self._pressed[name] = now
+        if last is not None and now - last < REPEAT_TIMEOUT:
+            return  # auto-repeat
+        for chord, binding in self._bindings.items():
+            if name in chord and chord <= self._pressed.keys():
+                self._fire(binding, event)
+
+    def _fire(self, binding: _Binding, event):
+        now = time.monotonic()
+        if now - binding.last_fired < binding.debounce:
+            return
+        if binding.running:
+            logger.debug(f"Hotkey {binding.spec} still running; ignored.")
+            return
+        binding.last_fired = now
+        binding.running = True
+        event_time = getattr(event, "time", None) or time.time()
+        try:
+            self._executor.submit(self._invoke, binding, event_time)
+        except RuntimeError:
+            binding.running = False  # executor shut down
+
+    def _invoke(self, binding: _Binding, event_time: float):
+        latency_ns = int((time.time() - event_time) * 1e9)
+        metrics.record("hotkey.latency", latency_ns)
+        metrics.record(f"hotkey.{binding.spec}.latency", latency_ns)
+        try:
+            with tracer.span(f"hotkey {binding.spec}", cat="hotkey"):
+                binding.callback()
+        except Exception as e:
+            logger.error(f"Hotkey {binding.spec} callback error: {e}")
+        finally:
+            binding.running = False
 
     def stop(self):
-        if self._thread:
-            self._stop_event.set()
-            self._thread.join(timeout=2)
\ No newline at end of file
+        if self._hook is not None and keyboard is not None:
+            try:
+                keyboard.unhook(self._hook)
+            except Exception as e:
+                logger.debug(f"Unhook failed: {e}")
+            self._hook = None
+        self._executor.shutdown(wait=False)
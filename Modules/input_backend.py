@@ -0,0 +1,450 @@
+import os
+import sys
+import time
+import threading
+import logging
+from contextlib import nullcontext
+from typing import Callable, List, Optional, Tuple
+
+try:
+    from Xlib import X, XK
+    from Xlib import display as xdisplay
+    from Xlib.ext import xtest
+except ImportError:
+    xdisplay = None
+
+try:
+    import evdev
+    from evdev import ecodes
+except ImportError:
+    evdev = None
+    ecodes = None
+
+from Modules.lazy_import import lazy_import
+from Modules.metrics import registry as metrics
+
+pyautogui = lazy_import("pyautogui")
+
+logger = logging.getLogger("InputBackend")
+
+CONFIG_KEY = "input_backend"
+
+BACKEND_NAMES = ("auto", "xtest", "uinput", "pyautogui", "recording")
+
+ActionListener = Callable[[str, tuple], None]
+
+
+class InputBackend:
+    """
+    Synthetic mouse/keyboard input.
+
+    The public methods time each call into an `input.<op>` histogram and
+    notify action listeners (session recording); subclasses implement the
+    underscore-prefixed primitives. Keys use pyautogui names ("q", "2",
+    "esc", "f4", ...).
+    """
+    name = "base"
+
+    def __init__(self):
+        self._listeners: Tuple[ActionListener, ...] = ()
+
+    # ------------- Public API -------------
+
+    def add_listener(self, callback: ActionListener):
+        """callback(op, args) runs on the calling thread before every action."""
+        self._listeners = self._listeners + (callback,)
+
+    def remove_listener(self, callback: ActionListener):
+        self._listeners = tuple(cb for cb in self._listeners if cb is not callback)
+
+    def click(self, button: str = "left"):
+        self._call("click", self._click, button)
+
+    def mouse_down(self, button: str = "left"):
+        self._call("mouse_down", self._mouse_down, button)
+
+    def mouse_up(self, button: str = "left"):
+        self._call("mouse_up", self._mouse_up, button)
+
+    def press(self, key: str):
+        self._call("press", self._press, key)
+
+    def key_down(self, key: str):
+        self._call("key_down", self._key_down, key)
+
+    def key_up(self, key: str):
+        self._call("key_up", self._key_up, key)
+
+    def move_to(self, x: int, y: int):
+        self._call("move_to", self._move_to, int(x), int(y))
+
+    def position(self) -> Optional[Tuple[int, int]]:
+        """
+        The real cursor position as read back from the system, or None when
+        the backend cannot read it (callers must not treat a move as
+        confirmed then).
+        """
+        raise NotImplementedError
+
+    def screen_size(self) -> Tuple[int, int]:
+        raise NotImplementedError
+
+    def exclusive(self):
+        """
+        Context manager holding the mouse and keyboard for a multi-step
+        sequence. Only meaningful when several clients share one device
+        (see clients.py); a no-op here.
+        """
+        return nullcontext()
+
+    def close(self):
+        pass
+
+    # ------------- Primitives -------------
+
+    def _click(self, button):
+        self._mouse_down(button)
+        self._mouse_up(button)
+
+    def _press(self, key):
+        self._key_down(key)
+        self._key_up(key)
+
+    def _mouse_down(self, button):
+        raise NotImplementedError
+
+    def _mouse_up(self, button):
+        raise NotImplementedError
+
+    def _key_down(self, key):
+        raise NotImplementedError
+
+    def _key_up(self, key):
+        raise NotImplementedError
+
+    def _move_to(self, x, y):
+        raise NotImplementedError
+
+    # ------------- Internal -------------
+
+    def _call(self, op: str, fn, *args):
+        self._notify(op, args)
+        start = time.perf_counter_ns()
+        fn(*args)
+        metrics.record(f"input.{op}", time.perf_counter_ns() - start)
+
+    def _notify(self, op: str, args: tuple):
+        for cb in self._listeners:
+            try:
+                cb(op, args)
+            except Exception as e:
+                logger.error(f"[InputBackend] Listener failed: {e}")
+
+
+class PyAutoGUIBackend(InputBackend):
+    """
+    Portable fallback. Every call passes _pause=False so pyautogui's global
+    PAUSE (0.1 s by default) is never slept after an action.
+    """
+    name = "pyautogui"
+
+    def _click(self, button):
+        pyautogui.click(button=button, _pause=False)
+
+    def _mouse_down(self, button):
+        pyautogui.mouseDown(button=button, _pause=False)
+
+    def _mouse_up(self, button):
+        pyautogui.mouseUp(button=button, _pause=False)
+
+    def _press(self, key):
+        pyautogui.press(key, _pause=False)
+
+    def _key_down(self, key):
+        pyautogui.keyDown(key, _pause=False)
+
+    def _key_up(self, key):
+        pyautogui.keyUp(key, _pause=False)
+
+    def _move_to(self, x, y):
+        pyautogui.moveTo(x, y, _pause=False)
+
+    def position(self):
+        x, y = pyautogui.position()
+        return int(x), int(y)
+
+    def screen_size(self):
+        w, h = pyautogui.size()
+        return int(w), int(h)
+
+
+_X_BUTTONS = {"left": 1, "middle": 2, "right": 3}
+
+_X_KEYSYMS = {
+    "esc": "Escape", "escape": "Escape", "enter": "Return", "return": "Return",
+    "space": "space", "tab": "Tab", "backspace": "BackSpace", "shift": "Shift_L",
+    "ctrl": "Control_L", "alt": "Alt_L", "up": "Up", "down": "Down", "left": "Left", "right": "Right",
+}
+
+
+class XTestBackend(InputBackend):
+    """
+    X11 XTEST extension through python-xlib: one request per event on an
+    already open display connection, flushed immediately (no round trip).
+    """
+    name = "xtest"
+
+    def __init__(self):
+        super().__init__()
+        self._display = xdisplay.Display()
+        if not self._display.has_extension("XTEST"):
+            raise RuntimeError("X server has no XTEST extension")
+        self._lock = threading.Lock()
+        self._keycodes = {}
+
+    def _fake(self, event_type, detail=0, **kwargs):
+        with self._lock:
+            xtest.fake_input(self._display, event_type, detail, **kwargs)
+            self._display.flush()
+
+    def _mouse_down(self, button):
+        self._fake(X.ButtonPress, _X_BUTTONS[button])
+
+    def _mouse_up(self, button):
+        self._fake(X.ButtonRelease, _X_BUTTONS[button])
+
+    def _key_down(self, key):
+        self._fake(X.KeyPress, self._keycode(key))
+
+    def _key_up(self, key):
+        self._fake(X.KeyRelease, self._keycode(key))
+
+    def _move_to(self, x, y):
+        self._fake(X.MotionNotify, x=x, y=y)
+
+    def _keycode(self, key: str) -> int:
+        code = self._keycodes.get(key)
+        if code is None:
+            keysym = XK.string_to_keysym(_X_KEYSYMS.get(key.lower(), key))
+            if not keysym:
+                keysym = XK.string_to_keysym(key.upper())  # function keys: "f4" -> "F4"
+            code = self._display.keysym_to_keycode(keysym)
+            if not code:
+                raise ValueError(f"No keycode for key '{key}'")
+            self._keycodes[key] = code
+        return code
+
+    def position(self):
+        with self._lock:
+            pointer = self._display.screen().root.query_pointer()
+        return int(pointer.root_x), int(pointer.root_y)
+
+    def screen_size(self):
+        screen = self._display.screen()
+        return int(screen.width_in_pixels), int(screen.height_in_pixels)
+
+    def close(self):
+        self._display.close()
+
+
+_UINPUT_BUTTONS = {"left": "BTN_LEFT", "middle": "BTN_MIDDLE", "right": "BTN_RIGHT"}
+
+_UINPUT_KEYS = {
+    "esc": "KEY_ESC", "escape": "KEY_ESC", "enter": "KEY_ENTER", "return": "KEY_ENTER",
+    "space": "KEY_SPACE", "tab": "KEY_TAB", "backspace": "KEY_BACKSPACE", "shift": "KEY_LEFTSHIFT",
+    "ctrl": "KEY_LEFTCTRL", "alt": "KEY_LEFTALT", "up": "KEY_UP", "down": "KEY_DOWN",
+    "left": "KEY_LEFT", "right": "KEY_RIGHT",
+}
+
+
+class UInputBackend(InputBackend):
+    """
+    Kernel-level virtual device via /dev/uinput (python-evdev). Works under
+    X11 and Wayland; needs write access to /dev/uinput. The device reports
+    absolute coordinates scaled to `screen_size`. uinput is write-only, so
+    position() returns None.
+
+    Only keyboard keys (codes below BTN_MISC) and the three mouse buttons
+    are declared: with touch, pen or joystick buttons next to ABS_X/ABS_Y,
+    udev/libinput would classify the device as a touchscreen, tablet or
+    joystick and remap or drop the absolute moves.
+    """
+    name = "uinput"
+
+    def __init__(self, screen_size: Tuple[int, int]):
+        super().__init__()
+        self._size = screen_size
+        keys = [getattr(ecodes, n) for n in _UINPUT_BUTTONS.values()]
+        keys += list(range(ecodes.KEY_ESC, ecodes.BTN_MISC))
+        width, height = screen_size
+        caps = {
+            ecodes.EV_KEY: sorted(set(keys)),
+            ecodes.EV_ABS: [
+                (ecodes.ABS_X, evdev.AbsInfo(0, 0, width - 1, 0, 0, 0)),
+                (ecodes.ABS_Y, evdev.AbsInfo(0, 0, height - 1, 0, 0, 0)),
+            ],
+        }
+        self._device = evdev.UInput(caps, name="azerus-input")
+        self._lock = threading.Lock()
+
+    def _emit(self, events):
+        with self._lock:
+            for etype, code, value in events:
+                self._device.write(etype, code, value)
+            self._device.syn()
+
+    def _mouse_down(self, button):
+        self._emit([(ecodes.EV_KEY, getattr(ecodes, _UINPUT_BUTTONS[button]), 1)])
+
+    def _mouse_up(self, button):
+        self._emit([(ecodes.EV_KEY, getattr(ecodes, _UINPUT_BUTTONS[button]), 0)])
+
+    def _key_down(self, key):
+        self._emit([(ecodes.EV_KEY, self._keycode(key), 1)])
+
+    def _key_up(self, key):
+        self._emit([(ecodes.EV_KEY, self._keycode(key), 0)])
+
+    def _move_to(self, x, y):
+        self._emit([(ecodes.EV_ABS, ecodes.ABS_X, x), (ecodes.EV_ABS, ecodes.ABS_Y, y)])
+
+    @staticmethod
+    def _keycode(key: str) -> int:
+        name = _UINPUT_KEYS.get(key.lower(), f"KEY_{key.upper()}")
+        code = ecodes.ecodes.get(name)
+        if code is None or not ecodes.KEY_ESC <= code < ecodes.BTN_MISC:
+            raise ValueError(f"No uinput keycode for key '{key}'")
+        return code
+
+    def position(self):
+        return None
+
+    def screen_size(self):
+        return self._size
+
+    def close(self):
+        self._device.close()
+
+
+class RecordingBackend(InputBackend):
+    """
+    Fake backend for tests, benchmarks and session replay: records every
+    action as (perf_counter_ns, op, args), tracks its own fake cursor (so
+    position() only echoes the last move_to), and can burn
+    `call_cost_s` per action to model a real backend's overhead.
+    """
+    name = "recording"
+
+    def __init__(self, screen_size: Tuple[int, int] = (1920, 1080), call_cost_s: float = 0.0):
+        super().__init__()
+        self._size = screen_size
+        self._pos = (screen_size[0] // 2, screen_size[1] // 2)
+        self.call_cost_s = call_cost_s
+        self.actions: List[tuple] = []
+
+    def _record(self, op, *args):
+        self.actions.append((time.perf_counter_ns(), op, args))
+        if self.call_cost_s:
+            end = time.perf_counter() + self.call_cost_s
+            while time.perf_counter() < end:
+                pass
+
+    def _click(self, button):
+        self._record("click", button)
+
+    def _mouse_down(self, button):
+        self._record("mouse_down", button)
+
+    def _mouse_up(self, button):
+        self._record("mouse_up", button)
+
+    def _press(self, key):
+        self._record("press", key)
+
+    def _key_down(self, key):
+        self._record("key_down", key)
+
+    def _key_up(self, key):
+        self._record("key_up", key)
+
+    def _move_to(self, x, y):
+        self._record("move_to", x, y)
+        self._pos = (x, y)
+
+    def timestamps(self, op: str) -> List[int]:
+        return [ts for ts, o, _ in self.actions if o == op]
+
+    def position(self):
+        return self._pos
+
+    def screen_size(self):
+        return self._size
+
+
+def create_backend(name: str = "auto") -> Optional[InputBackend]:
+    """
+    Builds the requested backend. "auto" prefers XTEST on an X11 session,
+    then uinput, then pyautogui. Returns None when nothing is usable.
+    """
+    if name not in BACKEND_NAMES:
+        logger.warning(f"[InputBackend] Unknown backend '{name}'; using auto.")
+        name = "auto"
+    if name == "recording":
+        return RecordingBackend()
+
+    candidates = [name] if name != "auto" else []
+    if name == "auto" and sys.platform.startswith("linux"):
+        if os.environ.get("DISPLAY") and os.environ.get("XDG_SESSION_TYPE", "x11") != "wayland":
+            candidates.append("xtest")
+        candidates.append("uinput")
+    if "pyautogui" not in candidates:
+        candidates.append("pyautogui")
+
+    for candidate in candidates:
+        try:
+            backend = _build(candidate)
+        except Exception as e:
+            logger.warning(f"[InputBackend] '{candidate}' unavailable: {e}")
+            continue
+        if backend is not None:
+            logger.info(f"[InputBackend] Using '{backend.name}' input backend.")
+            return backend
+    logger.error("[InputBackend] No input backend available (install python-xlib, evdev or pyautogui).")
+    return None
+
+
+def create_backend_from_config(config) -> Optional[InputBackend]:
+    name = config.get(CONFIG_KEY, "auto") if config is not None else "auto"
+    return create_backend(name)
+
+
+def _build(name: str) -> Optional[InputBackend]:
+    if name == "xtest":
+        if xdisplay is None:
+            raise RuntimeError("python-xlib not installed")
+        return XTestBackend()
+    if name == "uinput":
+        if evdev is None:
+            raise RuntimeError("evdev not installed")
+        return UInputBackend(_probe_screen_size())
+    if name == "pyautogui":
+        if not pyautogui:
+            raise RuntimeError("pyautogui not installed")
+        return PyAutoGUIBackend()
+    return None
+
+
+def _probe_screen_size() -> Tuple[int, int]:
+    if xdisplay is not None and os.environ.get("DISPLAY"):
+        try:
+            display = xdisplay.Display()
+            screen = display.screen()
+            size = (int(screen.width_in_pixels), int(screen.height_in_pixels))
+            display.close()
+            return size
+        except Exception:
+            pass
+    if pyautogui:
+        w, h = pyautogui.size()
+        return int(w), int(h)
+    raise RuntimeError("cannot determine screen size for uinput")
@@ -0,0 +1,107 @@
+import time
+import threading
+import importlib
+import importlib.util
+import logging
+
+from Modules.metrics import registry as metrics
+
+logger = logging.getLogger("LazyImport")
+
+_lock = threading.RLock()
+_modules = {}
+
+
+class LazyModule:
+    """
+    Stand-in for a heavy optional dependency (cv2, numpy, pyautogui, ...)
+    that is imported on first attribute access instead of at module import.
+
+    Truthiness answers "is it usable?": the first bool() imports the
+    module and is False when that fails, whether it is missing or installed
+    but broken (pyautogui without a DISPLAY), so `if not pyautogui` guards
+    never let a failing attribute access through. The answer is cached, so
+    guards stay cheap after that. Code that only picks a backend at
+    construction uses installed() instead, which does not import.
+    Import time is recorded as `import.<name>`.
+    """
+
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+        self.__dict__["_failed"] = False
+
+    # Underscored so it never shadows a module attribute (np.load).
+    def _lazy_load(self):
+        module = self._module
+        if module is None:
+            with _lock:
+                module = self._module
+                if module is None:
+                    start = time.perf_counter_ns()
+                    module = importlib.import_module(self._name)
+                    elapsed = time.perf_counter_ns() - start
+                    metrics.record(f"import.{self._name}", elapsed)
+                    logger.debug(f"[LazyImport] Imported {self._name} in {elapsed / 1e6:.1f} ms.")
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._lazy_load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._lazy_load(), attr, value)
+
+    def __bool__(self):
+        if self._module is not None:
+            return True
+        if self._failed:
+            return False
+        try:
+            self._lazy_load()
+        except Exception as e:
+            with _lock:
+                if not self._failed:
+                    self.__dict__["_failed"] = True
+                    if not (isinstance(e, ModuleNotFoundError) and e.name == self._name):
+                        logger.warning(f"[LazyImport] {self._name} failed to import: {type(e).__name__}: {e}")
+            return False
+        return True
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Shared LazyModule for `name`; every importer sees the same proxy."""
+    with _lock:
+        module = _modules.get(name)
+        if module is None:
+            module = _modules[name] = LazyModule(name)
+        return module
+
+
+def installed(module: LazyModule) -> bool:
+    """Whether the module can be found, without importing it."""
+    if module._module is not None:
+        return True
+    if module._failed:
+        return False
+    try:
+        return importlib.util.find_spec(module._name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def preload(*names: str) -> dict:
+    """Imports the given modules now; returns {name: ms} (None if missing)."""
+    timings = {}
+    for name in names:
+        module = lazy_import(name)
+        start = time.perf_counter_ns()
+        if not module:
+            timings[name] = None
+            continue
+        timings[name] = (time.perf_counter_ns() - start) / 1e6
+    return timings
@@ -0,0 +1,490 @@
+import os
+import sys
+import time
+import select
+import threading
+import logging
+import ctypes
+import ctypes.util
+import struct
+from typing import Callable, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger("LogFollower")
+
+READ_CHUNK = 64 * 1024
+
+# inotify constants (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+DIR_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+
+class _Inotify:
+    """
+    Minimal ctypes inotify wrapper watching directories (so rotation, which
+    replaces the file, is seen as well as appends); one instance watches the
+    directories of every followed file. A self-pipe lets other
+    threads interrupt a blocking wait.
+    """
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        self._wds: Dict[str, int] = {}
+
+    def watch_dirs(self, directories: Set[str]):
+        """Watches exactly `directories`: adds the new ones, drops the rest."""
+        for directory in list(self._wds):
+            if directory not in directories:
+                self._libc.inotify_rm_watch(self.fd, self._wds.pop(directory))
+        for directory in directories:
+            if directory in self._wds:
+                continue
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), DIR_WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+            self._wds[directory] = wd
+
+    def wait(self, timeout: float) -> Optional[set]:
+        """
+        Blocks until a filesystem event, a wake() call or timeout.
+        Returns the set of file names touched (empty on wake/timeout).
+        """
+        ready, _, _ = select.select([self.fd, self._wake_r], [], [], timeout)
+        names = set()
+        if self._wake_r in ready:
+            try:
+                while os.read(self._wake_r, 512):
+                    pass
+            except BlockingIOError:
+                pass
+        if self.fd in ready:
+            try:
+                while True:
+                    buf = os.read(self.fd, 8192)
+                    if not buf:
+                        break
+                    pos = 0
+                    while pos + _EVENT_HEADER.size <= len(buf):
+                        _, _, _, name_len = _EVENT_HEADER.unpack_from(buf, pos)
+                        pos += _EVENT_HEADER.size
+                        name = buf[pos:pos + name_len].rstrip(b"\0")
+                        pos += name_len
+                        if name:
+                            names.add(os.fsdecode(name))
+            except BlockingIOError:
+                pass
+        return names
+
+    def wake(self):
+        try:
+            os.write(self._wake_w, b"\0")
+        except (BlockingIOError, OSError):
+            pass
+
+    def close(self):
+        for fd in (self.fd, self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def _open_shared(path: str):
+    """
+    Opens `path` for unbuffered binary reading. On Windows the handle is
+    created with FILE_SHARE_DELETE so the game can still rotate/delete
+    latest.log while we hold it.
+    """
+    if not sys.platform.startswith("win"):
+        return open(path, "rb", buffering=0)
+    import msvcrt
+    from ctypes import wintypes
+    GENERIC_READ = 0x80000000
+    FILE_SHARE_ALL = 0x1 | 0x2 | 0x4
+    OPEN_EXISTING = 3
+    INVALID_HANDLE = ctypes.c_void_p(-1).value
+    create_file = ctypes.windll.kernel32.CreateFileW
+    create_file.restype = wintypes.HANDLE
+    handle = create_file(path, GENERIC_READ, FILE_SHARE_ALL, None, OPEN_EXISTING, 0, None)
+    if handle == INVALID_HANDLE or handle is None:
+        raise ctypes.WinError()
+    fd = msvcrt.open_osfhandle(handle, os.O_RDONLY | os.O_BINARY)
+    return os.fdopen(fd, "rb", buffering=0)
+
+
+class _TailedFile:
+    """
+    One followed file: persistent handle, identity (dev, inode), byte offset
+    and the trailing partial line not yet terminated by a newline.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.handle = None
+        self.identity = None
+        self.offset = 0
+        self.partial = b""
+
+    def open(self, at_end: bool = False, resume: bool = False) -> bool:
+        """
+        Opens the path; with `at_end` reading starts after the last complete
+        line already in the file instead of at its beginning. With `resume`
+        (after suspend()) the same file, by identity, continues at the
+        previous offset; a different or shrunk one starts over.
+        """
+        try:
+            handle = _open_shared(self.path)
+        except OSError:
+            return False
+        st = os.fstat(handle.fileno())
+        identity = (st.st_dev, st.st_ino)
+        if resume and identity == self.identity and st.st_size >= self.offset:
+            self.handle = handle
+            handle.seek(self.offset)
+            return True
+        self.close()
+        self.handle = handle
+        self.identity = identity
+        self.offset = 0
+        self.partial = b""
+        if at_end and st.st_size:
+            self.offset = self._last_line_end(st.st_size)
+            handle.seek(self.offset)
+        return True
+
+    def close(self):
+        if self.handle is not None:
+            try:
+                self.handle.close()
+            except OSError:
+                pass
+        self.handle = None
+        self.identity = None
+
+    def suspend(self):
+        """Drops the handle (e.g. after a read error) but keeps identity, offset and partial line."""
+        handle, self.handle = self.handle, None
+        if handle is not None:
+            try:
+                handle.close()
+            except OSError:
+                pass
+
+    def read_lines(self):
+        """
+        Reads everything appended since the last call and returns complete
+        lines as bytes (without the newline). Detects in-place truncation.
+        """
+        if self.handle is None:
+            return []
+        data = bytearray()
+        while True:
+            chunk = self.handle.read(READ_CHUNK)
+            if not chunk:
+                break
+            data += chunk
+        if not data:
+            size = os.fstat(self.handle.fileno()).st_size
+            if size < self.offset:
+                logger.debug(f"[LogFollower] Truncated ({self.offset} -> {size}); restarting at 0.")
+                self.handle.seek(0)
+                self.offset = 0
+                self.partial = b""
+                return self.read_lines()
+            return []
+        self.offset += len(data)
+        buf = self.partial + bytes(data)
+        lines = buf.split(b"\n")
+        self.partial = lines.pop()
+        return lines
+
+    def _last_line_end(self, size: int) -> int:
+        # An unterminated last line is still being written; keep it so it is
+        # delivered whole once its newline arrives.
+        pos = size
+        while pos > 0:
+            start = max(0, pos - READ_CHUNK)
+            self.handle.seek(start)
+            nl = self.handle.read(pos - start).rfind(b"\n")
+            if nl >= 0:
+                return start + nl + 1
+            pos = start
+        return 0
+
+    def rotated(self) -> bool:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return False  # Missing for now; keep draining the old handle.
+        return self.identity != (st.st_dev, st.st_ino)
+
+
+LineHandler = Callable[[str, int], None]
+
+
+class FollowSlot:
+    """One followed log inside a MultiLogFollower (handle returned by add())."""
+    __slots__ = ("on_line", "pending_path", "path_changed", "start_at_end", "file")
+
+    def __init__(self, on_line: LineHandler, path: Optional[str], start_at_end: bool = True):
+        self.on_line = on_line
+        self.pending_path = path
+        self.path_changed = path is not None
+        self.start_at_end = start_at_end
+        self.file: Optional[_TailedFile] = None
+
+
+class MultiLogFollower:
+    """
+    Follows any number of growing log files from one thread.
+
+    Each add() registers a file and its `on_line(line, seen_ns)` handler
+    (seen_ns is time.perf_counter_ns() at read time) and returns a slot
+    that can be retargeted or removed while run() is going. Every file keeps
+    a single persistent handle. The loop wakes on inotify events for the
+    directories involved (Linux) or polls the open handles elsewhere, and
+    drains every slot per wake-up, so N logs cost one thread and one wait
+    instead of N. Polling is adaptive: every `poll_interval` seconds right
+    after data arrived, doubling while the logs stay quiet up to
+    `max_poll_interval` (the old fixed interval), so an idle game costs a
+    few reads per second and a burst of lines is followed closely. Rotation is detected by
+    comparing the (device, inode) of the path with the open handle;
+    truncation by the handle size dropping below our offset.
+
+    A file that already exists when it is attached is followed from its end
+    (`start_at_end`, the default), so old lines never fire triggers again;
+    a file that appears or replaces it by rotation is read from the start,
+    and after a read error the same file is resumed at its old offset.
+    Use log_scanner.py to look at the backlog.
+    """
+
+    def __init__(self,
+                 poll_interval: float = 0.005,
+                 rotation_check_interval: float = 0.5,
+                 encoding: str = "utf-8",
+                 use_inotify: bool = True,
+                 max_poll_interval: float = 0.25):
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max(poll_interval, max_poll_interval)
+        self._poll_wait = poll_interval
+        self.rotation_check_interval = rotation_check_interval
+        self.encoding = encoding
+
+        self._lock = threading.Lock()
+        self._slots: Tuple[FollowSlot, ...] = ()
+        self._removed = []
+        self._watches_changed = False
+        self._wake_event = threading.Event()
+
+        self._inotify = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify()
+            except Exception as e:
+                logger.info(f"[LogFollower] inotify unavailable ({e}); polling every "
+                            f"{poll_interval * 1000:.0f}-{self.max_poll_interval * 1000:.0f} ms.")
+
+    # ------------- Public API -------------
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self._inotify else "poll"
+
+    @property
+    def slots(self) -> Tuple[FollowSlot, ...]:
+        return self._slots
+
+    def add(self, on_line: LineHandler, path: Optional[str] = None, start_at_end: bool = True) -> FollowSlot:
+        slot = FollowSlot(on_line, path, start_at_end)
+        with self._lock:
+            self._slots = self._slots + (slot,)
+        self.wake()
+        return slot
+
+    def retarget(self, slot: FollowSlot, path: Optional[str]):
+        slot.pending_path = path
+        slot.path_changed = True
+        self.wake()
+
+    def remove(self, slot: FollowSlot):
+        with self._lock:
+            if slot not in self._slots:
+                return
+            self._slots = tuple(s for s in self._slots if s is not slot)
+            self._removed.append(slot)
+        self.wake()
+
+    def wake(self):
+        self._wake_event.set()
+        if self._inotify:
+            self._inotify.wake()
+
+    def run(self, stop_event: threading.Event):
+        """
+        Blocking follow loop; returns once stop_event is set (call wake()
+        after setting it for an immediate exit).
+        """
+        logger.debug(f"[LogFollower] Running in {self.mode} mode.")
+        last_rotation_check = time.monotonic()
+        try:
+            while not stop_event.is_set():
+                if self._removed:
+                    self._close_removed()
+                slots = self._slots
+                for slot in slots:
+                    if slot.path_changed:
+                        self._apply_path(slot)
+                if self._watches_changed:
+                    self._update_watches()
+
+                active = False
+                for slot in slots:
+                    active = self._drain(slot) or active
+
+                touched = self._wait(active)
+                now = time.monotonic()
+                check_all = now - last_rotation_check >= self.rotation_check_interval
+                if check_all:
+                    last_rotation_check = now
+                for slot in self._slots:
+                    if slot.file is not None and (check_all or os.path.basename(slot.file.path) in touched):
+                        self._check_rotation(slot)
+        finally:
+            self._close_removed()
+            for slot in self._slots:
+                if slot.file:
+                    slot.file.close()
+                    slot.file = None
+                slot.path_changed = slot.pending_path is not None
+            if self._inotify:
+                self._inotify.close()
+                self._inotify = None
+
+    # ------------- Internal -------------
+
+    def _wait(self, active: bool) -> set:
+        if self._inotify:
+            return self._inotify.wait(self.rotation_check_interval)
+        self._poll_wait = self.poll_interval if active else min(self._poll_wait * 2, self.max_poll_interval)
+        if self._wake_event.wait(self._poll_wait):
+            self._poll_wait = self.poll_interval
+        self._wake_event.clear()
+        return set()
+
+    def _close_removed(self):
+        with self._lock:
+            removed, self._removed = self._removed, []
+        for slot in removed:
+            if slot.file:
+                slot.file.close()
+                slot.file = None
+        if removed:
+            self._watches_changed = True
+
+    def _apply_path(self, slot: FollowSlot):
+        slot.path_changed = False
+        path = slot.pending_path
+        if slot.file:
+            slot.file.close()
+            slot.file = None
+        self._watches_changed = True
+        if not path:
+            return
+        slot.file = _TailedFile(path)
+        if slot.file.open(at_end=slot.start_at_end):
+            logger.info(f"[LogFollower] Following {path}" + (f" from byte {slot.file.offset}" if slot.file.offset else ""))
+        else:
+            logger.warning(f"[LogFollower] Log not found yet: {path}")
+
+    def _update_watches(self):
+        self._watches_changed = False
+        if not self._inotify:
+            return
+        directories = {os.path.dirname(os.path.abspath(slot.file.path)) or "."
+                       for slot in self._slots if slot.file is not None}
+        try:
+            self._inotify.watch_dirs(directories)
+        except OSError as e:
+            logger.warning(f"[LogFollower] {e}; falling back to polling.")
+            self._inotify.close()
+            self._inotify = None
+
+    def _check_rotation(self, slot: FollowSlot):
+        f = slot.file
+        if f.handle is None:
+            resumed = f.identity is not None
+            if f.open(resume=resumed):
+                logger.info(f"[LogFollower] Log {'reopened' if resumed else 'appeared'}: {f.path}")
+                self._drain(slot)
+            return
+        if f.rotated():
+            # Flush whatever the old file still had before switching over.
+            self._drain(slot)
+            if f.partial:
+                self._emit(slot, f.partial)
+            logger.info(f"[LogFollower] Log rotated; reopening {f.path}.")
+            f.open()
+            self._drain(slot)
+
+    def _drain(self, slot: FollowSlot) -> bool:
+        """Emits the slot's new complete lines; True if any data was read."""
+        f = slot.file
+        if f is None or f.handle is None:
+            return False
+        offset = f.offset
+        try:
+            lines = f.read_lines()
+        except OSError as e:
+            # Reopened (and resumed at this offset) by the next rotation check.
+            logger.error(f"[LogFollower] Read error on {f.path}: {e}")
+            f.suspend()
+            return False
+        for raw in lines:
+            self._emit(slot, raw)
+        return f.offset != offset
+
+    def _emit(self, slot: FollowSlot, raw: bytes):
+        seen_ns = time.perf_counter_ns()
+        line = raw.rstrip(b"\r").decode(self.encoding, errors="ignore")
+        try:
+            slot.on_line(line, seen_ns)
+        except Exception as e:
+            logger.error(f"[LogFollower] Line handler error: {e}")
+
+
+class LogFollower(MultiLogFollower):
+    """
+    Single-file MultiLogFollower with the original interface: `on_line` and
+    `path` are given up front and set_path() switches files.
+    """
+
+    def __init__(self,
+                 on_line: LineHandler,
+                 path: Optional[str] = None,
+                 poll_interval: float = 0.005,
+                 rotation_check_interval: float = 0.5,
+                 encoding: str = "utf-8",
+                 use_inotify: bool = True,
+                 start_at_end: bool = True,
+                 max_poll_interval: float = 0.25):
+        super().__init__(poll_interval=poll_interval, rotation_check_interval=rotation_check_interval,
+                         encoding=encoding, use_inotify=use_inotify, max_poll_interval=max_poll_interval)
+        self.on_line = on_line
+        self._slot = self.add(on_line, path, start_at_end)
+
+    def set_path(self, path: Optional[str]):
+        self.retarget(self._slot, path)
@@ -1,15 +1,66 @@
 import logging
+import threading
+from collections import deque
+from queue import Full
+from typing import Iterable, List, Tuple
+
+# (levelno, levelname, message)
+LogEntry = Tuple[int, str, str]
+
 
 class TkinterQueueHandler(logging.Handler):
     """
     Logging handler that puts log records into a queue for the Tkinter thread.
+
+    The queue should be bounded: when it is full the record is dropped and
+    counted in `dropped` instead of blocking the emitting thread. Records are
+    reduced to (levelno, levelname, message) so the queue never keeps record
+    objects (and their args) alive.
     """
     def __init__(self, queue):
         super().__init__()
         self.queue = queue
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
 
     def emit(self, record):
         try:
-            self.queue.put(record)
+            self.queue.put_nowait((record.levelno, record.levelname, record.getMessage()))
+        except Full:
+            with self._dropped_lock:
+                self._dropped += 1
         except Exception:
-            self.handleError(record)
\ No newline at end of file
+            self.handleError(record)
+
+
+class LogRingBuffer:
+    """
+    Fixed-capacity store of the most recent log entries. The GUI renders from
+    here, so filters can be re-applied without touching the Text widget's
+    history.
+    """
+    def __init__(self, capacity: int = 5000):
+        self.capacity = capacity
+        self._entries = deque(maxlen=capacity)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def extend(self, entries: Iterable[LogEntry]):
+        self._entries.extend(entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    def filtered(self, min_level: int = logging.NOTSET, text: str = "") -> List[LogEntry]:
+        return [e for e in self._entries if entry_matches(e, min_level, text)]
+
+
+def entry_matches(entry: LogEntry, min_level: int, text: str) -> bool:
+    if entry[0] < min_level:
+        return False
+    return not text or text in entry[2].lower()
@@ -0,0 +1,318 @@
+"""
+Offline scan of Minecraft log backlogs for trigger messages.
+
+Looks through latest.log and the rotated YYYY-MM-DD-N.log.gz archives
+for every trigger rule, without replaying a single line into the watchers
+(nothing is dispatched, so no recovery can fire). Plain files are mapped
+with mmap and archives decompressed in one go; both are searched at the
+byte level: bytes.find per literal when every rule is a literal, one
+combined bytes regex otherwise (regex rules then see UTF-8 bytes, so
+character classes like \\w are ASCII-only).
+
+Occurrences are stored in a JSON index, per file:
+
+    {"size", "mtime_ns", "inode", "scanned", "date", "hits": [[offset, ts, rule, line], ...]}
+
+Archives never change, so a second run only re-reads what is new: files
+whose size/mtime differ, and the appended tail of latest.log (from
+`scanned`, the end of the last complete line seen). The index is dropped
+when the rule set changes.
+
+Timestamps come from the "[HH:MM:SS]" line prefix plus the date in the
+file name (file mtime for latest.log, where a time of day later than the
+mtime's belongs to the day before); a time earlier than the previous hit
+in the same file is taken as a midnight rollover.
+
+    python -m Modules.log_scanner ~/.minecraft/logs
+    python -m Modules.log_scanner ~/.minecraft/logs --since 2024-05-01 --json
+"""
+import os
+import re
+import sys
+import gzip
+import json
+import mmap
+import time
+import hashlib
+import argparse
+import logging
+import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from Modules.config import ConfigStore
+from Modules.triggers import TriggerEngine, TriggerRule
+
+logger = logging.getLogger("LogScanner")
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_PATH = "log_index.json"
+LINE_TEXT_LIMIT = 200  # characters of each matching line kept in the index
+
+_TIME_RE = re.compile(rb"\[(\d{2}):(\d{2}):(\d{2})")
+_DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})")
+
+
+class Hit:
+    """One trigger occurrence: file, byte offset of its line, wall time (or None), rule, line text."""
+    __slots__ = ("path", "offset", "ts", "rule", "line")
+
+    def __init__(self, path: str, offset: int, ts: Optional[float], rule: str, line: str):
+        self.path = path
+        self.offset = offset
+        self.ts = ts
+        self.rule = rule
+        self.line = line
+
+
+def collect_files(paths: Iterable[str]) -> List[str]:
+    """
+    Expands directories into their *.log / *.log.gz files, oldest first
+    (archives by name, latest.log last).
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            names = [n for n in os.listdir(path) if n.endswith(".log") or n.endswith(".log.gz")]
+            names.sort(key=lambda n: (n == "latest.log", n))
+            files.extend(os.path.join(path, n) for n in names)
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            logger.warning(f"[LogScanner] Not found: {path}")
+    return [os.path.abspath(f) for f in files]
+
+
+class LogScanner:
+    """
+    Finds trigger rule occurrences in log files, reusing the on-disk index
+    for files that have not changed since the last scan.
+    """
+
+    def __init__(self, rules: List[TriggerRule], index_path: Optional[str] = DEFAULT_INDEX_PATH):
+        self.rules = list(rules)
+        self.index_path = index_path
+        self.rules_hash = hashlib.sha1(json.dumps(
+            [(r.name, r.literal, r.regex) for r in self.rules]).encode("utf-8")).hexdigest()
+        self._needles = None
+        self._regex = None
+        if all(r.literal is not None for r in self.rules):
+            self._needles = [(r.name, r.literal.encode("utf-8")) for r in self.rules]
+        else:
+            self._names = [r.name for r in self.rules]
+            self._regex = re.compile(b"|".join(
+                b"(?P<r%d>%s)" % (i, r.pattern.encode("utf-8")) for i, r in enumerate(self.rules)))
+        self.stats = {}
+
+    @classmethod
+    def from_config(cls, config, index_path: Optional[str] = DEFAULT_INDEX_PATH) -> "LogScanner":
+        return cls(TriggerEngine.from_config(config).rules(), index_path)
+
+    # ------------- Public API -------------
+
+    def scan(self, paths: Iterable[str]) -> List[Hit]:
+        """Every hit in `paths` (files or log directories), oldest file first."""
+        start = time.perf_counter()
+        index = self._load_index()
+        files = collect_files(paths)
+        scanned_bytes = 0
+        reused = 0
+        hits: List[Hit] = []
+        for path in files:
+            try:
+                st = os.stat(path)
+            except OSError as e:
+                logger.warning(f"[LogScanner] Cannot stat {path}: {e}")
+                continue
+            entry = index.get(path)
+            if entry is not None and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+                reused += 1
+            else:
+                try:
+                    entry, read = self._scan_file(path, st, entry)
+                except (OSError, EOFError, ValueError) as e:
+                    logger.warning(f"[LogScanner] Cannot read {path}: {e}")
+                    continue
+                scanned_bytes += read
+                index[path] = entry
+            hits.extend(Hit(path, offset, ts, rule, line) for offset, ts, rule, line in entry["hits"])
+        self._save_index(index)
+        self.stats = {
+            "files": len(files),
+            "from_index": reused,
+            "scanned_bytes": scanned_bytes,
+            "hits": len(hits),
+            "elapsed_s": time.perf_counter() - start,
+        }
+        logger.info(f"[LogScanner] {len(files)} file(s), {reused} from index, {scanned_bytes / 1e6:.1f} MB read, "
+                    f"{len(hits)} hit(s) in {self.stats['elapsed_s']:.2f} s.")
+        return hits
+
+    # ------------- Internal -------------
+
+    def _scan_file(self, path: str, st, previous: Optional[dict]):
+        """Returns (index entry, bytes read) for one file, continuing `previous` if it only grew."""
+        compressed = path.endswith(".gz")
+        date, latest = _file_date(path, st)
+        hits, start = [], 0
+        if (not compressed and previous is not None and previous.get("inode") == st.st_ino
+                and previous.get("date") == date and st.st_size >= previous["scanned"]):
+            hits, start = list(previous["hits"]), previous["scanned"]
+
+        if compressed:
+            with gzip.open(path, "rb") as f:
+                data = f.read()
+            scanned = len(data)
+            self._search(data, 0, date, hits, latest=latest)
+        elif st.st_size == 0:
+            scanned = 0
+        else:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                # Stop at the last newline: a half-written line is picked up next time.
+                scanned = data.rfind(b"\n") + 1
+                if scanned > start:
+                    self._search(data, start, date, hits, end=scanned, latest=latest)
+                else:
+                    scanned = start
+        entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "inode": st.st_ino,
+                 "scanned": scanned, "date": date, "hits": hits}
+        return entry, (scanned if compressed else scanned - start)
+
+    def _search(self, data, start: int, date: Optional[str], hits: list, end: Optional[int] = None,
+                latest: Optional[datetime.time] = None):
+        """`latest` is the mtime's time of day when `date` came from the mtime."""
+        end = len(data) if end is None else end
+        found = []  # (line start, rule)
+        if self._needles is not None:
+            for name, needle in self._needles:
+                pos = data.find(needle, start, end)
+                while pos >= 0:
+                    line_end = data.find(b"\n", pos, end)
+                    found.append((data.rfind(b"\n", 0, pos) + 1, name))
+                    if line_end < 0:
+                        break
+                    pos = data.find(needle, line_end, end)
+        else:
+            last = {}
+            for m in self._regex.finditer(data, start, end):
+                name = self._names[int(m.lastgroup[1:])]
+                line_start = data.rfind(b"\n", 0, m.start()) + 1
+                if last.get(name) != line_start:
+                    last[name] = line_start
+                    found.append((line_start, name))
+        found.sort()
+
+        day = datetime.date.fromisoformat(date) if date else None
+        prev = hits[-1][1] if hits and hits[-1][1] is not None else None
+        for line_start, name in found:
+            line_end = data.find(b"\n", line_start, end)
+            raw = data[line_start:line_end if line_end >= 0 else end]
+            ts = None
+            m = _TIME_RE.match(raw)
+            if m and day is not None:
+                h, mi, s = (int(g) for g in m.groups())
+                line_day = day
+                if latest is not None and datetime.time(h, mi, s) > latest:
+                    line_day = day - datetime.timedelta(days=1)  # logged before midnight
+                ts = datetime.datetime(line_day.year, line_day.month, line_day.day, h, mi, s).timestamp()
+                while prev is not None and ts < prev:
+                    ts += 86400.0
+                prev = ts
+            line = raw.rstrip(b"\r").decode("utf-8", errors="ignore")[:LINE_TEXT_LIMIT]
+            hits.append([line_start, ts, name, line])
+
+    def _load_index(self) -> Dict[str, dict]:
+        if not self.index_path or not os.path.isfile(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"[LogScanner] Cannot read index {self.index_path}: {e}; rescanning.")
+            return {}
+        if data.get("version") != INDEX_VERSION or data.get("rules") != self.rules_hash:
+            logger.info("[LogScanner] Trigger rules changed; rescanning everything.")
+            return {}
+        return data.get("files", {})
+
+    def _save_index(self, files: Dict[str, dict]):
+        if not self.index_path:
+            return
+        tmp_path = self.index_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "rules": self.rules_hash, "files": files}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logger.error(f"[LogScanner] Cannot write index {self.index_path}: {e}")
+
+
+def _file_date(path: str, st) -> Tuple[Optional[str], Optional[datetime.time]]:
+    """(date, None) from the file name, or (date, time of day) of the mtime."""
+    m = _DATE_RE.search(os.path.basename(path))
+    if m:
+        return m.group(1), None
+    mtime = datetime.datetime.fromtimestamp(st.st_mtime).replace(microsecond=0)
+    return mtime.date().isoformat(), mtime.time()
+
+
+def summarize(hits: List[Hit], since: Optional[float] = None) -> dict:
+    """Totals per rule and per day, with first/last occurrence times."""
+    per_rule: Dict[str, dict] = {}
+    for hit in hits:
+        if since is not None and (hit.ts is None or hit.ts < since):
+            continue
+        r = per_rule.setdefault(hit.rule, {"total": 0, "first": None, "last": None, "per_day": {}})
+        r["total"] += 1
+        if hit.ts is not None:
+            r["first"] = hit.ts if r["first"] is None else min(r["first"], hit.ts)
+            r["last"] = hit.ts if r["last"] is None else max(r["last"], hit.ts)
+            day = datetime.date.fromtimestamp(hit.ts).isoformat()
+        else:
+            day = "unknown"
+        r["per_day"][day] = r["per_day"].get(day, 0) + 1
+    return per_rule
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="log files or log directories")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="index file ('' to disable)")
+    parser.add_argument("--config", default=None, help="config with trigger_rules (default: azerus_config.json)")
+    parser.add_argument("--since", default=None, help="only count hits on or after YYYY-MM-DD")
+    parser.add_argument("--list", action="store_true", help="print every hit")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    config = ConfigStore(args.config) if args.config else ConfigStore()
+    scanner = LogScanner.from_config(config, args.index or None)
+    hits = scanner.scan(args.paths)
+    since = time.mktime(datetime.date.fromisoformat(args.since).timetuple()) if args.since else None
+    summary = summarize(hits, since)
+
+    if args.json:
+        print(json.dumps({"stats": scanner.stats, "rules": summary}, indent=2, ensure_ascii=False))
+        return 0
+    s = scanner.stats
+    print(f"{s['files']} file(s), {s['from_index']} from index, {s['scanned_bytes'] / 1e6:.1f} MB read "
+          f"in {s['elapsed_s']:.2f} s")
+    for name, r in sorted(summary.items()):
+        span = ""
+        if r["first"] is not None:
+            span = (f"  ({time.strftime('%Y-%m-%d %H:%M', time.localtime(r['first']))} .. "
+                    f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(r['last']))})")
+        print(f"\n{name}: {r['total']}{span}")
+        for day, count in sorted(r["per_day"].items()):
+            print(f"  {day}  {count}")
+    if args.list:
+        print()
+        for hit in hits:
+            if since is not None and (hit.ts is None or hit.ts < since):
+                continue
+            when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(hit.ts)) if hit.ts is not None else "?"
+            print(f"{when}  {os.path.basename(hit.path)}@{hit.offset}  {hit.rule}: {hit.line}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
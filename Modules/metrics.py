@@ -0,0 +1,176 @@
+import json
+import time
+import threading
+import logging
+from array import array
+from contextlib import contextmanager
+from typing import Dict
+
+from Modules.tracing import tracer
+
+logger = logging.getLogger("Metrics")
+
+SUB_BUCKET_BITS = 7          # 128 linear sub-buckets per power of two -> <1.6% relative error
+MAX_VALUE_BITS = 48          # up to ~78 hours in ns
+
+_SUB_COUNT = 1 << SUB_BUCKET_BITS
+_HALF_SUB = _SUB_COUNT >> 1
+_BUCKET_COUNT = _SUB_COUNT + (MAX_VALUE_BITS - SUB_BUCKET_BITS) * _HALF_SUB
+
+
+def _bucket_index(value: int) -> int:
+    if value < _SUB_COUNT:
+        return value if value > 0 else 0
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    if shift > MAX_VALUE_BITS - SUB_BUCKET_BITS:
+        return _BUCKET_COUNT - 1
+    return _SUB_COUNT + (shift - 1) * _HALF_SUB + ((value >> shift) - _HALF_SUB)
+
+
+def _bucket_value(index: int) -> int:
+    """Upper bound (inclusive) of the values that land in `index`."""
+    if index < _SUB_COUNT:
+        return index
+    shift = (index - _SUB_COUNT) // _HALF_SUB + 1
+    mantissa = (index - _SUB_COUNT) % _HALF_SUB + _HALF_SUB
+    return ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    HDR-style log-linear histogram of nanosecond values with fixed memory
+    (one int64 counter per bucket, ~2.8k buckets). Recording is a couple of
+    integer ops and one array increment; no allocation, no lock. Concurrent
+    writers to the *same* histogram may rarely lose a count, which is fine
+    for diagnostics.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._counts = array("q", bytes(8 * _BUCKET_COUNT))
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+
+    def record(self, value_ns: int):
+        if value_ns < 0:
+            value_ns = 0
+        self._counts[_bucket_index(value_ns)] += 1
+        if self.count == 0 or value_ns < self.min_ns:
+            self.min_ns = value_ns
+        if value_ns > self.max_ns:
+            self.max_ns = value_ns
+        self.count += 1
+        self.total_ns += value_ns
+
+    def percentile(self, q: float) -> int:
+        if self.count == 0:
+            return 0
+        target = max(1, int(round(self.count * q / 100.0)))
+        seen = 0
+        for idx, c in enumerate(self._counts):
+            if c:
+                seen += c
+                if seen >= target:
+                    return min(_bucket_value(idx), self.max_ns)
+        return self.max_ns
+
+    def reset(self):
+        self._counts = array("q", bytes(8 * _BUCKET_COUNT))
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+
+    def snapshot(self) -> dict:
+        """Summary in microseconds."""
+        n = self.count
+        return {
+            "count": n,
+            "min_us": self.min_ns / 1000.0,
+            "mean_us": (self.total_ns / n / 1000.0) if n else 0.0,
+            "p50_us": self.percentile(50) / 1000.0,
+            "p90_us": self.percentile(90) / 1000.0,
+            "p99_us": self.percentile(99) / 1000.0,
+            "p999_us": self.percentile(99.9) / 1000.0,
+            "max_us": self.max_ns / 1000.0,
+        }
+
+    def buckets(self) -> Dict[int, int]:
+        """Non-empty buckets as {upper_bound_ns: count}."""
+        return {_bucket_value(i): c for i, c in enumerate(self._counts) if c}
+
+
+class MetricsRegistry:
+    """
+    Named LatencyHistograms shared by all modules. Histograms are created on
+    first use and live for the whole session.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        h = self._histograms.get(name)
+        if h is None:
+            with self._lock:
+                h = self._histograms.get(name)
+                if h is None:
+                    h = LatencyHistogram(name)
+                    self._histograms[name] = h
+        return h
+
+    def record(self, name: str, value_ns: int):
+        self.histogram(name).record(value_ns)
+        if tracer.enabled:
+            # Recorded values are durations ending now.
+            tracer.complete(name, time.perf_counter_ns() - value_ns, value_ns, cat="metric")
+
+    @contextmanager
+    def timed(self, name: str):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            self.histogram(name).record(elapsed)
+            if tracer.enabled:
+                tracer.complete(name, start, elapsed, cat="metric")
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {name: h.snapshot() for name, h in sorted(self._histograms.items())}
+
+    def reset(self):
+        for h in list(self._histograms.values()):
+            h.reset()
+
+    def format_table(self) -> str:
+        header = f"{'metric':<28}{'count':>8}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}  (ms)"
+        rows = [header, "-" * len(header)]
+        for name, s in self.snapshot().items():
+            rows.append(
+                f"{name:<28}{s['count']:>8}"
+                f"{s['p50_us'] / 1000:>10.3f}{s['p90_us'] / 1000:>10.3f}"
+                f"{s['p99_us'] / 1000:>10.3f}{s['max_us'] / 1000:>10.3f}"
+            )
+        return "\n".join(rows)
+
+    def dump(self, path: str, include_buckets: bool = True):
+        data = {
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "histograms": {},
+        }
+        for name, h in sorted(self._histograms.items()):
+            entry = h.snapshot()
+            if include_buckets:
+                entry["buckets_ns"] = {str(k): v for k, v in h.buckets().items()}
+            data["histograms"][name] = entry
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        logger.info(f"[Metrics] Dumped {len(data['histograms'])} histograms to {path}")
+
+
+# Process-wide registry used by the modules.
+registry = MetricsRegistry()
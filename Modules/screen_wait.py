@@ -0,0 +1,141 @@
+import time
+import logging
+from typing import Callable, Optional, Tuple
+
+from Modules.lazy_import import lazy_import
+from Modules.metrics import registry as metrics
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+logger = logging.getLogger("ScreenWait")
+
+Region = Tuple[int, int, int, int]
+
+SIGNATURE_SIZE = (8, 8)
+
+
+class WaitResult:
+    """Outcome of one wait; `signature` is the last probe sample (if any)."""
+    __slots__ = ("label", "ok", "elapsed_ns", "polls", "signature")
+
+    def __init__(self, label: str, ok: bool, elapsed_ns: int, polls: int, signature=None):
+        self.label = label
+        self.ok = ok
+        self.elapsed_ns = elapsed_ns
+        self.polls = polls
+        self.signature = signature
+
+    def __bool__(self):
+        return self.ok
+
+
+class ScreenProbe:
+    """
+    "Wait until the screen looks like X" with a timeout.
+
+    A probe is a small region reduced to an 8x8 grayscale signature; waits
+    re-grab it every `interval` seconds through the capture service and
+    compare against a baseline (mean absolute difference in gray levels).
+    Every wait is logged and recorded as `wait.<label>`, so the time
+    actually spent can be compared with the fixed sleeps it replaces.
+
+    Without a capture backend or OpenCV the waits degrade to sleeping for
+    the full timeout, i.e. the old fixed delays.
+    """
+
+    def __init__(self, capture, region: Optional[Region], interval: float = 0.004, threshold: float = 6.0):
+        self.capture = capture
+        self.region = region
+        self.interval = interval
+        self.threshold = threshold
+
+    # ------------- Public API -------------
+
+    @property
+    def available(self) -> bool:
+        return cv2 and np and self.capture is not None and self.capture.available
+
+    def signature(self):
+        """Current 8x8 signature of the probe region, or None if capture failed."""
+        if not self.available:
+            return None
+        frame = self.capture.capture([self.region])
+        if frame is None:
+            return None
+        gray = cv2.cvtColor(frame.view(self.region), cv2.COLOR_RGB2GRAY)
+        return cv2.resize(gray, SIGNATURE_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def distance(self, a, b) -> float:
+        return float(np.mean(np.abs(a - b)))
+
+    def wait_changed(self, baseline, timeout: float, label: str, settle_polls: int = 2) -> WaitResult:
+        """
+        Waits until the region differs from `baseline` and then holds still
+        for `settle_polls` consecutive samples (so open animations finish).
+        """
+        state = {"prev": None, "stable": 0}
+
+        def changed_and_settled(sig):
+            if baseline is None or self.distance(sig, baseline) < self.threshold:
+                state["prev"], state["stable"] = sig, 0
+                return False
+            prev = state["prev"]
+            if prev is not None and self.distance(sig, prev) < self.threshold:
+                state["stable"] += 1
+            else:
+                state["stable"] = 0
+            state["prev"] = sig
+            return state["stable"] >= settle_polls - 1
+
+        return self.wait_until(changed_and_settled, timeout, label)
+
+    def wait_until(self, predicate: Callable[[object], bool], timeout: float, label: str) -> WaitResult:
+        start = time.perf_counter_ns()
+        if not self.available:
+            time.sleep(timeout)
+            metrics.record(f"wait.{label}", time.perf_counter_ns() - start)
+            logger.debug(f"[ScreenWait] {label}: no probe available, slept fixed {timeout * 1000:.0f} ms.")
+            return WaitResult(label, True, time.perf_counter_ns() - start, 0)
+        deadline = start + int(timeout * 1e9)
+        polls = 0
+        sig = None
+        ok = False
+        while True:
+            sig = self.signature()
+            polls += 1
+            if sig is not None and predicate(sig):
+                ok = True
+                break
+            if time.perf_counter_ns() >= deadline:
+                break
+            time.sleep(self.interval)
+        return _finish(label, ok, start, polls, timeout, sig)
+
+
+def wait_for(predicate: Callable[[], bool], timeout: float, label: str, interval: float = 0.002) -> WaitResult:
+    """Polls a cheap non-screen condition (e.g. cursor position) with a timeout."""
+    start = time.perf_counter_ns()
+    deadline = start + int(timeout * 1e9)
+    polls = 0
+    ok = False
+    while True:
+        polls += 1
+        try:
+            ok = bool(predicate())
+        except Exception:
+            ok = False
+        if ok or time.perf_counter_ns() >= deadline:
+            break
+        time.sleep(interval)
+    return _finish(label, ok, start, polls, timeout)
+
+
+def _finish(label: str, ok: bool, start_ns: int, polls: int, timeout: float, signature=None) -> WaitResult:
+    elapsed = time.perf_counter_ns() - start_ns
+    metrics.record(f"wait.{label}", elapsed)
+    if ok:
+        logger.info(f"[ScreenWait] {label}: ready after {elapsed / 1e6:.1f} ms ({polls} polls, budget {timeout * 1000:.0f} ms).")
+    else:
+        logger.warning(f"[ScreenWait] {label}: timed out after {elapsed / 1e6:.1f} ms ({polls} polls).")
+    return WaitResult(label, ok, elapsed, polls, signature)
@@ -0,0 +1,413 @@
+"""
+Session record/replay for offline reproduction of recoveries.
+
+A session file is a zip archive:
+
+    session.json   header (format version, screen size, calibration, and the
+                   trigger, region, match mode and weapon config sections)
+    events.jsonl   one event per line, "t" in ns since recording start:
+                     {"t", "type": "line",  "text"}
+                     {"t", "type": "frame", "id", "left", "top"}
+                     {"t", "type": "input", "op", "args"}
+    frames/NNNNNN.npy  captured RGB pixels, one array per frame event
+
+Record from the GUI (Diagnostics -> Record Session) and replay with
+
+    python -m Modules.session_recorder replay session.zip [--fast]
+"""
+import io
+import json
+import time
+import zipfile
+import argparse
+import threading
+import logging
+from queue import Queue
+from typing import Dict, List, Optional
+
+from Modules.lazy_import import lazy_import
+from Modules.capture import CaptureBackend, FrameCaptureService
+from Modules.capture_regions import CaptureRegions, CONFIG_KEY as REGIONS_KEY
+from Modules.triggers import TriggerEngine, CONFIG_KEY as TRIGGERS_KEY
+from Modules.template_bank import TemplateBank, CONFIG_KEY as MATCH_MODE_KEY
+from Modules.weapon_library import WeaponLibrary, CONFIG_KEY as WEAPONS_KEY, SELECTION_KEY
+from Modules.calibration import Calibration
+from Modules.input_backend import RecordingBackend
+
+np = lazy_import("numpy")
+
+logger = logging.getLogger("SessionRecorder")
+
+FORMAT_VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)  # 1: no calibration in the header (templates at scale 1)
+HEADER_NAME = "session.json"
+EVENTS_NAME = "events.jsonl"
+
+
+class SessionRecorder:
+    """
+    Records log lines, captured frames and input actions to a session file.
+
+    Lines, frames and input actions come from listeners on the weapon-return
+    watcher, the capture service and the input backend; with
+    frames="recovery" only frames grabbed while a weapon recovery is in
+    progress are kept. Frame encoding runs on a writer thread so the
+    capture thread only pays for a queue put. The header records the
+    calibration in effect so a replay matches templates at the same scale.
+    """
+
+    def __init__(self, config=None, capture_service: Optional[FrameCaptureService] = None,
+                 weapon_return=None, shared_state=None, input_backend=None, frames: str = "recovery"):
+        self.config = config
+        self.capture = capture_service
+        self.shared_state = shared_state
+        self.weapon_return = weapon_return
+        self.frames_mode = frames
+        self.path: Optional[str] = None
+
+        self._lock = threading.Lock()
+        self._active = False
+        self._t0 = 0
+        self._events: List[dict] = []
+        self._frame_id = 0
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._queue: Queue = Queue()
+        self._writer: Optional[threading.Thread] = None
+
+        if capture_service is not None:
+            capture_service.add_frame_listener(self._on_frame)
+        if weapon_return is not None:
+            weapon_return.add_line_listener(self._on_line)
+        if input_backend is not None:
+            input_backend.add_listener(self._on_input)
+
+    # ------------- Public API -------------
+
+    @property
+    def recording(self) -> bool:
+        return self._active
+
+    def start(self, path: str):
+        if self._active:
+            return
+        if not np:
+            logger.error("[SessionRecorder] numpy not installed; cannot record frames.")
+            return
+        self.path = path
+        self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        self._events = []
+        self._frame_id = 0
+        self._t0 = time.perf_counter_ns()
+        self._writer = threading.Thread(target=self._write_loop, name="SessionWriter", daemon=True)
+        self._writer.start()
+        with self._lock:
+            self._active = True
+        logger.info(f"[SessionRecorder] Recording to {path} (frames: {self.frames_mode}).")
+
+    def stop(self) -> Optional[str]:
+        # Flipped under the lock _on_frame holds while it records a frame, so
+        # every frame event is queued ahead of the writer's sentinel.
+        with self._lock:
+            if not self._active:
+                return None
+            self._active = False
+        self._queue.put(None)
+        self._writer.join()
+        with self._lock:
+            events = self._events
+            self._events = []
+        self._zip.writestr(HEADER_NAME, json.dumps(self._header(), ensure_ascii=False, indent=2))
+        self._zip.writestr(EVENTS_NAME, "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in events))
+        self._zip.close()
+        self._zip = None
+        logger.info(f"[SessionRecorder] Saved {len(events)} events ({self._frame_id} frames) to {self.path}.")
+        return self.path
+
+    # ------------- Internal -------------
+
+    def _rel(self, ts_ns: int) -> int:
+        return max(0, ts_ns - self._t0)
+
+    def _append(self, event: dict):
+        with self._lock:
+            self._events.append(event)
+
+    def _on_line(self, line: str, seen_ns: int):
+        if self._active:
+            self._append({"t": self._rel(seen_ns or time.perf_counter_ns()), "type": "line", "text": line})
+
+    def _on_frame(self, frame):
+        if not self._active:
+            return
+        if self.frames_mode == "recovery" and not (self.shared_state and self.shared_state.weapon_recovery_in_progress):
+            return
+        with self._lock:
+            if not self._active:
+                return
+            frame_id = self._frame_id
+            self._frame_id += 1
+            self._events.append({"t": self._rel(frame.ts_ns), "type": "frame", "id": frame_id,
+                                 "left": frame.left, "top": frame.top})
+            self._queue.put((frame_id, frame.pixels))
+
+    def _on_input(self, op: str, args):
+        if self._active:
+            self._append({"t": self._rel(time.perf_counter_ns()), "type": "input", "op": op, "args": list(args)})
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            frame_id, pixels = item
+            buf = io.BytesIO()
+            np.save(buf, pixels, allow_pickle=False)
+            self._zip.writestr(f"frames/{frame_id:06d}.npy", buf.getvalue())
+
+    def _header(self) -> dict:
+        config = {}
+        if self.config is not None:
+            for key in (TRIGGERS_KEY, REGIONS_KEY, MATCH_MODE_KEY, WEAPONS_KEY, SELECTION_KEY):
+                value = self.config.get(key)
+                if value is not None:
+                    config[key] = value
+        width, height = self.capture.screen_size() if self.capture is not None else (0, 0)
+        return {
+            "version": FORMAT_VERSION,
+            "created": time.time(),
+            "screen": [width, height],
+            "frames": self.frames_mode,
+            "calibration": self._calibration(),
+            "config": config,
+        }
+
+    def _calibration(self) -> Optional[dict]:
+        """Calibration in effect, or just the template scale without a calibrator."""
+        watcher = self.weapon_return
+        if watcher is None:
+            return None
+        cal = watcher.calibration.current if watcher.calibration is not None else None
+        if cal is not None:
+            return cal.meta()
+        return {"template_scale": watcher.template_bank.scale}
+
+
+# ------------- Replay -------------
+
+class Session:
+    """Loaded session file: header, ordered events and frame pixels by id."""
+
+    def __init__(self, path: str):
+        with zipfile.ZipFile(path) as zf:
+            self.header = json.loads(zf.read(HEADER_NAME))
+            if self.header.get("version") not in SUPPORTED_VERSIONS:
+                raise ValueError(f"Unsupported session version {self.header.get('version')}")
+            self.events = [json.loads(l) for l in zf.read(EVENTS_NAME).decode("utf-8").splitlines() if l]
+            self.frames: Dict[int, object] = {}
+            for e in self.events:
+                if e["type"] == "frame":
+                    self.frames[e["id"]] = np.load(io.BytesIO(zf.read(f"frames/{e['id']:06d}.npy")))
+        self.events.sort(key=lambda e: e["t"])
+
+    @property
+    def screen_size(self):
+        return tuple(self.header.get("screen") or (0, 0))
+
+    @property
+    def calibration(self) -> dict:
+        return self.header.get("calibration") or {}
+
+
+class SessionConfig:
+    """Read-only stand-in for ConfigStore serving the recorded config sections."""
+
+    def __init__(self, data: dict):
+        self._data = dict(data)
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def set(self, key, value, save: bool = True):
+        pass
+
+
+class SessionCalibration:
+    """
+    Calibrator stand-in serving the recorded calibration; ensure() only
+    loads the templates, at the recorded scale the bank was built with.
+    """
+
+    def __init__(self, meta: dict, template_bank: TemplateBank):
+        self.template_bank = template_bank
+        self.current = Calibration.from_meta(meta, None, "session") if "regions" in meta else None
+
+    def ensure(self) -> Optional[Calibration]:
+        self.template_bank.load_all()
+        return self.current
+
+
+class SessionBackend(CaptureBackend):
+    """
+    Capture backend reconstructing the screen from recorded frames.
+
+    Recorded frames are pasted onto a canvas in timeline order. In real-time
+    mode a grab first applies every frame up to the replay clock; in fast
+    mode each grab applies the next recorded frame, mirroring the grabs the
+    live pipeline made.
+    """
+    name = "session"
+
+    def __init__(self, session: Session, clock=None):
+        self.session = session
+        self.clock = clock
+        width, height = session.screen_size
+        if not width or not height:
+            width = max((e["left"] + session.frames[e["id"]].shape[1] for e in self._frame_events()), default=1)
+            height = max((e["top"] + session.frames[e["id"]].shape[0] for e in self._frame_events()), default=1)
+        self._size = (int(width), int(height))
+        self._canvas = np.zeros((self._size[1], self._size[0], 3), dtype=np.uint8)
+        self._pending = list(self._frame_events())
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def _frame_events(self):
+        return (e for e in self.session.events if e["type"] == "frame")
+
+    def advance_to(self, t_ns: int):
+        with self._lock:
+            while self._next < len(self._pending) and self._pending[self._next]["t"] <= t_ns:
+                self._apply(self._pending[self._next])
+                self._next += 1
+
+    def grab(self, region):
+        with self._lock:
+            if self.clock is None:
+                if self._next < len(self._pending):
+                    self._apply(self._pending[self._next])
+                    self._next += 1
+            else:
+                t = self.clock()
+                while self._next < len(self._pending) and self._pending[self._next]["t"] <= t:
+                    self._apply(self._pending[self._next])
+                    self._next += 1
+            if region:
+                left, top, width, height = region
+                return np.array(self._canvas[top:top + height, left:left + width])
+            return np.array(self._canvas)
+
+    def screen_size(self):
+        return self._size
+
+    def _apply(self, event):
+        pixels = self.session.frames[event["id"]]
+        left, top = event["left"], event["top"]
+        h = min(pixels.shape[0], self._size[1] - top)
+        w = min(pixels.shape[1], self._size[0] - left)
+        if h > 0 and w > 0:
+            self._canvas[top:top + h, left:left + w] = pixels[:h, :w]
+
+
+class SessionReplayer:
+    """
+    Feeds a recorded session back through a WeaponReturnWatcher with mocked
+    input and session-backed capture.
+
+    speed=1.0 replays in real time (2.0 twice as fast, ...); speed=0 runs as
+    fast as possible. Templates are matched at the recorded calibration's
+    scale and match mode. run() returns a report comparing the replayed
+    input actions with the recorded ones, plus recovery timings.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0):
+        self.path = path
+        self.speed = speed
+        self.session = Session(path)
+
+    def run(self) -> dict:
+        from Modules.shared_state import SharedState
+        from Modules.auto_attack import AutoClicker
+        from Modules.weapon_return import WeaponReturnWatcher
+        from Modules.metrics import registry as metrics
+
+        session = self.session
+        realtime = self.speed > 0
+        start_ns = time.perf_counter_ns()
+
+        def clock():
+            return int((time.perf_counter_ns() - start_ns) * self.speed)
+
+        backend = SessionBackend(session, clock if realtime else None)
+        capture = FrameCaptureService(backend)
+        config = SessionConfig(session.header.get("config", {}))
+        mock = RecordingBackend(backend.screen_size())
+        capture_regions = CaptureRegions(config)
+        capture_regions.rescale(backend.screen_size())
+        template_bank = TemplateBank.from_config(config, scale=session.calibration.get("template_scale", 1.0))
+        weapon_library = WeaponLibrary.from_config(config, template_bank)
+
+        metrics.reset()
+        shared_state = SharedState()
+        watcher = WeaponReturnWatcher(
+            shared_state=shared_state,
+            autoclicker=AutoClicker(shared_state, input_backend=mock),
+            template_bank=template_bank,
+            capture_regions=capture_regions,
+            trigger_engine=TriggerEngine.from_config(config),
+            capture_service=capture,
+            input_backend=mock,
+            weapon_library=weapon_library,
+            calibration=SessionCalibration(session.calibration, template_bank),
+        )
+        lines = 0
+        try:
+            for event in session.events:
+                if event["type"] != "line":
+                    continue
+                if realtime:
+                    delay = (event["t"] - clock()) / (1e9 * self.speed)
+                    if delay > 0:
+                        time.sleep(delay)
+                else:
+                    # Screen as it looked when the line arrived.
+                    backend.advance_to(event["t"])
+                watcher.feed_line(event["text"])
+                watcher.wait_idle()
+                lines += 1
+        finally:
+            watcher.stop()
+            template_bank.stop()
+            capture.stop()
+
+        recorded = [(e["op"], e["args"]) for e in session.events if e["type"] == "input" and e["op"] != "click"]
+        replayed = [(op, list(args)) for _, op, args in mock.actions if op != "click"]
+        snap = metrics.snapshot()
+        return {
+            "lines": lines,
+            "frames": len(session.frames),
+            "recoveries": snap.get("recovery.total", {}).get("count", 0),
+            "recovery_total_p50_ms": snap.get("recovery.total", {}).get("p50_us", 0.0) / 1000.0,
+            "recorded_actions": len(recorded),
+            "replayed_actions": len(replayed),
+            "actions_match": recorded == replayed,
+            "wall_s": (time.perf_counter_ns() - start_ns) / 1e9,
+            "last_action": watcher.last_action,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded Azerus session offline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    replay = sub.add_parser("replay", help="feed a session back through the watchers")
+    replay.add_argument("path")
+    replay.add_argument("--fast", action="store_true", help="as fast as possible instead of real time")
+    replay.add_argument("--speed", type=float, default=1.0, help="real-time multiplier (default 1.0)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+                        datefmt="%H:%M:%S")
+    report = SessionReplayer(args.path, speed=0 if args.fast else args.speed).run()
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
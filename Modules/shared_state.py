@@ -1,18 +1,105 @@
 import threading
+import logging
+from typing import Callable, Optional
+
+logger = logging.getLogger("SharedState")
+
 
 class SharedState:
     """
     Shared flags orchestrating coordination between modules.
+
+    The autoclicker gate is a condition variable: the clicker thread parks in
+    wait_until_allowed() at zero CPU while clicks are disallowed and is
+    notified the moment they are allowed again. A click is bracketed by
+    begin_click()/end_click(), which take the same lock as
+    set_autoclicker_allowed(), so once wait_quiesced() returns True after
+    disallowing, no click is in flight and none can start until re-allowed.
     """
     def __init__(self):
         self._lock = threading.RLock()
+        self._cond = threading.Condition(self._lock)
         self.autoclicker_allowed = True
         self.weapon_recovery_in_progress = False
+        self._click_in_flight = False
+        self._allowed_listeners = []
 
-    def set_autoclicker_allowed(self, value: bool):
+    # ------------- Recovery slot -------------
+
+    def try_begin_recovery(self) -> bool:
+        """
+        Atomically claims the recovery slot; False if one is already running.
+        """
         with self._lock:
+            if self.weapon_recovery_in_progress:
+                return False
+            self.weapon_recovery_in_progress = True
+            return True
+
+    def end_recovery(self):
+        with self._lock:
+            self.weapon_recovery_in_progress = False
+
+    # ------------- Autoclicker gate -------------
+
+    def add_allowed_listener(self, callback):
+        """
+        callback(allowed: bool) runs on the caller's thread whenever
+        set_autoclicker_allowed() is called; keep it non-blocking.
+        """
+        with self._lock:
+            self._allowed_listeners.append(callback)
+
+    def set_autoclicker_allowed(self, value: bool):
+        with self._cond:
             self.autoclicker_allowed = value
+            self._cond.notify_all()
+            listeners = list(self._allowed_listeners)
+        for cb in listeners:
+            try:
+                cb(value)
+            except Exception as e:
+                logger.error(f"[SharedState] Allowed listener failed: {e}")
 
     def is_autoclicker_allowed(self) -> bool:
         with self._lock:
-            return self.autoclicker_allowed
\ No newline at end of file
+            return self.autoclicker_allowed
+
+    def wait_until_allowed(self, abort: Optional[Callable[[], bool]] = None,
+                           timeout: Optional[float] = None) -> bool:
+        """
+        Parks until clicks are allowed (True), `abort()` turns true or the
+        timeout expires (False). Call wake_waiters() after changing whatever
+        `abort` looks at.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self.autoclicker_allowed or (abort is not None and abort()), timeout)
+            return self.autoclicker_allowed
+
+    def wake_waiters(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def begin_click(self) -> bool:
+        """
+        Marks a click as in flight if clicks are currently allowed.
+        Every True return must be paired with end_click().
+        """
+        with self._cond:
+            if not self.autoclicker_allowed:
+                return False
+            self._click_in_flight = True
+            return True
+
+    def end_click(self):
+        with self._cond:
+            self._click_in_flight = False
+            self._cond.notify_all()
+
+    def wait_quiesced(self, timeout: float = 1.0) -> bool:
+        """
+        Blocks until no click is in flight. Combined with a prior
+        set_autoclicker_allowed(False) this confirms the clicker is parked.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._click_in_flight, timeout)
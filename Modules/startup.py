@@ -0,0 +1,150 @@
+import time
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Tuple
+
+from Modules.lazy_import import lazy_import, preload
+from Modules.metrics import registry as metrics
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+logger = logging.getLogger("Startup")
+
+WARM_MODULES = ("numpy", "cv2")
+
+
+class StartupProfile:
+    """
+    Wall-clock breakdown of application startup.
+
+    phase() times a named step (recorded as `startup.<name>` too); mark()
+    notes an instant such as "window_shown" relative to `t0_ns`, which
+    should be taken before the first heavy import. log() writes everything
+    as one line, in the order it happened.
+    """
+
+    def __init__(self, t0_ns: Optional[int] = None):
+        self.t0_ns = t0_ns if t0_ns is not None else time.perf_counter_ns()
+        self._lock = threading.Lock()
+        self._phases: List[Tuple[str, int, int]] = []  # (name, start_ns, elapsed_ns)
+        self._marks: List[Tuple[str, int]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add_phase(name, start, time.perf_counter_ns() - start)
+
+    def add_phase(self, name: str, start_ns: int, elapsed_ns: int):
+        metrics.record(f"startup.{name}", elapsed_ns)
+        with self._lock:
+            self._phases.append((name, start_ns, elapsed_ns))
+
+    def mark(self, name: str) -> float:
+        now = time.perf_counter_ns()
+        with self._lock:
+            self._marks.append((name, now))
+        return (now - self.t0_ns) / 1e6
+
+    def breakdown(self) -> dict:
+        with self._lock:
+            return {
+                "phases_ms": {name: elapsed / 1e6 for name, _, elapsed in sorted(self._phases, key=lambda p: p[1])},
+                "marks_ms": {name: (ts - self.t0_ns) / 1e6 for name, ts in self._marks},
+            }
+
+    def log(self):
+        b = self.breakdown()
+        phases = ", ".join(f"{name} {ms:.0f}" for name, ms in b["phases_ms"].items())
+        marks = ", ".join(f"{name} @{ms:.0f}" for name, ms in b["marks_ms"].items())
+        logger.info(f"[Startup] {marks} ms | phases (ms): {phases}")
+
+
+class WarmUp:
+    """
+    Background warm-up run once the window is up.
+
+    Imports the CV stack, decodes every registered template (through the
+    calibrator when given, which loads them pre-scaled from its cache) and
+    runs one throwaway matchTemplate per template (plus an RGB->gray
+    conversion) so the first real recovery does not pay for imports, lazy
+    OpenCV initialisation or first-touch allocations. Steps are recorded as
+    phases of `profile`; `on_done` runs on the warm-up thread afterwards.
+    """
+
+    def __init__(self, template_bank, profile: Optional[StartupProfile] = None,
+                 modules=WARM_MODULES, on_done: Optional[Callable[[], None]] = None, calibrator=None):
+        self.template_bank = template_bank
+        self.calibrator = calibrator
+        self.profile = profile if profile is not None else StartupProfile()
+        self.modules = tuple(modules)
+        self.on_done = on_done
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------- Public API -------------
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._done.clear()
+        self._thread = threading.Thread(target=self._run, name="WarmUpThread", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    # ------------- Internal -------------
+
+    def _run(self):
+        start = time.perf_counter_ns()
+        try:
+            for name in self.modules:
+                with self.profile.phase(f"import_{name}"):
+                    if preload(name)[name] is None:
+                        logger.warning(f"[Startup] {name} not available; skipping its warm-up.")
+            if self.calibrator is not None:
+                with self.profile.phase("calibration"):
+                    self.calibrator.ensure()
+            else:
+                with self.profile.phase("templates"):
+                    self.template_bank.load_all()
+            with self.profile.phase("dummy_match"):
+                self._dummy_match()
+        except Exception as e:
+            logger.error(f"[Startup] Warm-up failed: {e}")
+        self.profile.add_phase("warmup", start, time.perf_counter_ns() - start)
+        self._done.set()
+        if self.on_done is not None:
+            self.on_done()
+
+    def _dummy_match(self):
+        dummy_match(self.template_bank)
+
+
+def dummy_match(template_bank):
+    """
+    One throwaway match per loaded template on a blank screen, so OpenCV's
+    lazy initialisation and first-touch allocations happen before a real
+    search (used by the warm-up and by the CV worker before it reports ready).
+    """
+    if not cv2 or not np:
+        return
+    rgb = np.zeros((64, 64, 3), dtype=np.uint8)
+    gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+    cv2.minMaxLoc(cv2.matchTemplate(gray, gray[:8, :8], cv2.TM_CCOEFF_NORMED))
+    for name in template_bank.names():
+        tpl = template_bank.get(name)
+        if tpl is None:
+            continue
+        # Same code path (match mode and mask handling) as a real match, on a blank screen.
+        screen = template_bank.prepare(np.zeros((tpl.height + 8, tpl.width + 8, 3), dtype=np.uint8))
+        cv2.minMaxLoc(tpl.match(screen))
@@ -0,0 +1,265 @@
+import os
+import threading
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from Modules.lazy_import import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+logger = logging.getLogger("TemplateBank")
+
+MIN_TEMPLATE_SIDE = 4
+
+CONFIG_KEY = "match_mode"
+MATCH_MODES = ("color", "gray")
+
+
+class TemplateEntry:
+    """
+    Preprocessed template kept in memory.
+
+      - bgr:  3-channel colour image (alpha stripped), used for colour matching
+      - gray: single-channel variant, used for grayscale matching
+      - mask: uint8 mask built from the alpha channel, or None if fully opaque
+    """
+    __slots__ = ("name", "path", "bgr", "gray", "mask", "width", "height", "signature")
+
+    def __init__(self, name, path, bgr, gray, mask, signature):
+        self.name = name
+        self.path = path
+        self.bgr = bgr
+        self.gray = gray
+        self.mask = mask
+        self.height, self.width = gray.shape[:2]
+        self.signature = signature
+
+    def match(self, screen):
+        """
+        TM_CCOEFF_NORMED response map of this template over a BGR or a
+        grayscale frame (see TemplateBank.prepare()), using the alpha mask
+        when there is one.
+        """
+        tpl = self.bgr if screen.ndim == 3 else self.gray
+        if self.mask is None:
+            return cv2.matchTemplate(screen, tpl, cv2.TM_CCOEFF_NORMED)
+        res = cv2.matchTemplate(screen, tpl, cv2.TM_CCOEFF_NORMED, mask=self.mask)
+        # Masked CCOEFF can yield inf/nan on flat patches.
+        res[~np.isfinite(res)] = 0.0
+        return res
+
+
+class TemplateBank:
+    """
+    Loads, validates and preprocesses every registered template once.
+
+    A background thread re-stats the template files every `watch_interval`
+    seconds and reloads only the entries whose (mtime, size) changed, so
+    lookups done by the watchers never touch the filesystem.
+
+    Templates are cut at the reference resolution; `scale` resizes them on
+    load to match the current display (see calibration.py).
+
+    Weapon matching runs in colour (BGR) by default, as the match threshold
+    of 0.78 was tuned for; color=False ("match_mode": "gray") matches
+    grayscale, about five times cheaper on a full search, but its
+    threshold has not been validated against real inventory screenshots.
+    """
+
+    def __init__(self, templates: Optional[Dict[str, str]] = None, watch_interval: float = 2.0, scale: float = 1.0,
+                 color: bool = True):
+        self.watch_interval = watch_interval
+        self.scale = scale
+        self.color = color
+
+        self._paths: Dict[str, str] = dict(templates or {})
+        self._entries: Dict[str, TemplateEntry] = {}
+        self._lock = threading.Lock()
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, config, **kwargs) -> "TemplateBank":
+        mode = config.get(CONFIG_KEY, "color") if config is not None else "color"
+        if mode not in MATCH_MODES:
+            logger.warning(f"[TemplateBank] Unknown match mode '{mode}'; using color.")
+            mode = "color"
+        return cls(color=mode == "color", **kwargs)
+
+    # ------------- Public API -------------
+
+    def prepare(self, rgb):
+        """Converts an RGB frame (view) to what match() should see: BGR, or gray when color is off."""
+        return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR if self.color else cv2.COLOR_RGB2GRAY)
+
+    def register(self, name: str, path: str, load: bool = True):
+        with self._lock:
+            self._paths[name] = path
+        if load:
+            self._load(name, path)
+
+    def load_all(self) -> int:
+        with self._lock:
+            items = list(self._paths.items())
+        loaded = 0
+        for name, path in items:
+            if self._load(name, path):
+                loaded += 1
+        logger.info(f"[TemplateBank] Loaded {loaded}/{len(items)} templates.")
+        return loaded
+
+    def set_scale(self, scale: float, reload: bool = True):
+        if scale == self.scale:
+            return
+        logger.info(f"[TemplateBank] Template scale {self.scale:g} -> {scale:g}.")
+        self.scale = scale
+        if reload:
+            self.load_all()
+
+    def install(self, name: str, bgr, gray, mask) -> bool:
+        """
+        Adds an already preprocessed entry (e.g. from the calibration cache)
+        for a registered template; its file signature is taken now so the
+        watcher still reloads it when the file changes.
+        """
+        with self._lock:
+            path = self._paths.get(name)
+        sig = self._file_signature(path) if path else None
+        if sig is None:
+            return False
+        for arr in (bgr, gray, mask):
+            if arr is not None:
+                arr.setflags(write=False)
+        entry = TemplateEntry(name, path, bgr, gray, mask, sig)
+        with self._lock:
+            entries = dict(self._entries)
+            entries[name] = entry
+            self._entries = entries
+        return True
+
+    def paths(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._paths)
+
+    def get(self, name: str) -> Optional[TemplateEntry]:
+        # Plain dict read; entries are replaced atomically (copied and swapped
+        # under _lock by writers), never mutated.
+        return self._entries.get(name)
+
+    def names(self) -> List[str]:
+        return list(self._entries.keys())
+
+    def reload_if_changed(self) -> List[str]:
+        with self._lock:
+            items = list(self._paths.items())
+        reloaded = []
+        for name, path in items:
+            sig = self._file_signature(path)
+            current = self._entries.get(name)
+            if current is not None and current.signature == sig:
+                continue
+            if current is None and sig is None:
+                continue
+            if sig is None:
+                logger.warning(f"[TemplateBank] Template removed from disk: {path}")
+                self._drop(name)
+                reloaded.append(name)
+                continue
+            if self._load(name, path):
+                logger.info(f"[TemplateBank] Reloaded changed template '{name}'.")
+                reloaded.append(name)
+        return reloaded
+
+    def start_watching(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._watch_loop, name="TemplateBankWatcher", daemon=True)
+        self._thread.start()
+        logger.debug("[TemplateBank] File watcher started.")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+
+    # ------------- Internal -------------
+
+    def _watch_loop(self):
+        while not self._stop_event.wait(self.watch_interval):
+            try:
+                self.reload_if_changed()
+            except Exception as e:
+                logger.error(f"[TemplateBank] Reload check failed: {e}")
+
+    def _drop(self, name: str):
+        with self._lock:
+            entries = dict(self._entries)
+            entries.pop(name, None)
+            self._entries = entries
+
+    @staticmethod
+    def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self, name: str, path: str) -> bool:
+        if not cv2 or not np:
+            logger.warning("[TemplateBank] OpenCV/numpy not installed.")
+            return False
+        sig = self._file_signature(path)
+        if sig is None:
+            logger.warning(f"[TemplateBank] Template missing: {path}")
+            return False
+        try:
+            entry = self._preprocess(name, path, sig, self.scale)
+        except Exception as e:
+            logger.error(f"[TemplateBank] Cannot load template '{name}' ({path}): {e}")
+            return False
+        if entry is None:
+            return False
+        with self._lock:
+            entries = dict(self._entries)
+            entries[name] = entry
+            self._entries = entries
+        logger.debug(f"[TemplateBank] '{name}' {entry.width}x{entry.height} mask={'yes' if entry.mask is not None else 'no'}")
+        return True
+
+    @staticmethod
+    def _preprocess(name: str, path: str, sig, scale: float = 1.0) -> Optional[TemplateEntry]:
+        img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        if img is None:
+            logger.warning(f"[TemplateBank] Cannot decode template: {path}")
+            return None
+        if scale != 1.0:
+            size = (max(1, round(img.shape[1] * scale)), max(1, round(img.shape[0] * scale)))
+            img = cv2.resize(img, size, interpolation=cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR)
+        h, w = img.shape[:2]
+        if h < MIN_TEMPLATE_SIDE or w < MIN_TEMPLATE_SIDE:
+            logger.warning(f"[TemplateBank] Template too small ({w}x{h}): {path}")
+            return None
+
+        mask = None
+        if img.ndim == 2:
+            bgr = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+        elif img.shape[2] == 4:
+            bgr = np.ascontiguousarray(img[:, :, :3])
+            alpha = img[:, :, 3]
+            if not np.any(alpha):
+                logger.warning(f"[TemplateBank] Template fully transparent: {path}")
+                return None
+            if np.any(alpha < 255):
+                mask = np.where(alpha > 0, 255, 0).astype(np.uint8)
+        else:
+            bgr = img
+        gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+
+        for arr in (bgr, gray, mask):
+            if arr is not None:
+                arr.setflags(write=False)
+        return TemplateEntry(name, path, bgr, gray, mask, sig)
@@ -0,0 +1,218 @@
+"""
+Opt-in span tracing exported as Chrome / Perfetto trace JSON.
+
+    from Modules.tracing import tracer
+
+    with tracer.span("recovery", cat="recovery", client="main"):
+        ...
+    tracer.instant("trigger", cat="log")
+
+Every thread appends to its own bounded ring (a deque, so appends need no
+lock and the oldest events go first when it is full); the rings are only
+walked by export(). Rings of threads that have exited (one per clicker
+start, recovery thread, ...) share a budget of one ring's capacity: when
+a new thread starts tracing, the oldest finished rings beyond it are
+dropped, so a long session does not grow without bound. Timestamps are time.perf_counter_ns(), so spans from
+the log watcher, hotkey workers, AutoClickerThread and the Tk loop line up
+on one timeline. Metrics recorded through the registry and events
+published on the bus show up as spans and instants automatically.
+
+While tracing is off span() returns a shared no-op context manager and
+instant()/complete() return after one attribute check; hot loops can test
+`tracer.enabled` first to skip building the keyword arguments too.
+
+Open the exported file in chrome://tracing or https://ui.perfetto.dev.
+
+Config: {"tracing": {"enabled": false, "path": "trace.json", "buffer": 100000}}
+(AZERUS_TRACE=<path> in the environment enables it as well).
+"""
+import os
+import json
+import time
+import threading
+import logging
+import weakref
+from collections import deque
+from typing import List, Optional
+
+logger = logging.getLogger("Tracing")
+
+CONFIG_KEY = "tracing"
+ENV_VAR = "AZERUS_TRACE"
+DEFAULT_PATH = "trace.json"
+DEFAULT_BUFFER = 100_000  # events kept per thread
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = repr(exc)
+        self.tracer._emit(("X", self.name, self.cat, self.start, end - self.start, self.args))
+        return False
+
+
+class _ThreadBuffer:
+    __slots__ = ("generation", "events", "tid", "thread_name", "thread")
+
+    def __init__(self, generation: int, capacity: int):
+        thread = threading.current_thread()
+        self.generation = generation
+        self.events = deque(maxlen=capacity)
+        self.tid = threading.get_native_id()
+        self.thread_name = thread.name
+        self.thread = weakref.ref(thread)
+
+    @property
+    def alive(self) -> bool:
+        thread = self.thread()
+        return thread is not None and thread.is_alive()
+
+
+class Tracer:
+    """
+    Collects spans ("X"), instants ("i") and counters ("C") per thread while
+    enabled. start() begins a new trace (previous events are dropped).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.capacity = DEFAULT_BUFFER
+        self.path = DEFAULT_PATH
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._buffers: List[_ThreadBuffer] = []
+        self._generation = 0
+        self._t0_ns = time.perf_counter_ns()
+
+    def configure(self, config) -> bool:
+        """Applies the "tracing" config / AZERUS_TRACE and starts tracing if asked; returns enabled."""
+        settings = (config.get(CONFIG_KEY) if config is not None else None) or {}
+        self.path = os.environ.get(ENV_VAR) or settings.get("path", DEFAULT_PATH)
+        if settings.get("enabled") or os.environ.get(ENV_VAR):
+            self.start(int(settings.get("buffer", DEFAULT_BUFFER)))
+        return self.enabled
+
+    # ------------- Public API -------------
+
+    def start(self, capacity: Optional[int] = None):
+        with self._lock:
+            if capacity:
+                self.capacity = capacity
+            self._generation += 1
+            self._buffers = []
+            self._t0_ns = time.perf_counter_ns()
+            self.enabled = True
+        logger.info(f"[Tracing] Started ({self.capacity} events per thread).")
+
+    def stop(self):
+        self.enabled = False
+
+    def span(self, name: str, cat: str = "app", **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    def instant(self, name: str, cat: str = "app", **args):
+        if not self.enabled:
+            return
+        self._emit(("i", name, cat, time.perf_counter_ns(), 0, args))
+
+    def complete(self, name: str, start_ns: int, dur_ns: int, cat: str = "app", **args):
+        """Span measured elsewhere (e.g. from a timestamp taken on another thread)."""
+        if not self.enabled:
+            return
+        self._emit(("X", name, cat, start_ns, dur_ns, args))
+
+    def counter(self, name: str, value: float, cat: str = "app"):
+        if not self.enabled:
+            return
+        self._emit(("C", name, cat, time.perf_counter_ns(), 0, {name: value}))
+
+    def export(self, path: Optional[str] = None) -> int:
+        """Writes the Chrome trace JSON; returns the number of events written."""
+        path = path or self.path
+        with self._lock:
+            buffers = list(self._buffers)
+            t0 = self._t0_ns
+        pid = os.getpid()
+        trace = [{"ph": "M", "name": "process_name", "pid": pid, "tid": 0, "args": {"name": "Azerus Assistant"}}]
+        count = 0
+        for buf in buffers:
+            trace.append({"ph": "M", "name": "thread_name", "pid": pid, "tid": buf.tid,
+                          "args": {"name": buf.thread_name}})
+            for ph, name, cat, ts_ns, dur_ns, args in list(buf.events):
+                event = {"ph": ph, "name": name, "cat": cat, "pid": pid, "tid": buf.tid,
+                         "ts": (ts_ns - t0) / 1000.0}
+                if ph == "X":
+                    event["dur"] = dur_ns / 1000.0
+                elif ph == "i":
+                    event["s"] = "t"
+                if args:
+                    event["args"] = args
+                trace.append(event)
+                count += 1
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ns"}, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+        logger.info(f"[Tracing] Wrote {count} events from {len(buffers)} thread(s) to {path}.")
+        return count
+
+    # ------------- Internal -------------
+
+    def _emit(self, record: tuple):
+        buf = getattr(self._local, "buffer", None)
+        if buf is None or buf.generation != self._generation:
+            buf = self._new_buffer()
+        buf.events.append(record)
+
+    def _new_buffer(self) -> _ThreadBuffer:
+        with self._lock:
+            self._prune_finished()
+            buf = _ThreadBuffer(self._generation, self.capacity)
+            self._buffers.append(buf)
+        self._local.buffer = buf
+        return buf
+
+    def _prune_finished(self):
+        """Keeps the newest finished-thread rings within one ring's capacity (caller holds _lock)."""
+        budget = self.capacity
+        kept = []
+        for buf in reversed(self._buffers):
+            if not buf.alive:
+                budget -= len(buf.events)
+                if budget < 0 or not buf.events:
+                    continue
+            kept.append(buf)
+        kept.reverse()
+        self._buffers = kept
+
+
+# Process-wide tracer used by the modules.
+tracer = Tracer()
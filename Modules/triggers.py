@@ -0,0 +1,169 @@
+import re
+import threading
+import logging
+from typing import Callable, Dict, List, Optional
+
+try:
+    import ahocorasick  # pyahocorasick; optional, used for literal-only rule sets
+except ImportError:
+    ahocorasick = None
+
+logger = logging.getLogger("Triggers")
+
+CONFIG_KEY = "trigger_rules"
+
+WEAPON_KNOCKED_OUT_MESSAGE = "У вас выбили оружие из рук!"
+
+DEFAULT_RULES = [
+    {"name": "weapon_knocked_out", "literal": WEAPON_KNOCKED_OUT_MESSAGE, "action": "weapon_recovery"},
+]
+
+Handler = Callable[["TriggerRule", str, int], None]
+
+
+class TriggerRule:
+    """
+    One chat-log trigger. Exactly one of `literal` / `regex` is set.
+    `action` names the handler the rule dispatches to.
+    """
+    __slots__ = ("name", "literal", "regex", "action", "hits")
+
+    def __init__(self, name: str, action: str, literal: Optional[str] = None, regex: Optional[str] = None):
+        if (literal is None) == (regex is None):
+            raise ValueError(f"Rule '{name}' needs exactly one of 'literal' or 'regex'")
+        if regex is not None:
+            re.compile(regex)
+        self.name = name
+        self.literal = literal
+        self.regex = regex
+        self.action = action
+        self.hits = 0
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TriggerRule":
+        return cls(
+            name=data["name"],
+            action=data.get("action", "log"),
+            literal=data.get("literal"),
+            regex=data.get("regex"),
+        )
+
+    @property
+    def pattern(self) -> str:
+        return re.escape(self.literal) if self.literal is not None else self.regex
+
+
+class TriggerEngine:
+    """
+    Matches every configured rule against a log line in a single pass.
+
+    Rules are compiled into one alternation regex that rejects non-matching
+    lines in a single scan (or an Aho-Corasick automaton when all rules are
+    literals and pyahocorasick is installed). Each matching rule is
+    dispatched at most once per line to the handler registered for its
+    action; per-rule hit counters are kept. Regex rules must not use
+    numbered backreferences since groups are renumbered when combined.
+    """
+
+    def __init__(self, rules: Optional[List[TriggerRule]] = None):
+        self._handlers: Dict[str, Handler] = {"log": self._log_handler}
+        self._lock = threading.Lock()
+        self.lines_scanned = 0
+        # (backend, matcher, [(rule, compiled pattern)], rules); swapped as a whole.
+        self._compiled = ("none", None, [], [])
+        self.set_rules(rules if rules is not None else [TriggerRule.from_dict(r) for r in DEFAULT_RULES])
+
+    @classmethod
+    def from_config(cls, config) -> "TriggerEngine":
+        raw = config.get(CONFIG_KEY) if config is not None else None
+        rules = []
+        for data in (raw if raw is not None else DEFAULT_RULES):
+            try:
+                rules.append(TriggerRule.from_dict(data))
+            except (KeyError, ValueError, re.error) as e:
+                logger.warning(f"[Triggers] Ignoring invalid rule {data!r}: {e}")
+        return cls(rules)
+
+    # ------------- Public API -------------
+
+    def register_handler(self, action: str, handler: Handler):
+        self._handlers[action] = handler
+        logger.debug(f"[Triggers] Handler registered for action '{action}'.")
+
+    def set_rules(self, rules: List[TriggerRule]):
+        rules = list(rules)
+        with self._lock:
+            self._compiled = self._compile(rules)
+        logger.info(f"[Triggers] {len(rules)} rule(s) compiled ({self.backend}).")
+
+    @property
+    def backend(self) -> str:
+        return self._compiled[0]
+
+    def rules(self) -> List[TriggerRule]:
+        return list(self._compiled[3])
+
+    def match(self, line: str) -> List[TriggerRule]:
+        """
+        Returns the distinct rules matching `line`, in rule order.
+        """
+        backend, matcher, per_rule, rules = self._compiled
+        if matcher is None:
+            return []
+        if backend == "aho-corasick":
+            found = {idx for _, idx in matcher.iter(line)}
+            return [rules[i] for i in sorted(found)]
+        if matcher.search(line) is None:
+            return []
+        return [rule for rule, pattern in per_rule if pattern.search(line)]
+
+    def feed(self, line: str, seen_ns: int = 0) -> int:
+        """
+        Matches `line` and dispatches every hit. Returns the number of rules hit.
+        """
+        self.lines_scanned += 1
+        hits = self.match(line)
+        for rule in hits:
+            rule.hits += 1
+            handler = self._handlers.get(rule.action)
+            if handler is None:
+                logger.warning(f"[Triggers] No handler for action '{rule.action}' (rule '{rule.name}').")
+                continue
+            try:
+                handler(rule, line, seen_ns)
+            except Exception as e:
+                logger.error(f"[Triggers] Handler '{rule.action}' failed for rule '{rule.name}': {e}")
+        return len(hits)
+
+    def stats(self) -> Dict[str, int]:
+        return {rule.name: rule.hits for rule in self._compiled[3]}
+
+    def reset_stats(self):
+        self.lines_scanned = 0
+        for rule in self._compiled[3]:
+            rule.hits = 0
+
+    # ------------- Internal -------------
+
+    @staticmethod
+    def _compile(rules: List[TriggerRule]):
+        if not rules:
+            return ("none", None, [], rules)
+
+        if ahocorasick is not None and all(r.literal is not None for r in rules):
+            automaton = ahocorasick.Automaton()
+            for idx, rule in enumerate(rules):
+                automaton.add_word(rule.literal, idx)
+            automaton.make_automaton()
+            return ("aho-corasick", automaton, [], rules)
+
+        # Capturing groups defeat sre's branch optimisations, so the combined
+        # prefilter uses non-capturing alternatives; per-rule patterns only run
+        # on the (rare) lines the prefilter accepts.
+        per_rule = [(rule, re.compile(rule.pattern)) for rule in rules]
+        prefilter = re.compile("|".join(f"(?:{rule.pattern})" for rule in rules))
+        return ("regex", prefilter, per_rule, rules)
+
+    @staticmethod
+    def _log_handler(rule: TriggerRule, line: str, seen_ns: int):
+        logger.info(f"[Triggers] '{rule.name}' matched: {line.strip()}")
@@ -0,0 +1,412 @@
+import time
+import threading
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from Modules.lazy_import import lazy_import
+from Modules.template_bank import TemplateBank
+from Modules.capture_regions import INVENTORY_REGION, HOTBAR_REGION
+from Modules.metrics import registry as metrics
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+logger = logging.getLogger("WeaponLibrary")
+
+Region = Tuple[int, int, int, int]
+
+CONFIG_KEY = "weapons"
+SELECTION_KEY = "weapon_selection"
+
+SELECTION_RULES = ("priority", "confidence")
+
+INVENTORY_TEMPLATE = "weapon_inventory"
+HOTBAR_TEMPLATE = "weapon_hotbar"
+
+DEFAULT_WEAPONS = [
+    {"name": INVENTORY_TEMPLATE, "path": "Assets/weapon_template.png", "region": INVENTORY_REGION},
+    {"name": HOTBAR_TEMPLATE, "path": "Assets/weapon_template_hotbar.png", "region": HOTBAR_REGION},
+]
+
+
+class WeaponSpec:
+    """
+    One weapon variant: template file, the capture region it is searched in
+    ("inventory" / "hotbar" / any configured region name), a priority
+    (higher wins under the "priority" rule) and an optional per-weapon
+    confidence threshold.
+    """
+    __slots__ = ("name", "path", "region", "priority", "threshold")
+
+    def __init__(self, name: str, path: str, region: str = INVENTORY_REGION,
+                 priority: int = 0, threshold: Optional[float] = None):
+        self.name = name
+        self.path = path
+        self.region = region
+        self.priority = int(priority)
+        self.threshold = threshold
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "path": self.path, "region": self.region,
+                "priority": self.priority, "threshold": self.threshold}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "WeaponSpec":
+        threshold = data.get("threshold")
+        return cls(
+            name=data["name"],
+            path=data["path"],
+            region=data.get("region", INVENTORY_REGION),
+            priority=data.get("priority", 0),
+            threshold=float(threshold) if threshold is not None else None,
+        )
+
+
+class Candidate:
+    """A matched template box in screen coordinates."""
+    __slots__ = ("spec", "confidence", "left", "top", "width", "height")
+
+    def __init__(self, spec: WeaponSpec, confidence: float, left: int, top: int, width: int, height: int):
+        self.spec = spec
+        self.confidence = confidence
+        self.left = left
+        self.top = top
+        self.width = width
+        self.height = height
+
+    @property
+    def center(self) -> Tuple[int, int]:
+        return self.left + self.width // 2, self.top + self.height // 2
+
+    def iou(self, other: "Candidate") -> float:
+        ix = max(0, min(self.left + self.width, other.left + other.width) - max(self.left, other.left))
+        iy = max(0, min(self.top + self.height, other.top + other.height) - max(self.top, other.top))
+        inter = ix * iy
+        union = self.width * self.height + other.width * other.height - inter
+        return inter / union if union else 0.0
+
+
+class TemplateStats:
+    __slots__ = ("searches", "hits", "last_confidence", "max_confidence", "total_confidence", "last_ms")
+
+    def __init__(self):
+        self.searches = 0
+        self.hits = 0
+        self.last_confidence = 0.0
+        self.max_confidence = 0.0
+        self.total_confidence = 0.0
+        self.last_ms = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "searches": self.searches,
+            "hits": self.hits,
+            "last_confidence": self.last_confidence,
+            "max_confidence": self.max_confidence,
+            "mean_confidence": self.total_confidence / self.searches if self.searches else 0.0,
+            "last_ms": self.last_ms,
+        }
+
+
+class KnownLocation:
+    __slots__ = ("owner", "name", "left", "top", "hits", "last_hit")
+
+    def __init__(self, owner: str, name: str, left: int, top: int):
+        self.owner = owner
+        self.name = name
+        self.left = left
+        self.top = top
+        self.hits = 0
+        self.last_hit = 0.0
+
+
+class WeaponLibrary:
+    """
+    Any number of weapon templates matched against one captured frame.
+
+    find() converts each distinct search region of the frame once (to BGR,
+    or grayscale in the bank's gray match mode, see TemplateBank.prepare),
+    runs every template's matchTemplate over it in turn (OpenCV already
+    parallelises each call; a thread pool on top measured no gain), takes up to `peaks_per_template`
+    peaks per response map, applies non-maximum suppression across all templates (overlapping
+    boxes keep only the most confident one) and orders the survivors by
+    the selection rule:
+
+      - "priority":   highest spec priority first, then confidence
+      - "confidence": confidence only
+
+    Per-template match time goes to `match.<name>` histograms; confidence
+    and hit counts are available from stats().
+
+    Fast path: the weapon tends to land in the same few slots, so the
+    locations of recent winners are remembered with hit counts. find()
+    first re-checks those spots (most hits first) by matching the template
+    against a crop only `verify_margin` px larger than itself; a hit skips
+    the full search. Fast-path hits are only accepted for top-priority
+    weapons so a cached low-priority spot never shadows a better weapon.
+    Locations are kept per `owner` (the game client searching), so one
+    client never answers from a spot seen in another client's window.
+    fast_path_stats() reports the hit rate and the estimated time saved
+    against the running mean of full searches.
+    """
+
+    def __init__(
+        self,
+        template_bank: TemplateBank,
+        specs: Optional[List[WeaponSpec]] = None,
+        match_threshold: float = 0.78,
+        selection: str = "priority",
+        nms_iou: float = 0.3,
+        peaks_per_template: int = 3,
+        max_locations: int = 8,
+        verify_margin: int = 3,
+        preload: bool = True
+    ):
+        if selection not in SELECTION_RULES:
+            raise ValueError(f"Unknown selection rule '{selection}'")
+        self.template_bank = template_bank
+        self.match_threshold = match_threshold
+        self.selection = selection
+        self.nms_iou = nms_iou
+        self.peaks_per_template = peaks_per_template
+        self._stats: Dict[str, TemplateStats] = {}
+        self._stats_lock = threading.Lock()
+        self.max_locations = max_locations
+        self.verify_margin = verify_margin
+        self._locations: List[KnownLocation] = []
+        self._remote = None
+        self._fast = {"lookups": 0, "hits": 0, "fast_ns": 0, "full_searches": 0, "full_ns": 0, "saved_ns": 0}
+        self._specs: List[WeaponSpec] = []
+        self.set_specs(specs if specs is not None else [WeaponSpec.from_dict(d) for d in DEFAULT_WEAPONS], load=preload)
+
+    @classmethod
+    def from_config(cls, config, template_bank: TemplateBank, **kwargs) -> "WeaponLibrary":
+        raw = config.get(CONFIG_KEY) if config is not None else None
+        specs = []
+        for data in (raw if raw is not None else DEFAULT_WEAPONS):
+            try:
+                specs.append(WeaponSpec.from_dict(data))
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"[WeaponLibrary] Ignoring invalid weapon {data!r}: {e}")
+        selection = config.get(SELECTION_KEY, "priority") if config is not None else "priority"
+        if selection not in SELECTION_RULES:
+            logger.warning(f"[WeaponLibrary] Unknown selection rule '{selection}'; using priority.")
+            selection = "priority"
+        return cls(template_bank, specs, selection=selection, **kwargs)
+
+    # ------------- Public API -------------
+
+    def set_specs(self, specs: List[WeaponSpec], load: bool = True):
+        """Registers `specs` in the template bank; load=False leaves decoding to a later load_all()."""
+        for spec in specs:
+            self.template_bank.register(spec.name, spec.path, load=False)
+        if load:
+            self.template_bank.load_all()
+        self._specs = list(specs)
+        logger.info(f"[WeaponLibrary] {len(specs)} weapon template(s): {', '.join(s.name for s in specs)}")
+
+    def specs(self) -> List[WeaponSpec]:
+        return list(self._specs)
+
+    def region_names(self) -> List[str]:
+        return sorted({s.region for s in self._specs})
+
+    def find(self, frame, regions: Dict[str, Optional[Region]], owner: str = "main") -> List[Candidate]:
+        """
+        Matches every template against `frame` (a capture.Frame covering
+        every region in `regions`, name -> screen region or None for full
+        frame). Returns a single verified location `owner` found before,
+        or else the NMS survivors of a full search, best first.
+        """
+        hit = self._verify_known(frame, regions, owner)
+        if hit is not None:
+            return [hit]
+        start = time.perf_counter_ns()
+        candidates = None
+        remote = self._remote
+        if remote is not None:
+            candidates = remote.search(frame, regions, self._specs, self.template_bank.scale,
+                                       self.template_bank.color)
+        if candidates is None:
+            candidates = self.search(frame, regions)
+        elapsed = time.perf_counter_ns() - start
+        metrics.record("match.full_search", elapsed)
+        with self._stats_lock:
+            self._fast["full_searches"] += 1
+            self._fast["full_ns"] += elapsed
+        if candidates:
+            self._remember(candidates[0], owner)
+        return candidates
+
+    def search(self, frame, regions: Dict[str, Optional[Region]]) -> List[Candidate]:
+        """Full search of every template, bypassing known locations and any remote worker."""
+        screens = {}
+        jobs = []
+        for spec in self._specs:
+            tpl = self.template_bank.get(spec.name)
+            if tpl is None:
+                continue
+            region = regions.get(spec.region)
+            if region not in screens:
+                screens[region] = self.template_bank.prepare(frame.view(region))
+            screen = screens[region]
+            if screen.shape[0] < tpl.height or screen.shape[1] < tpl.width:
+                logger.warning(f"[WeaponLibrary] Region '{spec.region}' {region} smaller than template '{spec.name}'.")
+                continue
+            offset = (region[0], region[1]) if region else (frame.left, frame.top)
+            jobs.append((spec, tpl, screen, offset))
+
+        candidates = []
+        for job in jobs:
+            try:
+                candidates.extend(self._match_one(*job))
+            except Exception as e:
+                logger.error(f"[WeaponLibrary] Template match error ({job[0].name}): {e}")
+        return self._rank(self._suppress(candidates))
+
+    def fast_path_stats(self) -> dict:
+        with self._stats_lock:
+            f = dict(self._fast)
+            locations = [(loc.owner, loc.name, loc.left, loc.top, loc.hits) for loc in self._locations]
+        return {
+            "lookups": f["lookups"],
+            "hits": f["hits"],
+            "hit_rate": f["hits"] / f["lookups"] if f["lookups"] else 0.0,
+            "fast_mean_ms": f["fast_ns"] / f["lookups"] / 1e6 if f["lookups"] else 0.0,
+            "full_mean_ms": f["full_ns"] / f["full_searches"] / 1e6 if f["full_searches"] else 0.0,
+            "saved_ms": f["saved_ns"] / 1e6,
+            "locations": locations,
+        }
+
+    def set_remote(self, remote):
+        """
+        Offloads full searches to `remote` (e.g. a CVWorker), which returns
+        candidates or None to fall back to searching in-process.
+        """
+        self._remote = remote
+
+    def forget_locations(self):
+        with self._stats_lock:
+            self._locations = []
+
+    def stats(self) -> Dict[str, dict]:
+        with self._stats_lock:
+            return {name: s.as_dict() for name, s in self._stats.items()}
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats.clear()
+
+    # ------------- Internal -------------
+
+    def _match_one(self, spec: WeaponSpec, tpl, screen, offset) -> List[Candidate]:
+        start = time.perf_counter_ns()
+        res = tpl.match(screen)
+        threshold = spec.threshold if spec.threshold is not None else self.match_threshold
+        found = []
+        best = 0.0
+        for _ in range(self.peaks_per_template):
+            _, max_val, _, max_loc = cv2.minMaxLoc(res)
+            best = max(best, float(max_val))
+            if max_val < threshold:
+                break
+            found.append(Candidate(spec, float(max_val), max_loc[0] + offset[0], max_loc[1] + offset[1],
+                                   tpl.width, tpl.height))
+            # Blank out this peak's neighbourhood before looking for the next one.
+            x, y = max_loc
+            res[max(0, y - tpl.height // 2):y + tpl.height // 2 + 1,
+                max(0, x - tpl.width // 2):x + tpl.width // 2 + 1] = -1.0
+        elapsed = time.perf_counter_ns() - start
+        metrics.record(f"match.{spec.name}", elapsed)
+        with self._stats_lock:
+            st = self._stats.get(spec.name)
+            if st is None:
+                st = self._stats[spec.name] = TemplateStats()
+            st.searches += 1
+            st.hits += 1 if found else 0
+            st.last_confidence = best
+            st.max_confidence = max(st.max_confidence, best)
+            st.total_confidence += best
+            st.last_ms = elapsed / 1e6
+        logger.debug(f"[WeaponLibrary] '{spec.name}' best={best:.3f} peaks={len(found)} in {elapsed / 1e6:.2f} ms")
+        return found
+
+    def _suppress(self, candidates: List[Candidate]) -> List[Candidate]:
+        kept: List[Candidate] = []
+        for c in sorted(candidates, key=lambda c: c.confidence, reverse=True):
+            if all(c.iou(k) <= self.nms_iou for k in kept):
+                kept.append(c)
+        return kept
+
+    def _rank(self, candidates: List[Candidate]) -> List[Candidate]:
+        if self.selection == "priority":
+            return sorted(candidates, key=lambda c: (-c.spec.priority, -c.confidence))
+        return sorted(candidates, key=lambda c: -c.confidence)
+
+    def _verify_known(self, frame, regions: Dict[str, Optional[Region]], owner: str) -> Optional[Candidate]:
+        with self._stats_lock:
+            locations = [loc for loc in self._locations if loc.owner == owner]
+        if not locations:
+            return None
+        specs = {s.name: s for s in self._specs}
+        top_priority = max(s.priority for s in self._specs)
+        start = time.perf_counter_ns()
+        hit = None
+        m = self.verify_margin
+        for loc in sorted(locations, key=lambda l: (-specs[l.name].priority if l.name in specs else 0, -l.hits)):
+            spec = specs.get(loc.name)
+            tpl = self.template_bank.get(loc.name)
+            if spec is None or tpl is None:
+                continue
+            if self.selection == "priority" and spec.priority < top_priority:
+                break
+            crop = (loc.left - m, loc.top - m, tpl.width + 2 * m, tpl.height + 2 * m)
+            if crop[0] < 0 or crop[1] < 0 or not frame.covers(crop):
+                continue
+            # Only spots the full search would also look at (None = full frame).
+            bounds = regions.get(spec.region)
+            if bounds is not None and not _contains(bounds, crop):
+                continue
+            screen = self.template_bank.prepare(frame.view(crop))
+            _, max_val, _, max_loc = cv2.minMaxLoc(tpl.match(screen))
+            threshold = spec.threshold if spec.threshold is not None else self.match_threshold
+            if max_val >= threshold:
+                hit = Candidate(spec, float(max_val), crop[0] + max_loc[0], crop[1] + max_loc[1],
+                                tpl.width, tpl.height)
+                break
+        elapsed = time.perf_counter_ns() - start
+        metrics.record("match.fast_path", elapsed)
+        with self._stats_lock:
+            f = self._fast
+            f["lookups"] += 1
+            f["fast_ns"] += elapsed
+            if hit is not None:
+                f["hits"] += 1
+                if f["full_searches"]:
+                    f["saved_ns"] += max(0, f["full_ns"] // f["full_searches"] - elapsed)
+        if hit is not None:
+            self._remember(hit, owner)
+            logger.debug(f"[WeaponLibrary] Fast path hit: {hit.spec.name} at {hit.center} "
+                         f"conf={hit.confidence:.3f} in {elapsed / 1e6:.3f} ms")
+        return hit
+
+    def _remember(self, candidate: Candidate, owner: str):
+        with self._stats_lock:
+            for loc in self._locations:
+                if (loc.owner == owner and loc.name == candidate.spec.name and abs(loc.left - candidate.left) <= self.verify_margin
+                        and abs(loc.top - candidate.top) <= self.verify_margin):
+                    break
+            else:
+                loc = KnownLocation(owner, candidate.spec.name, candidate.left, candidate.top)
+                self._locations.append(loc)
+            loc.left, loc.top = candidate.left, candidate.top
+            loc.hits += 1
+            loc.last_hit = time.time()
+            if len(self._locations) > self.max_locations:
+                # Evict the least useful spot: fewest hits, then oldest.
+                self._locations.remove(min(self._locations, key=lambda l: (l.hits, l.last_hit)))
+
+
+def _contains(outer: Region, inner: Region) -> bool:
+    return (outer[0] <= inner[0] and outer[1] <= inner[1]
+            and inner[0] + inner[2] <= outer[0] + outer[2] and inner[1] + inner[3] <= outer[1] + outer[3])
@@ -1,33 +1,45 @@
 import time
 import threading
 import logging
-import os
+from queue import Queue
 from typing import Optional, Tuple
 
-try:
-    import pyautogui
-except ImportError:
-    pyautogui = None
-
-try:
-    import cv2
-    import numpy as np
-except ImportError:
-    cv2 = None
-    np = None
+from Modules.lazy_import import lazy_import
+from Modules.template_bank import TemplateBank
+from Modules.log_follower import LogFollower, MultiLogFollower
+from Modules.triggers import TriggerEngine, TriggerRule, WEAPON_KNOCKED_OUT_MESSAGE
+from Modules.metrics import registry as metrics
+from Modules.event_bus import bus as events, RecoveryPhase, TriggerMatched
+from Modules.tracing import tracer
+from Modules.capture_regions import CaptureRegions, INVENTORY_REGION, HOTBAR_REGION
+from Modules.weapon_library import WeaponLibrary, WeaponSpec, INVENTORY_TEMPLATE, HOTBAR_TEMPLATE
+from Modules.capture import FrameCaptureService, create_backend
+from Modules.screen_wait import ScreenProbe, wait_for
+from Modules.input_backend import InputBackend, create_backend as create_input_backend
+from Modules.calibration import Calibrator, PROBE_SIZE, SLOT_SIZE
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
 
 logger = logging.getLogger("WeaponReturn")
 
-TRIGGER_MESSAGE = "У вас выбили оружие из рук!"
+TRIGGER_MESSAGE = WEAPON_KNOCKED_OUT_MESSAGE
+RECOVERY_ACTION = "weapon_recovery"
+
+
+def _near(pos, target, tolerance: int = 1) -> bool:
+    return abs(pos[0] - target[0]) <= tolerance and abs(pos[1] - target[1]) <= tolerance
 
 
 class WeaponReturnWatcher:
     """
     Weapon recovery logic with STRICT guarantee:
-    Autoclicker is completely stopped (thread terminated) BEFORE inventory opens and
-    remains stopped for the entire duration (open -> template search -> assign -> close).
+    Autoclicker is gated off and confirmed quiesced (no click in flight) BEFORE the
+    inventory opens and stays parked for the entire duration
+    (open -> template search -> assign -> close).
 
-    Only AFTER inventory is fully closed and recovery finalized the autoclicker may restart.
+    Only AFTER inventory is fully closed and recovery finalized is the gate reopened;
+    the parked clicker thread then resumes by itself.
     """
 
     def __init__(
@@ -39,9 +51,27 @@ class WeaponReturnWatcher:
         weapon_template_hotbar_path: str = "Assets/weapon_template_hotbar.png",
         inventory_key: str = "q",
         weapon_hotbar_slot_key: str = "2",
-        match_threshold: float = 0.78
+        match_threshold: float = 0.78,
+        template_bank: Optional[TemplateBank] = None,
+        capture_regions: Optional[CaptureRegions] = None,
+        trigger_engine: Optional[TriggerEngine] = None,
+        capture_service: Optional[FrameCaptureService] = None,
+        probe_region: Optional[Tuple[int, int, int, int]] = None,
+        open_timeout: float = 0.35,
+        close_timeout: float = 0.2,
+        cursor_timeout: float = 0.05,
+        hover_timeout: float = 0.15,
+        hover_settle: float = 0.05,
+        input_backend: Optional[InputBackend] = None,
+        weapon_library: Optional[WeaponLibrary] = None,
+        calibration: Optional[Calibrator] = None,
+        log_follower: Optional[MultiLogFollower] = None,
+        window_region: Optional[Tuple[int, int, int, int]] = None,
+        client: str = "main",
+        start_at_end: bool = True
     ):
         self.shared_state = shared_state
+        self.client = client
         self.autoclicker = autoclicker
         self.log_path = log_path
 
@@ -49,211 +79,389 @@ class WeaponReturnWatcher:
         self.weapon_template_hotbar_path = weapon_template_hotbar_path
         self.match_threshold = match_threshold
 
+        # Templates are decoded once here; recoveries only read from memory.
+        self._owns_template_bank = template_bank is None
+        if template_bank is None:
+            template_bank = TemplateBank()
+        if weapon_library is None:
+            weapon_library = WeaponLibrary(template_bank, [
+                WeaponSpec(INVENTORY_TEMPLATE, weapon_template_path, INVENTORY_REGION),
+                WeaponSpec(HOTBAR_TEMPLATE, weapon_template_hotbar_path, HOTBAR_REGION),
+            ], match_threshold=match_threshold)
+        self.template_bank = template_bank
+        self.weapon_library = weapon_library
+        self.capture_regions = capture_regions
+        self._owns_capture = capture_service is None
+        self.capture = capture_service if capture_service is not None else FrameCaptureService(create_backend())
+
+        self.trigger_engine = trigger_engine if trigger_engine is not None else TriggerEngine()
+        self.trigger_engine.register_handler(RECOVERY_ACTION, self._on_recovery_trigger)
+
+        self.input = input_backend if input_backend is not None else create_input_backend()
         self.inventory_key = inventory_key
         self.weapon_hotbar_slot_key = weapon_hotbar_slot_key
 
+        # Condition-based waits replace the fixed open/close sleeps and cursor
+        # glide durations; timeouts are the worst case, not the usual cost.
+        self.probe_region = probe_region
+        self.calibration = calibration
+        # Game window this watcher drives when several clients share the
+        # screen; None means the whole screen.
+        self.window_region = window_region
+        self.open_timeout = open_timeout
+        self.close_timeout = close_timeout
+        self.cursor_timeout = cursor_timeout
+        # The slot key only assigns the item the game sees as hovered, so it
+        # waits for the hover highlight around the cursor and never goes out
+        # sooner than hover_settle after the move.
+        self.hover_timeout = hover_timeout
+        self.hover_settle = hover_settle
+
+        self._line_listeners = ()
         self._stop_event = threading.Event()
+        # With a shared follower (several clients) its owner runs the loop and
+        # this watcher only holds a slot in it between start() and stop().
+        # Lines already in the log when it is attached are skipped unless
+        # start_at_end is False: old knockouts must not fire recoveries.
+        self.start_at_end = start_at_end
+        self._owns_follower = log_follower is None
+        self._follower = log_follower if log_follower is not None else LogFollower(
+            on_line=self._on_log_line, path=log_path, start_at_end=start_at_end)
+        self._follow_slot = None
         self._thread = threading.Thread(target=self._loop, name="WeaponReturnThread", daemon=True)
         self._started = False
+        # Recoveries run on this watcher's own RecoveryThread (started on the
+        # first request): the log thread, which may be shared by every client,
+        # only reads lines and matches triggers, and F4 / the GUI button never
+        # block their caller for the length of a recovery.
+        self._recoveries = Queue()
+        self._recovery_cond = threading.Condition()
+        self._pending = 0
+        self._worker: Optional[threading.Thread] = None
         self.last_action = "Idle"
 
-        self._start_thread()
-
     # ------------- Public API -------------
 
     def set_log_path(self, path: str):
         logger.info(f"[WeaponReturn] Setting log path: {path}")
         self.log_path = path
+        if self._owns_follower:
+            self._follower.set_path(path)
+        elif self._follow_slot is not None:
+            self._follower.retarget(self._follow_slot, path)
+
+    def add_line_listener(self, callback):
+        """callback(line, seen_ns) runs on the watcher thread for every new log line."""
+        self._line_listeners = self._line_listeners + (callback,)
+
+    def start(self):
+        """
+        Starts the template file watcher and the log watcher thread (or,
+        with a shared follower, registers the log with it).
+        """
+        if self._started:
+            return
+        self.template_bank.start_watching()
+        if self._owns_follower:
+            self._thread.start()
+            logger.debug("[WeaponReturn] Watcher thread started.")
+        else:
+            self._follow_slot = self._follower.add(self._on_log_line, self.log_path, self.start_at_end)
+        self._started = True
 
     def stop(self):
         self._stop_event.set()
+        if self._owns_follower:
+            self._follower.wake()
+        elif self._follow_slot is not None:
+            self._follower.remove(self._follow_slot)
+            self._follow_slot = None
+        with self._recovery_cond:
+            if self._worker is not None:
+                self._recoveries.put(None)
+        if self._owns_template_bank:
+            self.template_bank.stop()
+        if self._owns_capture:
+            self.capture.stop()
 
     def manual_trigger(self):
         logger.info("[WeaponReturn] Manual trigger (F4).")
-        self._do_recovery()
+        self.request_recovery()
+
+    def request_recovery(self, trigger_seen_ns: int = 0):
+        """Queues a recovery on the RecoveryThread and returns at once."""
+        with self._recovery_cond:
+            self._pending += 1
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._recovery_loop, name=f"RecoveryThread-{self.client}",
+                                                daemon=True)
+                self._worker.start()
+        self._recoveries.put(trigger_seen_ns)
+
+    def feed_line(self, line: str, seen_ns: int = 0):
+        """Handles `line` as if the log watcher had just read it (session replay)."""
+        self._on_log_line(line, seen_ns or time.perf_counter_ns())
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until every requested recovery has finished; False on timeout."""
+        with self._recovery_cond:
+            return self._recovery_cond.wait_for(lambda: self._pending == 0, timeout)
 
     # ------------- Internal Thread -------------
 
-    def _start_thread(self):
-        if not self._started:
-            self._thread.start()
-            self._started = True
-            logger.debug("[WeaponReturn] Watcher thread started.")
-
     def _loop(self):
-        last_size = 0
-        logger.info("[WeaponReturn] Log watcher running.")
-        while not self._stop_event.is_set():
-            if self.log_path and os.path.isfile(self.log_path):
-                try:
-                    current_size = os.path.getsize(self.log_path)
-                    if current_size < last_size:
-                        logger.debug("[WeaponReturn] Log rotated; resetting pointer.")
-                        last_size = 0
-                    if current_size > last_size:
-                        with open(self.log_path, "r", encoding="utf-8", errors="ignore") as f:
-                            if last_size:
-                                f.seek(last_size)
-                            for raw_line in f:
-                                if TRIGGER_MESSAGE in raw_line:
-                                    logger.info("[WeaponReturn] Trigger message found.")
-                                    self._do_recovery()
-                        last_size = current_size
-                except Exception as e:
-                    logger.error(f"[WeaponReturn] Log read error: {e}")
-            time.sleep(0.25)
+        logger.info(f"[WeaponReturn] Log watcher running ({self._follower.mode}).")
+        self._follower.run(self._stop_event)
         logger.info("[WeaponReturn] Log watcher stopped.")
 
+    def _recovery_loop(self):
+        while True:
+            trigger_seen_ns = self._recoveries.get()
+            if trigger_seen_ns is None:
+                return
+            try:
+                self._do_recovery(trigger_seen_ns)
+            except Exception as e:
+                # One failed recovery must not take the thread (and every
+                # request queued after it) down with it.
+                logger.error(f"[WeaponReturn] Recovery failed: {type(e).__name__}: {e}")
+            finally:
+                with self._recovery_cond:
+                    self._pending -= 1
+                    self._recovery_cond.notify_all()
+
+    def _on_log_line(self, line: str, seen_ns: int):
+        for cb in self._line_listeners:
+            cb(line, seen_ns)
+        self.trigger_engine.feed(line, seen_ns)
+
+    def _on_recovery_trigger(self, rule: TriggerRule, line: str, seen_ns: int):
+        logger.info(f"[WeaponReturn] Trigger '{rule.name}' matched.")
+        events.publish(TriggerMatched(rule.name, rule.action, line, seen_ns, self.client))
+        self.request_recovery(seen_ns)
+
     # ------------- Recovery Routine -------------
 
-    def _do_recovery(self):
-        if pyautogui is None:
-            logger.error("[WeaponReturn] pyautogui not installed.")
+    def _do_recovery(self, trigger_seen_ns: int = 0):
+        with tracer.span("recovery", cat="recovery", client=self.client):
+            self._recover(trigger_seen_ns)
+
+    def _recover(self, trigger_seen_ns: int):
+        if self.input is None:
+            logger.error("[WeaponReturn] No input backend available.")
             return
-        if self.shared_state.weapon_recovery_in_progress:
+        if not self.shared_state.try_begin_recovery():
             logger.debug("[WeaponReturn] Recovery already running; skipping.")
             return
 
-        logger.info("[WeaponReturn] >>> Recovery START")
-        self.shared_state.weapon_recovery_in_progress = True
-        self.last_action = "Recovering"
-
-        # Remember if autoclicker was active
-        was_running = self.autoclicker.is_running()
-        logger.debug(f"[WeaponReturn] Autoclicker active before recovery: {was_running}")
-
-        # 1. Disable permission first (so even if start() is called elsewhere it refuses)
-        self.shared_state.set_autoclicker_allowed(False)
-        logger.debug("[WeaponReturn] Autoclicker allowed flag set FALSE.")
-
-        # 2. Hard force stop if running (blocking)
-        if was_running:
-            self.autoclicker.force_stop_blocking(max_wait=3.0)
-
-        # 3. Small buffer to flush queued OS events
-        time.sleep(0.05)
-        if pyautogui:
-            try:
-                pyautogui.mouseUp(button="left")
-            except Exception:
-                pass
-
-        # 4. Open inventory (guaranteed no autoclick thread exists now)
+        # Everything after the flag is taken runs under the finally below, so a
+        # failure anywhere (template load, lease, quiesce) still ends the
+        # recovery and reopens the clicker gate.
+        restart_clicker = False
+        recovery_start = time.perf_counter_ns()
         try:
-            logger.info(f"[WeaponReturn] Opening inventory (key '{self.inventory_key}').")
-            pyautogui.press(self.inventory_key)
-            time.sleep(0.22)
-
-            # 5. Move cursor out of way
-            try:
-                sw, sh = pyautogui.size()
-                neutral = (sw // 2, sh // 4)
-                pyautogui.moveTo(*neutral, duration=0.07)
-                logger.debug(f"[WeaponReturn] Cursor moved to neutral {neutral}.")
-            except Exception as e:
-                logger.warning(f"[WeaponReturn] Neutral cursor move failed: {e}")
-
-            # 6. Template search
-            match_result = self._find_weapon_template()
-            if match_result:
-                x, y, template_type, conf = match_result
-                logger.info(f"[WeaponReturn] Weapon found ({template_type}) at ({x},{y}) conf={conf:.3f}")
-                try:
-                    pyautogui.moveTo(x, y, duration=0.08)
-                except Exception as e:
-                    logger.error(f"[WeaponReturn] Move to weapon failed: {e}")
-                logger.debug(f"[WeaponReturn] Assigning to slot '{self.weapon_hotbar_slot_key}'.")
-                pyautogui.press(self.weapon_hotbar_slot_key)
-            else:
-                logger.warning("[WeaponReturn] Weapon template NOT found (inventory + hotbar).")
-                self.last_action = "Template not found"
-
-            # 7. Close inventory
-            logger.info(f"[WeaponReturn] Closing inventory (key '{self.inventory_key}').")
-            pyautogui.press(self.inventory_key)
-            time.sleep(0.12)
-
-            if self.last_action != "Template not found":
-                self.last_action = "Recovered"
-                logger.info("[WeaponReturn] >>> Recovery SUCCESS")
-            else:
-                logger.info("[WeaponReturn] >>> Recovery FINISHED (not found)")
+            # Recoveries can be triggered before the warm-up has decoded the
+            # templates; load them now rather than open an inventory for nothing.
+            self._ensure_templates()
+
+            # The input lease comes first: it keeps other clients off the shared
+            # mouse and keyboard until the inventory is closed again, and waiting
+            # for it must not count against the quiesce timeout below (our
+            # clicker may itself be queued behind another client's lease).
+            with self.input.exclusive():
+                recovery_start = time.perf_counter_ns()
+                if trigger_seen_ns:
+                    metrics.record("recovery.trigger_latency", recovery_start - trigger_seen_ns)
+                logger.info("[WeaponReturn] >>> Recovery START")
+                self.last_action = "Recovering"
+                self._phase("start")
+
+                # 1. Close the gate first: the clicker thread parks instead of exiting,
+                #    and start() elsewhere refuses while recovery is in progress.
+                self.shared_state.set_autoclicker_allowed(False)
+                logger.debug("[WeaponReturn] Autoclicker allowed flag set FALSE.")
+
+                # 2. Wait for the confirmed quiesce (no click in flight) instead of a fixed sleep.
+                #    A clicker that has to be force-stopped is not parked, so it is
+                #    restarted after the recovery (step 8).
+                with metrics.timed("recovery.quiesce"):
+                    if not self.shared_state.wait_quiesced(timeout=1.0):
+                        logger.error("[WeaponReturn] Autoclicker did not quiesce; forcing stop.")
+                        restart_clicker = self.autoclicker.is_running()
+                        self.autoclicker.force_stop_blocking(max_wait=3.0)
+
+                    # 3. Release any button the last click may have left down.
+                    try:
+                        self.input.mouse_up("left")
+                    except Exception:
+                        pass
+
+                # 4. Open inventory (guaranteed no click in flight and none can start).
+                probe = self._probe()
+                baseline = probe.signature()
+                logger.info(f"[WeaponReturn] Opening inventory (key '{self.inventory_key}').")
+                with metrics.timed("recovery.inventory_open"):
+                    self.input.press(self.inventory_key)
+                    probe.wait_changed(baseline, self.open_timeout, "inventory_open")
+                    self._phase("inventory_open")
+
+                    # 5. Move cursor out of way
+                    try:
+                        self._move_cursor(*self._neutral_point(), "cursor_neutral")
+                    except Exception as e:
+                        logger.warning(f"[WeaponReturn] Neutral cursor move failed: {e}")
+
+                # 6. Template search
+                self._phase("search")
+                match_result = self._find_weapon_template()
+                if match_result:
+                    x, y, weapon, conf = match_result
+                    logger.info(f"[WeaponReturn] Weapon found ({weapon}) at ({x},{y}) conf={conf:.3f}")
+                    self._phase("assign")
+                    with metrics.timed("recovery.assign"):
+                        try:
+                            self._hover(x, y)
+                        except Exception as e:
+                            logger.error(f"[WeaponReturn] Move to weapon failed: {e}")
+                        logger.debug(f"[WeaponReturn] Assigning to slot '{self.weapon_hotbar_slot_key}'.")
+                        self.input.press(self.weapon_hotbar_slot_key)
+                else:
+                    logger.warning("[WeaponReturn] No weapon template matched.")
+                    self.last_action = "Template not found"
+
+                # 7. Close inventory: done as soon as the probe leaves the open-state image.
+                logger.info(f"[WeaponReturn] Closing inventory (key '{self.inventory_key}').")
+                self._phase("close")
+                with metrics.timed("recovery.close"):
+                    open_signature = probe.signature()
+                    self.input.press(self.inventory_key)
+                    probe.wait_changed(open_signature, self.close_timeout, "inventory_close", settle_polls=1)
+
+                if self.last_action != "Template not found":
+                    self.last_action = "Recovered"
+                    logger.info("[WeaponReturn] >>> Recovery SUCCESS")
+                else:
+                    logger.info("[WeaponReturn] >>> Recovery FINISHED (not found)")
         except Exception as e:
             logger.error(f"[WeaponReturn] Recovery error: {e}")
             self.last_action = f"Error: {e}"
         finally:
             # 8. Mark process end THEN allow autoclicker
-            self.shared_state.weapon_recovery_in_progress = False
+            metrics.record("recovery.total", time.perf_counter_ns() - recovery_start)
+            self.shared_state.end_recovery()
+            # A parked clicker resumes on its own; a force-stopped one is restarted.
             self.shared_state.set_autoclicker_allowed(True)
             logger.debug("[WeaponReturn] Autoclicker allowed flag restored TRUE.")
-            if was_running:
-                logger.info("[WeaponReturn] Restarting autoclicker (was active before recovery).")
+            if restart_clicker:
+                logger.info("[WeaponReturn] Restarting force-stopped autoclicker.")
                 self.autoclicker.start()
+            self._phase("failed" if self.last_action.startswith("Error") else "done")
+
+    def _ensure_templates(self):
+        """
+        Loads the weapon templates when none is in the bank yet. With a
+        calibrator this goes through ensure(), whose lock also waits out a
+        calibration the warm-up thread is already running.
+        """
+        if any(self.template_bank.get(spec.name) is not None for spec in self.weapon_library.specs()):
+            return
+        logger.info("[WeaponReturn] Templates not loaded yet; loading before recovery.")
+        with metrics.timed("recovery.template_load"):
+            if self.calibration is not None:
+                self.calibration.ensure()
+            else:
+                self.template_bank.load_all()
+
+    def _phase(self, phase: str):
+        events.publish(RecoveryPhase(phase, self.last_action, self.client))
+
+    def _probe(self) -> ScreenProbe:
+        """
+        Probe region whose look proves the inventory is open or closed: the
+        configured probe region, else the calibrated (or default) square at
+        the centre of the game window or screen (covered by the opaque
+        inventory panel when open).
+        """
+        region = self.probe_region
+        cal = self.calibration.current if self.calibration is not None else None
+        if region is None and self.window_region is not None:
+            left, top, ww, wh = self.window_region
+            side = min(round(PROBE_SIZE * cal.template_scale) if cal is not None else PROBE_SIZE, ww, wh)
+            region = (left + (ww - side) // 2, top + (wh - side) // 2, side, side)
+        if region is None and cal is not None:
+            region = cal.probe_region
+        if region is None and self.capture.available:
+            sw, sh = self.capture.screen_size()
+            side = min(PROBE_SIZE, sw, sh)
+            region = ((sw - side) // 2, (sh - side) // 2, side, side)
+        return ScreenProbe(self.capture, region)
+
+    def _neutral_point(self) -> Tuple[int, int]:
+        if self.window_region is not None:
+            left, top, ww, wh = self.window_region
+            return left + ww // 2, top + wh // 4
+        cal = self.calibration.current if self.calibration is not None else None
+        if cal is not None:
+            return cal.neutral_point
+        sw, sh = self.capture.screen_size() if self.capture.available else self.input.screen_size()
+        return sw // 2, sh // 4
+
+    def _move_cursor(self, x: int, y: int, label: str):
+        """
+        Instant move, confirmed by reading the cursor position back when the
+        backend can (uinput cannot; its position() is None).
+        """
+        self.input.move_to(x, y)
+        if self.input.position() is not None:
+            wait_for(lambda: _near(self.input.position(), (x, y)), self.cursor_timeout, label)
+
+    def _hover(self, x: int, y: int):
+        """
+        Moves onto the item at (x, y), then waits until the pixels around the
+        cursor change (slot highlight / tooltip drawn by the game) and at
+        least `hover_settle` seconds have passed since the move.
+        """
+        cal = self.calibration.current if self.calibration is not None else None
+        side = round(SLOT_SIZE * (cal.template_scale if cal is not None else 1.0))
+        probe = ScreenProbe(self.capture, (max(0, x - side // 2), max(0, y - side // 2), side, side))
+        baseline = probe.signature()
+        moved = time.perf_counter()
+        self._move_cursor(x, y, "cursor_weapon")
+        probe.wait_changed(baseline, self.hover_timeout, "weapon_hover", settle_polls=1)
+        remaining = self.hover_settle - (time.perf_counter() - moved)
+        if remaining > 0:
+            time.sleep(remaining)
 
     # ------------- Template Matching -------------
 
     def _find_weapon_template(self) -> Optional[Tuple[int, int, str, float]]:
         """
-        Returns (x, y, template_type, confidence) or None.
-        template_type: 'inventory' | 'hotbar'
+        Returns (x, y, weapon_name, confidence) of the best candidate or None.
         """
-        if cv2 is None or np is None:
+        if not cv2 or not np:
             logger.warning("[WeaponReturn] OpenCV/numpy not installed.")
             return None
-        if pyautogui is None:
-            logger.warning("[WeaponReturn] pyautogui unavailable.")
+        if not self.capture.available:
+            logger.warning("[WeaponReturn] No capture backend available.")
             return None
 
-        inv_exists = os.path.isfile(self.weapon_template_path)
-        hot_exists = os.path.isfile(self.weapon_template_hotbar_path)
-        if not inv_exists and not hot_exists:
-            logger.warning("[WeaponReturn] Both weapon templates missing.")
+        # A region that is not set falls back to the game window (None: full screen).
+        regions = {
+            name: (self.capture_regions.get(name) if self.capture_regions else None) or self.window_region
+            for name in self.weapon_library.region_names()
+        }
+        # One fresh grab covering every searched region (the inventory was just opened).
+        with metrics.timed("recovery.capture"):
+            frame = self.capture.capture(list(regions.values()))
+        if frame is None:
             return None
 
-        try:
-            screenshot = pyautogui.screenshot()
-            scr = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
-        except Exception as e:
-            logger.error(f"[WeaponReturn] Screenshot failure: {e}")
+        with metrics.timed("recovery.match"):
+            candidates = self.weapon_library.find(frame, regions, owner=self.client)
+        if not candidates:
             return None
-
-        best = None  # (conf, x, y, type)
-
-        if inv_exists:
-            r = self._match_template(scr, self.weapon_template_path, "inventory")
-            if r:
-                conf, cx, cy, t = r
-                best = (conf, cx, cy, t)
-                logger.debug(f"[WeaponReturn] Inventory match conf={conf:.3f}")
-
-        if hot_exists:
-            r = self._match_template(scr, self.weapon_template_hotbar_path, "hotbar")
-            if r:
-                conf, cx, cy, t = r
-                logger.debug(f"[WeaponReturn] Hotbar match conf={conf:.3f}")
-                if best is None or conf > best[0]:
-                    best = (conf, cx, cy, t)
-
-        if best:
-            conf, x, y, ttype = best
-            return x, y, ttype, conf
-        return None
-
-    def _match_template(self, screen_bgr, template_path: str, template_type: str):
-        try:
-            tpl = cv2.imread(template_path, cv2.IMREAD_COLOR)
-            if tpl is None:
-                logger.warning(f"[WeaponReturn] Cannot read template: {template_path}")
-                return None
-            res = cv2.matchTemplate(screen_bgr, tpl, cv2.TM_CCOEFF_NORMED)
-            _, max_val, _, max_loc = cv2.minMaxLoc(res)
-            if max_val >= self.match_threshold:
-                th, tw = tpl.shape[:2]
-                center = (max_loc[0] + tw // 2, max_loc[1] + th // 2)
-                logger.debug(f"[WeaponReturn] Template {template_type} matched at {center} conf={max_val:.3f}")
-                return (max_val, center[0], center[1], template_type)
-            else:
-                logger.debug(f"[WeaponReturn] Template {template_type} below threshold ({max_val:.3f} < {self.match_threshold})")
-        except Exception as e:
-            logger.error(f"[WeaponReturn] Template match error ({template_type}): {e}")
-        return None
\ No newline at end of file
+        for c in candidates[1:]:
+            logger.debug(f"[WeaponReturn] Also seen: {c.spec.name} at {c.center} conf={c.confidence:.3f}")
+        best = candidates[0]
+        x, y = best.center
+        return x, y, best.spec.name, best.confidence
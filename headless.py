@@ -0,0 +1,258 @@
+"""
+Azerus Assistant without the Tk window.
+
+Runs the same modules as main.py (hotkeys, log watcher(s), blood curse
+monitor, extra clients from the config) but never imports tkinter: the
+status of every client is one line on the terminal, driven by the event
+bus, and commands come from stdin.
+
+    python headless.py --log ~/.minecraft/logs/latest.log
+    python headless.py --config alt.json --json-logs 2> azerus.jsonl
+
+Commands (type and press Enter): t toggle clicker, r recover weapon now,
+b toggle blood curse monitor, c <cps> set clicks per second, s print
+status, q quit. F6 / F4 / F7 work as in the GUI.
+"""
+import time
+_START_NS = time.perf_counter_ns()
+
+import os
+import sys
+import json
+import logging
+import argparse
+import threading
+
+from Modules.app import AppModules
+from Modules.config import ConfigStore, DEFAULT_CONFIG_PATH
+from Modules.startup import StartupProfile
+from Modules.event_bus import bus as events, ClickerStarted, ClickerStopped, ClickerPaused, RecoveryPhase, CurseStateChanged
+
+logger = logging.getLogger("Headless")
+
+LOG_PATH_KEY = "log_path"
+STATUS_INTERVAL = 0.25  # seconds between event drains / status redraws
+IDLE_INTERVAL = 1.0  # main-thread wake-up without a status line (Ctrl+C is only seen between waits on Windows)
+
+
+class JsonLogFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, thread, logger, msg (+ exc)."""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class StatusLine:
+    """
+    Compact per-client status kept up to date from bus events. On a TTY the
+    line is redrawn in place (log records clear it first, see
+    _StatusAwareHandler); otherwise it is printed only when it changes.
+    """
+
+    def __init__(self, stream=sys.stdout):
+        self.stream = stream
+        self.tty = stream.isatty()
+        self.lock = threading.Lock()
+        self._clients = {}
+        self._text = ""
+        self._shown = False
+        self.events = events.queue(ClickerStarted, ClickerStopped, ClickerPaused, RecoveryPhase, CurseStateChanged)
+
+    def update(self) -> bool:
+        """Applies pending events; returns True when the text changed."""
+        for event in self.events.drain():
+            state = self._clients.setdefault(event.client, {"clicker": "OFF", "recovery": "Idle", "curse": "-"})
+            if isinstance(event, ClickerStarted):
+                state["clicker"] = f"ON {event.cps:g}cps"
+            elif isinstance(event, ClickerStopped):
+                state["clicker"] = "OFF"
+            elif isinstance(event, ClickerPaused):
+                state["clicker"] = "PAUSED" if event.paused else "ON"
+            elif isinstance(event, RecoveryPhase):
+                state["recovery"] = event.status
+            elif isinstance(event, CurseStateChanged):
+                state["curse"] = time.strftime("%H:%M:%S", time.localtime(event.since)) if event.active else "-"
+        text = self.render()
+        if text == self._text:
+            return False
+        self._text = text
+        return True
+
+    def render(self) -> str:
+        if not self._clients:
+            return "idle"
+        return " | ".join(f"{name}: clicker {s['clicker']}, weapon {s['recovery']}, curse {s['curse']}"
+                          for name, s in sorted(self._clients.items()))
+
+    def refresh(self):
+        with self.lock:
+            if not self.update() and (self._shown or not self.tty):
+                return
+            if self.tty:
+                self._draw()
+            else:
+                self.stream.write(f"[status] {self._text}\n")
+                self.stream.flush()
+
+    def print(self):
+        with self.lock:
+            self.update()
+            self.clear()
+            self.stream.write(f"[status] {self._text}\n")
+            self.stream.flush()
+
+    def clear(self):
+        """Erases the in-place line (caller holds `lock`)."""
+        if self._shown:
+            self.stream.write("\r\x1b[K")
+            self.stream.flush()
+            self._shown = False
+
+    def _draw(self):
+        self.stream.write(f"\r\x1b[K{self._text}")
+        self.stream.flush()
+        self._shown = True
+
+
+class _StatusAwareHandler(logging.StreamHandler):
+    """Clears the in-place status line before a record and redraws it after."""
+
+    def __init__(self, stream, status: StatusLine):
+        super().__init__(stream)
+        self.status = status
+
+    def emit(self, record):
+        with self.status.lock:
+            shown = self.status._shown
+            self.status.clear()
+            super().emit(record)
+            if shown:
+                self.status._draw()
+
+
+def configure_logging(level: str, json_logs: bool, status: StatusLine = None):
+    if status is not None and status.tty and sys.stderr.isatty():
+        handler = _StatusAwareHandler(sys.stderr, status)
+    else:
+        handler = logging.StreamHandler(sys.stderr)
+    if json_logs:
+        handler.setFormatter(JsonLogFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(
+            "%(asctime)s | %(levelname)-8s | %(threadName)s | %(name)s | %(message)s", datefmt="%H:%M:%S"))
+    root = logging.getLogger()
+    root.setLevel(logging.getLevelName(level.upper()))
+    root.addHandler(handler)
+    logging.getLogger("PIL").setLevel(logging.WARNING)
+    logging.getLogger("cv2").setLevel(logging.WARNING)
+    logging.getLogger("pytesseract").setLevel(logging.WARNING)
+
+
+def read_commands(modules: AppModules, status: StatusLine, stop_event: threading.Event):
+    """StdinThread body: one command per line; q stops the app (EOF only ends the thread)."""
+    for raw in sys.stdin:
+        parts = raw.strip().split()
+        if not parts:
+            continue
+        cmd = parts[0].lower()
+        if cmd in ("q", "quit", "exit"):
+            stop_event.set()
+            return
+        elif cmd == "t":
+            modules.autoclicker.toggle()
+        elif cmd == "r":
+            modules.weapon_return.manual_trigger()
+        elif cmd == "b":
+            if modules.blood_curse.is_running():
+                modules.blood_curse.stop()
+            else:
+                modules.blood_curse.start()
+        elif cmd == "c" and len(parts) == 2:
+            try:
+                modules.autoclicker.set_cps(float(parts[1]))
+            except ValueError:
+                logger.error(f"[Headless] Invalid CPS value: {parts[1]}")
+        elif cmd == "s":
+            status.print()
+        else:
+            logger.warning(f"[Headless] Unknown command '{raw.strip()}' (t, r, b, c <cps>, s, q).")
+
+
+def positive_float(text: str) -> float:
+    try:
+        value = float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a number: {text!r}")
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"must be > 0: {text}")
+    return value
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Azerus Assistant without the GUI.")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH, help="config file (default: %(default)s)")
+    parser.add_argument("--log", help=f"Minecraft latest.log to watch (default: \"{LOG_PATH_KEY}\" in the config)")
+    parser.add_argument("--cps", type=positive_float, help="clicks per second for the main client")
+    parser.add_argument("--blood-curse", action="store_true", help="start the blood curse monitor")
+    parser.add_argument("--json-logs", action="store_true", help="write log records as JSON lines")
+    parser.add_argument("--log-level", default="INFO", choices=("DEBUG", "INFO", "WARNING", "ERROR"))
+    parser.add_argument("--no-status", action="store_true", help="no status line, no stdin commands")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    status = None if args.no_status else StatusLine()
+    configure_logging(args.log_level, args.json_logs, status)
+    profile = StartupProfile(_START_NS)
+    profile.add_phase("imports", _START_NS, time.perf_counter_ns() - _START_NS)
+
+    modules = AppModules(ConfigStore(args.config), profile)
+    log_path = args.log or modules.config.get(LOG_PATH_KEY)
+    if log_path:
+        modules.weapon_return.set_log_path(os.path.expanduser(log_path))
+    else:
+        logger.warning(f"[Headless] No log file (--log or \"{LOG_PATH_KEY}\" in {args.config}); only F4 / r recover.")
+    if args.cps is not None:
+        modules.autoclicker.set_cps(args.cps)
+
+    def on_warm():
+        profile.mark("warm")
+        profile.log()
+
+    stop_event = threading.Event()
+    logger.info(f"[Startup] Ready {profile.mark('ready'):.0f} ms after launch.")
+    modules.start(on_warm=on_warm)
+    if args.blood_curse:
+        modules.blood_curse.start()
+    if status is not None:
+        threading.Thread(target=read_commands, args=(modules, status, stop_event),
+                         name="StdinThread", daemon=True).start()
+
+    try:
+        # Always a finite wait: an untimed Event.wait() cannot be interrupted
+        # by Ctrl+C on Windows. Without a status line the loop only idles.
+        while not stop_event.wait(STATUS_INTERVAL if status is not None else IDLE_INTERVAL):
+            if status is not None:
+                status.refresh()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if status is not None:
+            with status.lock:
+                status.clear()
+        modules.shutdown()
+        logger.info("Exited cleanly.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,10 @@
+import time
+_START_NS = time.perf_counter_ns()
+
 import logging
 from GUI import AzerusAppGUI
-from Modules.auto_attack import AutoClicker
-from Modules.weapon_return import WeaponReturnWatcher
-from Modules.blood_curse import BloodCurseWatcher
-from Modules.hotkeys import GlobalHotkeyManager
-from Modules.shared_state import SharedState
+from Modules.app import AppModules
+from Modules.startup import StartupProfile
 
 def configure_logging():
     logging.basicConfig(
@@ -19,34 +19,35 @@ def configure_logging():
 def main():
     configure_logging()
     logger = logging.getLogger("main")
-
-    shared_state = SharedState()
-
-    autoclicker = AutoClicker(shared_state=shared_state)
-    weapon_return = WeaponReturnWatcher(shared_state=shared_state, autoclicker=autoclicker)
-    blood_curse = BloodCurseWatcher(shared_state=shared_state, autoclicker=autoclicker)
-
-    hotkeys = GlobalHotkeyManager()
-    hotkeys.register_hotkey("F6", autoclicker.toggle)
-    hotkeys.register_hotkey("F4", weapon_return.manual_trigger)
-
-    app = AzerusAppGUI(
-        shared_state=shared_state,
-        autoclicker=autoclicker,
-        weapon_return=weapon_return,
-        blood_curse=blood_curse,
-        hotkeys=hotkeys
-    )
+    profile = StartupProfile(_START_NS)
+    profile.add_phase("imports", _START_NS, time.perf_counter_ns() - _START_NS)
+
+    modules = AppModules(profile=profile)
+
+    with profile.phase("gui"):
+        app = AzerusAppGUI(
+            shared_state=modules.shared_state,
+            autoclicker=modules.autoclicker,
+            weapon_return=modules.weapon_return,
+            blood_curse=modules.blood_curse,
+            hotkeys=modules.hotkeys,
+            recorder=modules.recorder,
+            cv_worker=modules.cv_worker
+        )
+
+    def on_warm():
+        profile.mark("warm")
+        profile.log()
+
+    def on_shown():
+        logger.info(f"[Startup] Window shown {profile.mark('window_shown'):.0f} ms after launch.")
+        modules.start(on_warm=on_warm)
 
     logger.info("Starting Azerus Assistant UI")
-    app.run()
+    app.run(on_shown=on_shown)
 
-    logger.info("Shutting down modules...")
-    weapon_return.stop()
-    blood_curse.stop()
-    autoclicker.stop()
-    hotkeys.stop()
+    modules.shutdown()
     logger.info("Exited cleanly.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()